@@ -1,15 +1,30 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Mapping, MutableMapping
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Generator, Mapping, MutableMapping
+from contextlib import contextmanager
 from typing import Any, Callable, TypeVar, Union
 
 import anyio
 
-from starlette._utils import collapse_excgroups
+from starlette.datastructures import MutableHeaders
 from starlette.requests import ClientDisconnect, Request
 from starlette.responses import Response
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+try:
+    from starlette._utils import collapse_excgroups
+except ImportError:  # private helper, gone from newer Starlette releases
+
+    @contextmanager
+    def collapse_excgroups() -> Generator[None, None, None]:
+        try:
+            yield
+        except BaseException as exc:
+            # raise what the app raised rather than the task group wrapping it
+            while isinstance(exc, BaseExceptionGroup) and len(exc.exceptions) == 1:
+                exc = exc.exceptions[0]
+            raise exc
+
 RequestResponseEndpoint = Callable[[Request], Awaitable[Response]]
 DispatchFunction = Callable[[Request, RequestResponseEndpoint], Awaitable[Response]]
 BodyStreamGenerator = AsyncGenerator[Union[bytes, MutableMapping[str, Any]], None]
@@ -232,4 +247,139 @@ class _StreamingResponse(Response):
             await send({"type": "http.response.body", "body": b"", "more_body": False})
 
         if self.background:
-            await self.background() 
\ No newline at end of file
+            await self.background() 
+
+
+class HeaderMiddleware(BaseHTTPMiddleware):
+    """
+    A pure ASGI take on BaseHTTPMiddleware for the common case of a dispatch function
+    that inspects the request and sets or removes response headers, such as
+    security headers, CORS or request ids.
+
+    `call_next` returns at once, without running the app. It returns a pending
+    response whose header changes are replayed onto the app's own
+    `http.response.start` message while the app sends it straight through. So
+    there is no task group, no memory object stream and no response wrapper per
+    request. The dispatch function may also return its own response instead and
+    the app never runs, e.g. to reject a request.
+
+    The price is that the app runs only after dispatch has returned. Dispatch
+    cannot see the response's status or body, or time the app. Exceptions from
+    the app are raised from the middleware and not from `call_next`. A
+    middleware that needs any of this passes `headers_only=False` (or sets it
+    on the class) and gets the BaseHTTPMiddleware behaviour.
+    """
+
+    headers_only = True
+
+    def __init__(
+        self, app: ASGIApp, dispatch: DispatchFunction | None = None, headers_only: bool | None = None
+    ) -> None:
+        super().__init__(app, dispatch)
+        if headers_only is not None:
+            self.headers_only = headers_only
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not self.headers_only:
+            await super().__call__(scope, receive, send)
+            return
+
+        request = _HeaderRequest(scope, receive)
+
+        async def call_next(request: Request) -> Response:
+            return _PendingResponse(self.app)
+
+        response = await self.dispatch_func(request, call_next)
+        # if dispatch has read (some of) the body, the cached request passes it on downstream
+        await response(scope, request.wrapped_receive if request.body_read else receive, send)
+
+
+class _HeaderRequest(_CachedRequest):
+    body_read = False
+
+    async def stream(self) -> AsyncGenerator[bytes, None]:
+        self.body_read = True
+        async for chunk in super().stream():
+            yield chunk
+
+
+class _HeaderEdits(MutableHeaders):
+    """
+    The headers of a pending response. They start out empty. Every change is
+    recorded so it can be replayed onto the headers the app sends; reading only
+    sees the changes themselves.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.edits: list[tuple[Callable[..., Any], tuple[Any, ...]]] = []
+        self._editing = False
+
+    def _edit(self, method: Callable[..., T], *args: Any) -> T:
+        if self._editing:  # e.g. add_vary_header setting "vary"
+            return method(self, *args)
+        self.edits.append((method, args))
+        self._editing = True
+        try:
+            return method(self, *args)
+        finally:
+            self._editing = False
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self._edit(MutableHeaders.__setitem__, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._edit(MutableHeaders.__delitem__, key)
+
+    def setdefault(self, key: str, value: str) -> str:
+        return self._edit(MutableHeaders.setdefault, key, value)
+
+    def append(self, key: str, value: str) -> None:
+        self._edit(MutableHeaders.append, key, value)
+
+    def add_vary_header(self, vary: str) -> None:
+        self._edit(MutableHeaders.add_vary_header, vary)
+
+    def apply(self, headers: MutableHeaders) -> None:
+        for method, args in self.edits:
+            method(headers, *args)
+
+
+class _PendingResponse(Response):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._headers = _HeaderEdits()
+        self.background = None
+
+    @property
+    def headers(self) -> MutableHeaders:
+        return self._headers
+
+    @property
+    def status_code(self) -> int:  # type: ignore[override]
+        raise RuntimeError("The response has not started yet; use headers_only=False to inspect it.")
+
+    def set_cookie(self, *args: Any, **kwargs: Any) -> None:
+        cookie = Response()
+        cookie.set_cookie(*args, **kwargs)
+        for value in cookie.headers.getlist("set-cookie"):
+            self._headers.append("set-cookie", value)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        edits = self._headers
+        if edits.edits:
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    edits.apply(MutableHeaders(scope=message))
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
+        else:
+            await self.app(scope, receive, send)
+
+        if self.background:
+            await self.background()
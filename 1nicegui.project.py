@@ -1,9 +1,178 @@
-from nicegui import ui, app
-import json
+from nicegui import ui, app, background_tasks, core, events
+import asyncio
+import os
 import random
+import secrets
+import weakref
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from fastapi import HTTPException
+from starlette.responses import StreamingResponse
+
+from car_archive import DesignImporter, design_hash, export_lines, gzip_chunks
+from car_catalog import CATEGORIES, DEFAULT_PATH, CatalogFile
+from car_configs import config_space
+from car_gallery import CarGallery
+from car_render import CarRenderCache, canonical_design
+from event_coalescing import throttle
+
+# one catalog for all sessions, reloaded when the parts file changes
+parts_catalog = CatalogFile(os.getenv('CAR_PARTS_FILE', DEFAULT_PATH))
+# renders are named by content, so browsers may keep them for good
+car_renders = CarRenderCache(os.getenv('CAR_RENDERS_DIR', 'car_renders'))
+app.add_static_files(car_renders.url_path, car_renders.directory, max_cache_age=365 * 24 * 3600)
+# community gallery shared by all sessions
+car_gallery = CarGallery(os.getenv('CAR_GALLERY_DB', 'car_gallery.sqlite3'))
+GALLERY_SHOWN = 50  # community designs listed at once
+GALLERY_RANKINGS = {'style': 'Top Style', 'speed': 'Top Speed', 'value': 'Top Value', 'overall': 'Top Overall',
+                    'newest': 'Newest'}
+# sessions whose saved designs can be downloaded, by the secret token in their export link
+exports: 'weakref.WeakValueDictionary[str, CarDesignGame]' = weakref.WeakValueDictionary()
+SHOWN_PARTS = 12  # parts listed per category; larger categories get a search and price filter
+SAVED_ROW_HEIGHT = 128  # px of one saved design card, margin included; the saved list is virtualized on it
+SAVED_OVERSCAN = 4  # saved design cards rendered above and below the visible ones
+
+class SavedOrder:
+    """Ids of the saved designs in display order, read by position.
+
+    A deleted id leaves a tombstone in its slot, and a Fenwick tree over the slots counts the
+    live ones before each, so appending, deleting and finding the design at a position all
+    take O(log n). Once half the slots are tombstones they are compacted away.
+    """
+    
+    def __init__(self):
+        self.slots: List[Optional[str]] = []
+        self.slot_of: Dict[str, int] = {}
+        self.tree = [0]  # 1-based; tree[i] counts the live slots in (i - lowbit(i), i]
+    
+    def __len__(self):
+        return len(self.slot_of)
+    
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self.slots[self._slot(position)]
+    
+    def append(self, design_id: str):
+        self.slots.append(design_id)
+        self.slot_of[design_id] = len(self.slots) - 1
+        i = len(self.slots)
+        self.tree.append(1 + self._live_before(i - 1) - self._live_before(i - (i & -i)))
+    
+    def remove(self, design_id: str):
+        slot = self.slot_of.pop(design_id, None)
+        if slot is None:
+            return
+        self.slots[slot] = None
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] -= 1
+            i += i & -i
+        if len(self.slots) > 64 and 2 * len(self) < len(self.slots):
+            self._compact()
+    
+    def slice(self, first: int, last: int) -> List[str]:
+        """Ids at positions ``first`` up to ``last``"""
+        ids = []
+        if first >= min(last, len(self)):
+            return ids
+        slot = self._slot(first)
+        while len(ids) < min(last, len(self)) - first:
+            if self.slots[slot] is not None:
+                ids.append(self.slots[slot])
+            slot += 1
+        return ids
+    
+    def _live_before(self, i: int) -> int:
+        """Live ids in the first ``i`` slots"""
+        count = 0
+        while i > 0:
+            count += self.tree[i]
+            i -= i & -i
+        return count
+    
+    def _slot(self, position: int) -> int:
+        """Slot of the live id at ``position``"""
+        i, remaining = 0, position + 1
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if i + step < len(self.tree) and self.tree[i + step] < remaining:
+                i += step
+                remaining -= self.tree[i]
+            step >>= 1
+        return i
+    
+    def _compact(self):
+        ids = [design_id for design_id in self.slots if design_id is not None]
+        self.slots = ids
+        self.slot_of = {design_id: slot for slot, design_id in enumerate(ids)}
+        self.tree = [0] + [1] * len(ids)
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+class SavedDesignCard:
+    """A card of the saved designs list, reused for whichever design scrolls into its place"""
+    def __init__(self, game):
+        self.game = game
+        self.design = None
+        with ui.card().classes('w-full p-4 mb-2 overflow-hidden').style(f'height: {SAVED_ROW_HEIGHT - 8}px') as self.card:
+            with ui.row().classes('w-full items-center no-wrap'):
+                self.image = ui.image().classes('w-40 h-[88px] rounded')
+                with ui.column().classes('flex-grow gap-0'):
+                    with ui.row().classes('w-full justify-between items-center'):
+                        self.name_label = ui.label().classes('font-bold text-lg')
+                        self.price_label = ui.label().classes('text-green-600 font-bold')
+                    
+                    with ui.row().classes('w-full justify-between items-center mt-2'):
+                        self.date_label = ui.label().classes('text-sm text-gray-600')
+                        with ui.row().classes('gap-2'):
+                            ui.button('Load', on_click=lambda: game.load_design(self.design)).props('flat')
+                            ui.button('Delete', on_click=lambda: game.delete_design(self.design)).props('flat color=red')
+    
+    def show(self, design):
+        """Fill the card with a saved design"""
+        self.design = design
+        self.name_label.set_text(design['name'])
+        self.price_label.set_text(f"${design['price']:,}")
+        self.date_label.set_text(f"Date: {design['date']}")
+        self.game.show_renders([self.image], [design['design']])
+        self.card.set_visibility(True)
+
+class GalleryCard:
+    """A card of the community gallery, refilled whenever the listing changes"""
+    def __init__(self, game):
+        self.entry = None
+        self.design = None
+        with ui.card().classes('w-64 p-4 hover:shadow-xl transition-shadow') as self.card:
+            self.image = ui.image().classes('w-full rounded')
+            self.name_label = ui.label().classes('font-bold text-lg')
+            self.info_label = ui.label().classes('text-sm text-gray-600')
+            ui.button('Load Design', on_click=lambda: game.load_design({'name': self.entry.name, 'design': self.design})).classes(
+                'w-full bg-blue-500 text-white')
+    
+    def show(self, entry, design):
+        """Fill the card with a gallery entry"""
+        self.entry, self.design = entry, design
+        speed, style, value = entry.stats
+        self.name_label.set_text(entry.name)
+        self.info_label.set_text(f'${entry.price:,} · ⚡{speed:.1f} ✨{style:.1f} 💎{value:.1f}')
+        self.card.set_visibility(True)
+
+@app.get('/car_designs/export/{token}')
+async def export_car_designs(token: str):
+    """Stream the saved designs of one session as a gzip-compressed design archive."""
+    game = exports.get(token)
+    if game is None:
+        raise HTTPException(status_code=404, detail='Unknown export')
+    # snapshot taken on the event loop, which saves, imports and deletes designs;
+    # Starlette compresses it in its thread pool while the session goes on
+    chunks = gzip_chunks(export_lines(list(game.saved_designs.values())))
+    return StreamingResponse(chunks, media_type='application/gzip',
+                             headers={'Content-Disposition': 'attachment; filename="car-designs.ndjson.gz"'})
+
 class CarDesignGame:
     def __init__(self):
         self.current_design = {
@@ -18,40 +187,20 @@ class CarDesignGame:
             'name': 'My Car Design'
         }
         
-        self.saved_designs = []
+        self.wanted_renders: Dict[ui.image, str] = {}  # render key each image should end up showing
+        self.saved_designs: Dict[str, dict] = {}  # by id, in the order they were saved
+        self.saved_order = SavedOrder()  # their ids in display order
+        self.export_token: Optional[str] = None
         self.price = 0
         self.budget = 50000
         
-        # Car parts catalog
-        self.body_styles = {
-            'sports': {'name': 'Sports Car', 'price': 25000, 'emoji': '🏎️'},
-            'sedan': {'name': 'Sedan', 'price': 20000, 'emoji': '🚗'},
-            'suv': {'name': 'SUV', 'price': 30000, 'emoji': '🚙'},
-            'truck': {'name': 'Truck', 'price': 35000, 'emoji': '🚚'},
-            'convertible': {'name': 'Convertible', 'price': 28000, 'emoji': '🚘'}
-        }
+        # Shared, read-only car parts catalog
+        self.catalog = parts_catalog.get()
+        self.space = config_space(self.catalog)  # precomputed prices and stats of all part combinations
+        self.fill_missing_parts()
         
-        self.wheel_styles = {
-            'sport': {'name': 'Sport Wheels', 'price': 2000, 'emoji': '⭕'},
-            'luxury': {'name': 'Luxury Rims', 'price': 3500, 'emoji': '💎'},
-            'offroad': {'name': 'Off-Road', 'price': 2500, 'emoji': '🛞'},
-            'classic': {'name': 'Classic', 'price': 1500, 'emoji': '🎯'}
-        }
-        
-        self.decals = {
-            'none': {'name': 'None', 'price': 0, 'emoji': ''},
-            'flames': {'name': 'Flames', 'price': 500, 'emoji': '🔥'},
-            'stripes': {'name': 'Racing Stripes', 'price': 800, 'emoji': '🏁'},
-            'lightning': {'name': 'Lightning', 'price': 600, 'emoji': '⚡'},
-            'stars': {'name': 'Stars', 'price': 400, 'emoji': '⭐'}
-        }
-        
-        self.spoilers = {
-            'none': {'name': 'None', 'price': 0, 'emoji': ''},
-            'small': {'name': 'Small Spoiler', 'price': 1200, 'emoji': '▶'},
-            'medium': {'name': 'Medium Spoiler', 'price': 1800, 'emoji': '▷'},
-            'large': {'name': 'Large Wing', 'price': 2500, 'emoji': '►'}
-        }
+        # Dragging a color picker fires many picks; reprice and re-render at most 10 times a second
+        self.color_picked = throttle(0.1, name='car color pick')(self.update_price)
         
         self.setup_ui()
     
@@ -69,6 +218,8 @@ class CarDesignGame:
             design_tab = ui.tab('🎨 Design')
             saved_tab = ui.tab('💾 My Designs')
             gallery_tab = ui.tab('🏆 Gallery')
+        # the community gallery is listed when its tab is opened
+        tabs.on_value_change(lambda e: e.value == gallery_tab.props['name'] and self.show_community_designs())
         
         with ui.tab_panels(tabs, value=design_tab):
             # Design Tab
@@ -106,118 +257,88 @@ class CarDesignGame:
                     self.current_design, 'name')
             
             # Body Style
-            with ui.expansion('🚗 Body Style', value=True).classes('w-full'):
-                with ui.row().classes('w-full gap-2 flex-wrap'):
-                    for style_id, style_info in self.body_styles.items():
-                        with ui.card().classes('p-2 cursor-pointer hover:shadow-lg transition-shadow'):
-                            ui.button(
-                                f"{style_info['emoji']} {style_info['name']}\n${style_info['price']:,}",
-                                on_click=lambda s=style_id: self.update_body_style(s)
-                            ).classes('w-full').props('flat')
+            self.create_part_picker('body_style', '🚗 Body Style', True, self.update_body_style)
             
             # Colors
             with ui.expansion('🎨 Colors', value=True).classes('w-full'):
                 with ui.column().classes('w-full gap-2'):
                     ui.label('Body Color:').classes('font-semibold')
-                    ui.color_picker(value=self.current_design['body_color'], on_pick=lambda: self.update_price()).bind_value(
+                    ui.color_picker(value=self.current_design['body_color'], on_pick=self.color_picked).bind_value(
                         self.current_design, 'body_color')
                     
                     ui.label('Roof Color:').classes('font-semibold')
-                    ui.color_picker(value=self.current_design['roof_color'], on_pick=lambda: self.update_price()).bind_value(
+                    ui.color_picker(value=self.current_design['roof_color'], on_pick=self.color_picked).bind_value(
                         self.current_design, 'roof_color')
                     
                     ui.label('Wheel Color:').classes('font-semibold')
-                    ui.color_picker(value=self.current_design['wheel_color'], on_pick=lambda: self.update_price()).bind_value(
+                    ui.color_picker(value=self.current_design['wheel_color'], on_pick=self.color_picked).bind_value(
                         self.current_design, 'wheel_color')
             
             # Wheels
-            with ui.expansion('⭕ Wheels', value=True).classes('w-full'):
-                with ui.row().classes('w-full gap-2 flex-wrap'):
-                    for wheel_id, wheel_info in self.wheel_styles.items():
-                        with ui.card().classes('p-2 cursor-pointer hover:shadow-lg transition-shadow'):
-                            ui.button(
-                                f"{wheel_info['emoji']} {wheel_info['name']}\n${wheel_info['price']:,}",
-                                on_click=lambda w=wheel_id: self.update_wheel_style(w)
-                            ).classes('w-full').props('flat')
+            self.create_part_picker('wheel_style', '⭕ Wheels', True, self.update_wheel_style)
             
             # Decals
-            with ui.expansion('🔥 Decals', value=False).classes('w-full'):
-                with ui.row().classes('w-full gap-2 flex-wrap'):
-                    for decal_id, decal_info in self.decals.items():
-                        with ui.card().classes('p-2 cursor-pointer hover:shadow-lg transition-shadow'):
-                            ui.button(
-                                f"{decal_info['emoji']} {decal_info['name']}\n${decal_info['price']:,}",
-                                on_click=lambda d=decal_id: self.update_decal(d)
-                            ).classes('w-full').props('flat')
+            self.create_part_picker('decal', '🔥 Decals', False, self.update_decal)
             
             # Spoilers
-            with ui.expansion('✈️ Spoilers', value=False).classes('w-full'):
-                with ui.row().classes('w-full gap-2 flex-wrap'):
-                    for spoiler_id, spoiler_info in self.spoilers.items():
+            self.create_part_picker('spoiler', '✈️ Spoilers', False, self.update_spoiler)
+    
+    def create_part_picker(self, category, title, expanded, on_select):
+        """Create the part buttons of one catalog category"""
+        with ui.expansion(title, value=expanded).classes('w-full'):
+            parts = self.catalog.parts[category]
+            filtered = len(parts) > SHOWN_PARTS
+            if filtered:
+                # only the cheapest matches are built, whatever the size of the catalog
+                with ui.row().classes('w-full gap-2'):
+                    search = ui.input('Search').props('clearable').classes('flex-grow')
+                    max_price = ui.number('Max $', min=0, step=500).classes('w-28')
+            parts_row = ui.row().classes('w-full gap-2 flex-wrap')
+            
+            def show_parts():
+                parts_row.clear()
+                if filtered:
+                    shown = self.catalog.search(category, search.value or '', max_price.value, SHOWN_PARTS)
+                else:
+                    shown = parts.values()
+                with parts_row:
+                    for part in shown:
                         with ui.card().classes('p-2 cursor-pointer hover:shadow-lg transition-shadow'):
                             ui.button(
-                                f"{spoiler_info['emoji']} {spoiler_info['name']}\n${spoiler_info['price']:,}",
-                                on_click=lambda s=spoiler_id: self.update_spoiler(s)
+                                f"{part.emoji} {part.name}\n${part.price:,}",
+                                on_click=lambda p=part.id: on_select(p)
                             ).classes('w-full').props('flat')
+            
+            show_parts()
+            if filtered:
+                search.on_value_change(show_parts)
+                max_price.on_value_change(show_parts)
     
     def create_preview_panel(self):
         """Create the car preview panel"""
         with ui.card().classes('w-full p-4 shadow-lg'):
             ui.label('👁️ Preview').classes('text-xl font-bold mb-4')
             
-            # Car Visual Representation
+            # Car Visual Representation, rendered server-side and shared through the render cache
             with ui.column().classes('w-full items-center'):
-                ui.add_css('''                        .car-container {
-                            width: 100%;
-                            height: 300px;
-                            display: flex;
-                            align-items: center;
-                            justify-content: center;
-                            position: relative;
-                            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                            border-radius: 10px;
-                            overflow: hidden;
-                        }
-                        .car-body {
-                            font-size: 120px;
+                ui.add_css('''
+                        .car-render {
                             filter: drop-shadow(0 10px 20px rgba(0,0,0,0.3));
-                            transition: all 0.3s ease;
                             animation: float 3s ease-in-out infinite;
                         }
                         @keyframes float {
                             0%, 100% { transform: translateY(0px); }
                             50% { transform: translateY(-10px); }
                         }
-                        .car-decoration {
-                            position: absolute;
-                            font-size: 40px;
-                            animation: pulse 2s ease-in-out infinite;
-                        }
-                        @keyframes pulse {
-                            0%, 100% { opacity: 0.8; }
-                            50% { opacity: 1; }
-                        }
 ''')
-                
-                with ui.column().classes('car-container'):
-                    ui.label(self.body_styles[self.current_design['body_style']]['emoji']).classes(
-                        'car-body')
-                    
-                    # Add decal if selected
-                    if self.current_design['decal'] != 'none':
-                        ui.label(self.decals[self.current_design['decal']]['emoji']).classes(
-                            'car-decoration').style('top: 50%; left: 50%; transform: translate(-50%, -50%);')
-                    
-                    # Add spoiler if selected
-                    if self.current_design['spoiler'] != 'none':
-                        ui.label(self.spoilers[self.current_design['spoiler']]['emoji']).classes(
-                            'car-decoration').style('top: 20%; right: 20%;')
+                self.preview_image = ui.image().classes('w-full car-render').props('no-transition')
             
             # Quick Stats
             with ui.row().classes('w-full justify-around mt-4 p-2 bg-gray-100 rounded'):
-                ui.label(f"Style: {self.body_styles[self.current_design['body_style']]['name']}").classes('text-sm')
-                ui.label(f"Wheels: {self.wheel_styles[self.current_design['wheel_style']]['name']}").classes('text-sm')
-                ui.label(f"Decal: {self.decals[self.current_design['decal']]['name']}").classes('text-sm')
+                self.style_label = ui.label().classes('text-sm')
+                self.wheels_label = ui.label().classes('text-sm')
+                self.decal_label = ui.label().classes('text-sm')
+            self.update_preview()
     
     def create_stats_panel(self):
         """Create the stats and actions panel"""
@@ -245,6 +366,9 @@ class CarDesignGame:
                 ui.button('💾 Save Design', on_click=self.save_design).classes(
                     'w-full bg-green-500 text-white').props('icon=save')
                 
+                ui.button('🌍 Share to Gallery', on_click=self.publish_design).classes(
+                    'w-full bg-indigo-500 text-white').props('icon=public')
+                
                 ui.button('🎲 Random Design', on_click=self.randomize_design).classes(
                     'w-full bg-purple-500 text-white').props('icon=shuffle')
                 
@@ -256,6 +380,14 @@ class CarDesignGame:
             
             # Budget Warning
             self.budget_warning = ui.label('').classes('text-red-500 font-bold mt-2')
+            
+            # Budget Optimizer
+            with ui.expansion('🎯 Best Under Budget', value=False,
+                              on_value_change=lambda e: e.value and self.show_best_designs()).classes('w-full mt-4'):
+                self.objective_select = ui.select({'speed': 'Speed', 'style': 'Style', 'value': 'Value', 'overall': 'Overall'},
+                                                  value='overall', label='Optimize for',
+                                                  on_change=self.show_best_designs).classes('w-full')
+                self.best_designs_container = ui.column().classes('w-full gap-1 text-sm')
     
     def create_saved_designs_panel(self):
         """Create the saved designs panel"""
@@ -266,7 +398,25 @@ class CarDesignGame:
                 ui.button('📥 Load from File', on_click=self.load_from_file).classes('bg-blue-500 text-white')
                 ui.button('📤 Export All', on_click=self.export_designs).classes('bg-green-500 text-white')
             
-            self.saved_designs_container = ui.column().classes('w-full gap-4')
+            with ui.dialog() as self.import_dialog, ui.card():
+                ui.label('Load designs from an exported archive').classes('font-bold')
+                self.import_area = ui.column()
+            
+            self.saved_count_label = ui.label().classes('text-gray-600')
+            self.saved_empty_label = ui.label('No saved designs yet. Create your first design!').classes('text-gray-500')
+            
+            # Only the cards in view exist; two spacers stand in for the designs above and below
+            self.saved_scroll = ui.scroll_area().classes('w-full h-[70vh]')
+            self.saved_scroll.on('scroll', self.on_saved_scroll, args=['verticalPosition', 'verticalContainerSize'],
+                                 throttle=0.05)
+            with self.saved_scroll:
+                with ui.column().classes('w-full gap-0'):
+                    self.saved_top_spacer = ui.element('div')
+                    self.saved_designs_container = ui.column().classes('w-full gap-0')
+                    self.saved_bottom_spacer = ui.element('div')
+            self.saved_cards: Dict[str, SavedDesignCard] = {}  # by design id, for the designs in view
+            self.spare_cards: List[SavedDesignCard] = []  # hidden after the shown ones, ready for reuse
+            self.saved_view = (0, 10 * SAVED_ROW_HEIGHT)  # scroll position and height, until the first scroll event
             self.update_saved_designs_display()
     
     def create_gallery_panel(self):
@@ -275,86 +425,93 @@ class CarDesignGame:
             ui.label('🏆 Design Gallery').classes('text-2xl font-bold')
             ui.label('Choose from these amazing preset designs!').classes('text-gray-600')
             
-            # Preset designs
-            presets = [
-                {
-                    'name': 'Speed Demon',
-                    'body_style': 'sports',
-                    'body_color': '#FF0000',
-                    'wheel_style': 'sport',
-                    'decal': 'flames',
-                    'spoiler': 'large'
-                },
-                {
-                    'name': 'Luxury Cruiser',
-                    'body_style': 'sedan',
-                    'body_color': '#1E1E1E',
-                    'wheel_style': 'luxury',
-                    'decal': 'none',
-                    'spoiler': 'none'
-                },
-                {
-                    'name': 'Adventure Seeker',
-                    'body_style': 'suv',
-                    'body_color': '#228B22',
-                    'wheel_style': 'offroad',
-                    'decal': 'lightning',
-                    'spoiler': 'medium'
-                },
-                {
-                    'name': 'Racing Champion',
-                    'body_style': 'sports',
-                    'body_color': '#0000FF',
-                    'wheel_style': 'sport',
-                    'decal': 'stripes',
-                    'spoiler': 'large'
-                }
-            ]
-            
             with ui.row().classes('w-full gap-4 flex-wrap'):
-                for preset in presets:
+                images = []
+                for preset in self.catalog.presets:
                     with ui.card().classes('p-4 cursor-pointer hover:shadow-xl transition-shadow'):
                         ui.label(preset['name']).classes('font-bold text-lg mb-2')
-                        ui.label(self.body_styles[preset['body_style']]['emoji']).classes('text-4xl mb-2')
+                        images.append(ui.image().classes('w-48 mb-2 rounded'))
                         ui.button('Load Design', on_click=lambda p=preset: self.load_preset(p)).classes(
                             'w-full bg-blue-500 text-white')
+                self.show_renders(images, self.catalog.presets)
+            
+            ui.label('🌍 Community Gallery').classes('text-2xl font-bold mt-4')
+            with ui.row().classes('w-full gap-4 items-center'):
+                self.ranking_select = ui.select(GALLERY_RANKINGS, value='style', label='Show',
+                                                on_change=self.show_community_designs).classes('w-48')
+                self.within_budget = ui.switch('Within my budget', on_change=self.show_community_designs)
+                ui.button('🔄', on_click=self.show_community_designs).props('flat')
+                self.gallery_count_label = ui.label().classes('text-gray-600')
+            self.community_container = ui.row().classes('w-full gap-4 flex-wrap')
+            self.gallery_cards: List[GalleryCard] = []  # reused for every listing, hidden when not needed
+    
+    def show_community_designs(self):
+        """List the best shared designs for the chosen ranking, reusing the cards and their cached renders"""
+        entries = car_gallery.top(self.ranking_select.value, GALLERY_SHOWN,
+                                  self.budget if self.within_budget.value else None)
+        designs = car_gallery.designs([entry.id for entry in entries])
+        while len(self.gallery_cards) < len(entries):
+            with self.community_container:
+                self.gallery_cards.append(GalleryCard(self))
+        for card, entry in zip(self.gallery_cards, entries):
+            card.show(entry, designs[entry.id])
+        for card in self.gallery_cards[len(entries):]:
+            card.card.set_visibility(False)
+        self.show_renders([card.image for card in self.gallery_cards[:len(entries)]], [designs[entry.id] for entry in entries])
+        self.gallery_count_label.set_text(f'{len(car_gallery):,} shared designs' if len(car_gallery) else
+                                          'No shared designs yet. Share yours from the Design tab!')
+    
+    def publish_design(self):
+        """Share the current design in the community gallery"""
+        if self.price > self.budget:
+            ui.notify('Cannot share: Over budget!', type='negative')
+            return
+        
+        price, stats = self.space.score(self.current_design)
+        car_gallery.publish(self.current_design['name'], self.current_design, price, stats)
+        ui.notify(f'Shared "{self.current_design["name"]}" with the community!', type='positive')
+    
+    def fill_missing_parts(self):
+        """Replace parts the catalog no longer offers with the cheapest of their category"""
+        for category in CATEGORIES:
+            if self.current_design[category] not in self.catalog.parts[category]:
+                self.current_design[category] = self.catalog.cheapest(category).id
+    
+    def part(self, category):
+        """The catalog part chosen for a category of the current design"""
+        return self.catalog.part(category, self.current_design[category])
     
     def update_body_style(self, style):
         """Update the car body style"""
         self.current_design['body_style'] = style
         self.update_price()
         self.update_stats()
-        ui.notify(f'Changed to {self.body_styles[style]["name"]}', type='positive')
+        ui.notify(f'Changed to {self.catalog.part("body_style", style).name}', type='positive')
     
     def update_wheel_style(self, style):
         """Update the wheel style"""
         self.current_design['wheel_style'] = style
         self.update_price()
         self.update_stats()
-        ui.notify(f'Changed to {self.wheel_styles[style]["name"]}', type='positive')
+        ui.notify(f'Changed to {self.catalog.part("wheel_style", style).name}', type='positive')
     
     def update_decal(self, decal):
         """Update the car decal"""
         self.current_design['decal'] = decal
         self.update_price()
         self.update_stats()
-        ui.notify(f'Added {self.decals[decal]["name"]}', type='positive')
+        ui.notify(f'Added {self.catalog.part("decal", decal).name}', type='positive')
     
     def update_spoiler(self, spoiler):
         """Update the car spoiler"""
         self.current_design['spoiler'] = spoiler
         self.update_price()
         self.update_stats()
-        ui.notify(f'Added {self.spoilers[spoiler]["name"]}', type='positive')
+        ui.notify(f'Added {self.catalog.part("spoiler", spoiler).name}', type='positive')
     
     def update_price(self):
         """Calculate and update the total price"""
-        self.price = (
-            self.body_styles[self.current_design['body_style']]['price'] +
-            self.wheel_styles[self.current_design['wheel_style']]['price'] +
-            self.decals[self.current_design['decal']]['price'] +
-            self.spoilers[self.current_design['spoiler']]['price']
-        )
+        self.price, _ = self.space.score(self.current_design)
         
         # Update budget warning
         if self.price > self.budget:
@@ -364,14 +521,46 @@ class CarDesignGame:
         
         # Update price breakdown
         self.update_price_breakdown()
+        self.update_preview()
+    
+    def update_preview(self):
+        """Show the render and parts of the current design"""
+        self.show_renders([self.preview_image], [self.current_design])
+        self.style_label.set_text(f"Style: {self.part('body_style').name}")
+        self.wheels_label.set_text(f"Wheels: {self.part('wheel_style').name}")
+        self.decal_label.set_text(f"Decal: {self.part('decal').name}")
+    
+    def show_renders(self, images, designs):
+        """Point images at the cached renders of designs, rendering the missing ones in the worker pool"""
+        designs = [canonical_design(design) for design in designs]  # a snapshot, the design may change meanwhile
+        missing = []
+        for image, design in zip(images, designs):
+            key = self.wanted_renders[image] = car_renders.key(design)
+            if car_renders.cached(key):
+                image.set_source(car_renders.url(key))
+            else:
+                missing.append((image, design, key))
+        if not missing:
+            return
+        if core.is_loop_running():
+            background_tasks.create(self.render_missing(missing), name='car renders')
+        else:  # built before the server runs: render once the page is live
+            ui.timer(0, lambda: background_tasks.create(self.render_missing(missing), name='car renders'), once=True)
+    
+    async def render_missing(self, missing):
+        """Render designs and show them, unless their image has moved on to another design meanwhile"""
+        urls = await car_renders.urls([design for _, design, _ in missing])
+        for (image, _, key), url in zip(missing, urls):
+            if self.wanted_renders.get(image) == key:
+                image.set_source(url)
     
     def update_price_breakdown(self):
         """Update the price breakdown display"""
         breakdown = [
-            f"Body: ${self.body_styles[self.current_design['body_style']]['price']:,}",
-            f"Wheels: ${self.wheel_styles[self.current_design['wheel_style']]['price']:,}",
-            f"Decal: ${self.decals[self.current_design['decal']]['price']:,}",
-            f"Spoiler: ${self.spoilers[self.current_design['spoiler']]['price']:,}",
+            f"Body: ${self.part('body_style').price:,}",
+            f"Wheels: ${self.part('wheel_style').price:,}",
+            f"Decal: ${self.part('decal').price:,}",
+            f"Spoiler: ${self.part('spoiler').price:,}",
             f"Total: ${self.price:,}"
         ]
         
@@ -384,88 +573,107 @@ class CarDesignGame:
     
     def update_stats(self):
         """Update the car stats based on current design"""
-        # Simulate stats based on choices
-        speed = 0.5
-        style = 0.5
-        value = 0.5
-        
-        # Body style affects stats
-        if self.current_design['body_style'] == 'sports':
-            speed += 0.3
-            style += 0.2
-        elif self.current_design['body_style'] == 'sedan':
-            value += 0.3
-        elif self.current_design['body_style'] == 'suv':
-            value += 0.2
-        
-        # Wheels affect stats
-        if self.current_design['wheel_style'] == 'sport':
-            speed += 0.2
-            style += 0.1
-        elif self.current_design['wheel_style'] == 'luxury':
-            style += 0.3
-        
-        # Decals and spoilers affect style
-        if self.current_design['decal'] != 'none':
-            style += 0.1
-        if self.current_design['spoiler'] != 'none':
-            speed += 0.1
-            style += 0.1
+        # Stats are looked up in the precomputed configuration space
+        _, (speed, style, value) = self.space.score(self.current_design)
         
         # Update progress bars
         self.speed_stat.value = min(speed, 1.0)
         self.style_stat.value = min(style, 1.0)
         self.value_stat.value = min(value, 1.0)
     
+    def show_best_designs(self):
+        """List the designs within budget where paying more buys a better score, best first"""
+        objective = self.objective_select.value
+        self.best_designs_container.clear()
+        with self.best_designs_container:
+            configs = self.space.pareto(objective, self.budget)[::-1][:5]
+            if not configs:
+                ui.label('Nothing fits the budget.').classes('text-gray-500')
+            for config in configs:
+                with ui.row().classes('w-full justify-between items-center'):
+                    names = ', '.join(self.catalog.part(category, part_id).name
+                                      for category, part_id in zip(CATEGORIES, config.parts) if part_id != 'none')
+                    ui.label(f"{names}: {config.score(objective):.1f} for ${config.price:,}")
+                    ui.button('Apply', on_click=lambda c=config: self.apply_config(c)).props('flat dense')
+    
+    def apply_config(self, config):
+        """Switch the current design to the parts of an optimizer result"""
+        self.current_design.update(config.design)
+        self.update_price()
+        self.update_stats()
+        ui.notify(f'Applied parts for ${config.price:,}', type='positive')
+    
     def save_design(self):
         """Save the current design"""
         if self.price > self.budget:
             ui.notify('Cannot save: Over budget!', type='negative')
             return
         
+        design_id = datetime.now().isoformat()
+        while design_id in self.saved_designs:
+            design_id += '+'
         design = {
-            'id': datetime.now().isoformat(),
+            'id': design_id,
             'name': self.current_design['name'],
             'design': self.current_design.copy(),
             'price': self.price,
             'date': datetime.now().strftime('%Y-%m-%d %H:%M')
         }
         
-        self.saved_designs.append(design)
+        self.saved_designs[design_id] = design
+        self.saved_order.append(design_id)
         self.update_saved_designs_display()
         ui.notify(f'Saved "{design["name"]}" successfully!', type='positive')
     
+    def on_saved_scroll(self, e):
+        """Render the saved designs scrolled into view"""
+        self.saved_view = (e.args['verticalPosition'], e.args['verticalContainerSize'])
+        self.update_saved_designs_display()
+    
     def update_saved_designs_display(self):
-        """Update the saved designs display"""
-        self.saved_designs_container.clear()
+        """Update the saved designs display, keeping the cards that stay in view"""
+        order = self.saved_order
+        position, height = self.saved_view
+        first = max(0, int(position // SAVED_ROW_HEIGHT) - SAVED_OVERSCAN)
+        last = min(len(order), int((position + height) // SAVED_ROW_HEIGHT) + 1 + SAVED_OVERSCAN)
+        visible = order.slice(first, last)
         
-        if not self.saved_designs:
-            with self.saved_designs_container: (ui.label('No saved designs yet. Create your first design!').classes('text-gray-500'))
-            return
+        for design_id in self.saved_cards.keys() - set(visible):
+            card = self.saved_cards.pop(design_id)
+            card.card.set_visibility(False)
+            self.spare_cards.append(card)
+        cards = self.saved_designs_container.default_slot.children
+        for index, design_id in enumerate(visible):
+            card = self.saved_cards.get(design_id)
+            if card is None:
+                if self.spare_cards:
+                    card = self.spare_cards.pop()
+                else:
+                    with self.saved_designs_container:
+                        card = SavedDesignCard(self)
+                card.show(self.saved_designs[design_id])
+                self.saved_cards[design_id] = card
+            if cards[index] is not card.card:
+                card.card.move(target_index=index)
         
-        for design in self.saved_designs:
-            with self.saved_designs_container:
-                with ui.card().classes('w-full p-4 mb-2'):
-                    with ui.row().classes('w-full justify-between items-center'):
-                        ui.label(design['name']).classes('font-bold text-lg')
-                        ui.label(f"${design['price']:,}").classes('text-green-600 font-bold')
-                    
-                    with ui.row().classes('w-full justify-between items-center mt-2'):
-                        ui.label(f"Date: {design['date']}").classes('text-sm text-gray-600')
-                        with ui.row().classes('gap-2'):
-                            ui.button('Load', on_click=lambda d=design: self.load_design(d)).props('flat')
-                            ui.button('Delete', on_click=lambda d=design: self.delete_design(d)).props('flat', color='red')
+        self.saved_top_spacer.style(f'height: {first * SAVED_ROW_HEIGHT}px')
+        self.saved_bottom_spacer.style(f'height: {(len(order) - last) * SAVED_ROW_HEIGHT}px')
+        self.saved_empty_label.set_visibility(not order)
+        self.saved_count_label.set_text(f'{len(order):,} saved designs' if order else '')
     
     def load_design(self, design):
         """Load a saved design"""
         self.current_design = design['design'].copy()
+        self.fill_missing_parts()
         self.update_price()
         self.update_stats()
         ui.notify(f'Loaded "{design["name"]}"', type='positive')
     
     def delete_design(self, design):
         """Delete a saved design"""
-        self.saved_designs.remove(design)
+        if self.saved_designs.pop(design['id'], None) is None:
+            return
+        self.saved_order.remove(design['id'])
         self.update_saved_designs_display()
         ui.notify(f'Deleted "{design["name"]}"', type='info')
     
@@ -482,10 +690,10 @@ class CarDesignGame:
             'body_color': f'#{random.randint(0, 255):02x}{random.randint(0, 255):02x}{random.randint(0, 255):02x}',
             'roof_color': f'#{random.randint(0, 255):02x}{random.randint(0, 255):02x}{random.randint(0, 255):02x}',
             'wheel_color': f'#{random.randint(0, 255):02x}{random.randint(0, 255):02x}{random.randint(0, 255):02x}',
-            'body_style': random.choice(list(self.body_styles.keys())),
-            'wheel_style': random.choice(list(self.wheel_styles.keys())),
-            'decal': random.choice(list(self.decals.keys())),
-            'spoiler': random.choice(list(self.spoilers.keys())),
+            'body_style': random.choice(self.catalog.ids['body_style']),
+            'wheel_style': random.choice(self.catalog.ids['wheel_style']),
+            'decal': random.choice(self.catalog.ids['decal']),
+            'spoiler': random.choice(self.catalog.ids['spoiler']),
             'name': f'Random Design #{random.randint(1000, 9999)}'
         })
         self.update_price()
@@ -505,27 +713,66 @@ class CarDesignGame:
             'spoiler': 'none',
             'name': 'My Car Design'
         }
+        self.fill_missing_parts()
         self.update_price()
         self.update_stats()
         ui.notify('Design reset to default', type='info')
     
-    def take_screenshot(self):
-        """Simulate taking a screenshot"""
+    async def take_screenshot(self):
+        """Download a render of the current design"""
+        url, = await car_renders.urls([self.current_design])
+        ui.download.from_url(url, f"{self.current_design['name']}.svg")
         ui.notify('📸 Screenshot saved!', type='positive')
     
     def load_from_file(self):
-        """Load designs from file (simulated)"""
-        ui.notify('File loading feature coming soon!', type='info')
+        """Open the import dialog"""
+        # the upload is only built on demand: its route stays cached by FastAPI after the page is gone
+        self.import_area.clear()
+        with self.import_area:
+            ui.upload(label='Design archive (.ndjson.gz)', auto_upload=True,
+                      on_upload=self.import_designs).props('accept=.gz,.ndjson,.json')
+        self.import_dialog.open()
+    
+    async def import_designs(self, e: events.UploadEventArguments):
+        """Add the designs of an uploaded archive to the saved designs, read chunk by chunk"""
+        importer = DesignImporter(self.catalog, self.add_saved_designs, taken_ids=self.saved_designs,
+                                  known={design_hash(saved['design']) for saved in self.saved_designs.values()})
+        try:
+            async for chunk in e.file.iterate():
+                importer.write(chunk)
+                await asyncio.sleep(0)
+            report = importer.close()
+        except ValueError as error:
+            ui.notify(f'Import failed: {error}', type='negative')
+            return
+        finally:
+            self.update_saved_designs_display()  # batches already added stay
+        self.import_dialog.close()
+        summary = f'Imported {report.imported} designs'
+        if report.duplicates:
+            summary += f', {report.duplicates} already saved'
+        if report.skipped:
+            ui.notify(f'{summary}, skipped {report.skipped} ({"; ".join(report.errors[:3])})',
+                      type='warning', multi_line=True)
+        else:
+            ui.notify(f'{summary}!', type='positive')
+    
+    def add_saved_designs(self, designs: List[dict]):
+        for design in designs:
+            self.saved_designs[design['id']] = design
+            self.saved_order.append(design['id'])
     
     def export_designs(self):
-        """Export designs to file (simulated)"""
+        """Download all saved designs as an archive"""
         if not self.saved_designs:
             ui.notify('No designs to export!', type='warning')
             return
         
-        # In a real app, this would save to a file
-        export_data = json.dumps(self.saved_designs, indent=2)
-        ui.notify(f'Exported {len(self.saved_designs)} designs!', type='positive')
+        if self.export_token is None:
+            self.export_token = secrets.token_urlsafe(16)
+            exports[self.export_token] = self
+        ui.download.from_url(f'/car_designs/export/{self.export_token}', 'car-designs.ndjson.gz')
+        ui.notify(f'Exporting {len(self.saved_designs)} designs...', type='positive')
     
     def adjust_color(self, hex_color, amount):
         """Adjust a hex color by a certain amount"""
@@ -2,6 +2,8 @@ from nicegui import ui
 import time
 import random
 
+from event_coalescing import latest
+
 class Laptop3DGame:
     def __init__(self):
         self.username = ""
@@ -257,25 +259,28 @@ class Laptop3DGame:
                 self.drag_start_y = e.args['clientY']
                 self.start_rotation_x = self.laptop_rotation_x
                 self.start_rotation_y = self.laptop_rotation_y
-                
-                def on_mouse_move(e):
-                    if hasattr(self, 'drag_start_x'):
-                        dx = e.args['clientX'] - self.drag_start_x
-                        dy = e.args['clientY'] - self.drag_start_y
-                        self.laptop_rotation_y = self.start_rotation_y + dx * 0.5
-                        self.laptop_rotation_x = self.start_rotation_x - dy * 0.5
-                        self.laptop_3d.style(f'transform: rotateX({self.laptop_rotation_x}deg) rotateY({self.laptop_rotation_y}deg)')
-                
-                def on_mouse_up():
-                    if hasattr(self, 'drag_start_x'):
-                        del self.drag_start_x
-                        del self.drag_start_y
-                
-                self.laptop_3d.on('mousemove', on_mouse_move)
-                self.laptop_3d.on('mouseup', on_mouse_up)
-                self.laptop_3d.on('mouseleave', on_mouse_up)
             
-            self.laptop_3d.on('mousedown', on_mouse_down)
+            def on_mouse_move(e):
+                if hasattr(self, 'drag_start_x'):
+                    dx = e.args['clientX'] - self.drag_start_x
+                    dy = e.args['clientY'] - self.drag_start_y
+                    self.laptop_rotation_y = self.start_rotation_y + dx * 0.5
+                    self.laptop_rotation_x = self.start_rotation_x - dy * 0.5
+                    self.laptop_3d.style(f'transform: rotateX({self.laptop_rotation_x}deg) rotateY({self.laptop_rotation_y}deg)')
+            
+            # Only the latest position matters: restyle at most 30 times a second
+            drag = latest(30, name='laptop drag')(on_mouse_move)
+            
+            def on_mouse_up():
+                drag.flush()  # end on the last position
+                if hasattr(self, 'drag_start_x'):
+                    del self.drag_start_x
+                    del self.drag_start_y
+            
+            self.laptop_3d.on('mousedown', on_mouse_down, ['clientX', 'clientY'])
+            self.laptop_3d.on('mousemove', drag, ['clientX', 'clientY'], throttle=1 / 60)
+            self.laptop_3d.on('mouseup', on_mouse_up)
+            self.laptop_3d.on('mouseleave', on_mouse_up)
 
 
 game = Laptop3DGame()
@@ -1,6 +1,8 @@
 from nicegui import ui
 import time
 
+from event_coalescing import debounce
+
 
 PRODUCTS = [
     {"id": 1, "name": "Wireless Mouse", "category": "Electronics", "price": 29.99},
@@ -43,6 +45,13 @@ def perform_search():
     loading = False
     results_refresh()
 
+# typing searches once the keystrokes pause; Enter and the buttons search right away
+search_typed = debounce(0.3, name='product search')(perform_search)
+
+def search_now():
+    search_typed.cancel()
+    perform_search()
+
 def results_refresh():
     results_container.clear()
     
@@ -75,7 +84,7 @@ def history_refresh():
                 for term in search_history[-5:]:  # Show last 5 searches
                     ui.button(term, on_click=lambda t=term: (
                         search_input.set_value(t),
-                        perform_search()
+                        search_now()
                     )).props('flat dense').classes('text-sm')
 
 
@@ -87,10 +96,10 @@ with ui.column().classes('w-full max-w-3xl mx-auto p-4'):
     with ui.row().classes('w-full gap-2'):
         search_input = ui.input(
             placeholder='Search products...',
-            on_change=lambda: perform_search()
+            on_change=search_typed
         ).props('outlined clearable').classes('flex-grow')
         
-        ui.button('Search', on_click=perform_search).props('color=primary')
+        ui.button('Search', on_click=search_now).props('color=primary')
     
  
     history_container = ui.column().classes('w-full mt-2')
@@ -115,7 +124,7 @@ def on_results_change():
 
 
 search_input.on('change', lambda: on_results_change())
-search_input.on('keyup.enter', lambda: perform_search())
+search_input.on('keyup.enter', search_now)
 
 
 update_counter()
@@ -0,0 +1,61 @@
+"""Export/import throughput of design archives in designs/sec.
+
+The store is filled with 20×20 designs, exported to an archive file and imported into an
+empty store. Reading version 1 (per-cell JSON) archives is timed on a smaller sample. With
+--memory the peak Python allocation of each direction is traced as well (which slows the
+timings down): it stays at about one import batch however many designs the archive holds.
+
+    python bench_archive.py [designs] [--memory]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_design_store import legacy_save, random_grid
+from house_archive import export_designs, import_designs
+from house_store import DesignStore, encode_grid
+
+def measured(func, trace: bool):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = ''
+    if trace:
+        peak = f'  peak {tracemalloc.get_traced_memory()[1] / 1e6:5.2f} MB'
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def bench(count: int, trace: bool):
+    with tempfile.TemporaryDirectory() as directory:
+        source = DesignStore(os.path.join(directory, 'source.sqlite3'))
+        grids = [random_grid(20, seed) for seed in range(50)]
+        blobs = [encode_grid(grid) for grid in grids]
+        source.save_many((f'Design {n}', float(n), 20, blobs[n % len(blobs)]) for n in range(count))
+        path = os.path.join(directory, 'designs.ndjson')
+
+        with open(path, 'wb') as file:
+            written, elapsed, peak = measured(lambda: export_designs(source, file), trace)
+        size = os.path.getsize(path)
+        print(f'export {written:7d} designs  {written / elapsed:9.0f} designs/s  {size / 1e6:6.1f} MB{peak}')
+
+        target = DesignStore(os.path.join(directory, 'target.sqlite3'))
+        with open(path, 'rb') as file:
+            report, elapsed, peak = measured(lambda: import_designs(target, file), trace)
+        print(f'import {report.imported:7d} designs  {report.imported / elapsed:9.0f} designs/s  {"":9s}{peak}')
+
+        sample = min(count, 500)
+        legacy = '\n'.join(legacy_save(f'Design {n}', grids[n % len(grids)]) for n in range(sample)).encode()
+        report, elapsed, peak = measured(lambda: import_designs(target, io.BytesIO(legacy)), trace)
+        print(f'import {report.imported:7d} v1       {report.imported / elapsed:9.0f} designs/s  '
+              f'{len(legacy) / 1e6:6.1f} MB{peak}')
+        source.close()
+        target.close()
+
+if __name__ == '__main__':
+    arguments = [argument for argument in sys.argv[1:] if argument != '--memory']
+    bench(int(arguments[0]) if arguments else 50000, '--memory' in sys.argv)
@@ -0,0 +1,72 @@
+"""Export/import throughput of car design archives in designs/sec.
+
+N saved designs (random designs of the default catalog) are exported to a gzip-compressed
+archive and imported back in upload-sized chunks, once into an empty collection and once
+into the collection that already holds them, where every design is a duplicate. An
+uncompressed archive is imported too. With --memory the peak Python allocation of each
+direction is traced as well (which slows the timings down): exporting stays at about one
+compressed chunk however many designs the archive holds, importing grows only with the
+content hashes and ids kept to spot duplicates.
+
+    python bench_car_archive.py [designs] [--memory]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bench_renders import random_designs
+from car_archive import CHUNK_SIZE, DesignImporter, design_hash, export_lines, gzip_chunks
+from car_catalog import DEFAULT_PATH, load_catalog
+from car_configs import config_space
+
+def measured(func, trace: bool):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = ''
+    if trace:
+        peak = f'  peak {tracemalloc.get_traced_memory()[1] / 1e6:5.2f} MB'
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def saved_designs(count: int):
+    space = config_space(load_catalog(DEFAULT_PATH))
+    designs = random_designs(1000)
+    start = datetime(2026, 1, 1)
+    for n in range(count):
+        design = {**designs[n % len(designs)], 'name': f'Design {n}'}
+        date = start + timedelta(minutes=n)
+        yield {'id': date.isoformat(), 'name': design['name'], 'design': design,
+               'price': space.score(design)[0], 'date': date.strftime('%Y-%m-%d %H:%M')}
+
+def import_archive(catalog, archive: bytes, known=None):
+    added = []
+    importer = DesignImporter(catalog, lambda designs: added.append(len(designs)), known=known)
+    for start in range(0, len(archive), CHUNK_SIZE):
+        importer.write(archive[start:start + CHUNK_SIZE])
+    return importer.close()
+
+def bench(count: int, trace: bool):
+    catalog = load_catalog(DEFAULT_PATH)
+    designs = list(saved_designs(count))
+    chunks, elapsed, peak = measured(lambda: [len(chunk) for chunk in gzip_chunks(export_lines(designs))], trace)
+    print(f'export  {count:7d} designs  {count / elapsed:9.0f} designs/s  {sum(chunks) / 1e6:6.2f} MB gzip{peak}')
+    archive = b''.join(gzip_chunks(export_lines(designs)))
+    plain = b''.join(export_lines(designs))
+
+    for label, data in (('import ', archive), ('plain  ', plain)):
+        report, elapsed, peak = measured(lambda: import_archive(catalog, data), trace)
+        print(f'{label} {report.imported:7d} designs  {report.imported / elapsed:9.0f} designs/s  '
+              f'{len(data) / 1e6:6.2f} MB     {peak}')
+
+    known = {design_hash(saved['design']) for saved in designs}
+    report, elapsed, peak = measured(lambda: import_archive(catalog, archive, known), trace)
+    print(f'again   {report.duplicates:7d} dupes    {report.duplicates / elapsed:9.0f} designs/s  '
+          f'{"":14s}{peak}')
+
+if __name__ == '__main__':
+    arguments = [argument for argument in sys.argv[1:] if argument != '--memory']
+    bench(int(arguments[0]) if arguments else 50000, '--memory' in sys.argv)
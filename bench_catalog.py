@@ -0,0 +1,89 @@
+"""Cost of the shared car parts catalog as it grows.
+
+A catalog with N extra parts per category is written to a temporary file and loaded once;
+then Car Design Studio pages are built against it in detached clients. Page build time and
+memory allocated per session stay flat, since sessions share the catalog and only list the
+cheapest matches of large categories. Search and price-range queries are timed on the indexes.
+
+    python bench_catalog.py [parts per category]
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from nicegui import Client, core, run
+from nicegui.page import page
+
+from car_catalog import CATEGORIES, DEFAULT_PATH, load_catalog
+
+spec = importlib.util.spec_from_file_location('car_studio', os.path.join(os.path.dirname(__file__), '1nicegui.project.py'))
+studio = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(studio)
+
+def write_catalog(path: str, count: int):
+    with open(DEFAULT_PATH, encoding='utf-8') as file:
+        data = json.load(file)
+    for category in CATEGORIES:
+        data['categories'][category] += [
+            {'id': f'{category}-{n}', 'name': f'{category.replace("_", " ").title()} {n}', 'price': 100 + n * 37 % 9000,
+             'emoji': '🔧', 'stats': {'style': n % 10 / 100}}
+            for n in range(count)]
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+
+def build_page(trace: bool = False) -> tuple:
+    """Build time in ms (or MB allocated, when traced) and element count of one page."""
+    with Client(page('/'), request=None) as client:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        studio.CarDesignGame()
+        result = (time.perf_counter() - start) * 1000
+        if trace:
+            result = tracemalloc.get_traced_memory()[0] / 1e6
+            tracemalloc.stop()
+        elements = len(client.elements)
+    client.delete()
+    return result, elements
+
+def bench(count: int):
+    build_page()  # warm up
+    for parts in (0, count):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'parts.json')
+            write_catalog(path, parts)
+            start = time.perf_counter()
+            catalog = studio.parts_catalog.catalog = load_catalog(path)
+            loaded = (time.perf_counter() - start) * 1000
+        total = sum(len(catalog.parts[category]) for category in CATEGORIES)
+        build_ms = min(build_page()[0] for _ in range(5))
+        allocated, elements = build_page(trace=True)
+        print(f'{total:6d} parts  loaded in {loaded:6.1f} ms  page {build_ms:5.1f} ms  '
+              f'{allocated:5.2f} MB/session  {elements} elements')
+    runs = 1000
+    start = time.perf_counter()
+    for n in range(runs):
+        catalog.search('decal', str(n % 100), 5000, studio.SHOWN_PARTS)
+    search_us = (time.perf_counter() - start) / runs * 1e6
+    start = time.perf_counter()
+    for n in range(runs):
+        catalog.price_range('decal', n, n + 500)
+    range_us = (time.perf_counter() - start) / runs * 1e6
+    print(f'search {search_us:.1f} µs  price range {range_us:.1f} µs')
+
+async def warm_renders():
+    """Render the default design and the presets, as a running server has long done by then."""
+    core.loop = asyncio.get_running_loop()
+    run.setup()
+    default = {'body_style': 'sports', 'wheel_style': 'sport', 'decal': 'none', 'spoiler': 'none'}
+    await studio.car_renders.urls([default, *studio.parts_catalog.get().presets])
+    run.process_pool.shutdown()
+
+if __name__ == '__main__':
+    asyncio.run(warm_renders())
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,82 @@
+"""Chunked plans: memory, edit, serialization and viewport cost on a 10,000×10,000 grid.
+
+A number of 24×24 walled rooms with floor are scattered over the plan. Memory is compared to
+the six bytes per cell the flat ``HouseGrid`` arrays would need; the viewport numbers are the
+server time and payload for scrolling a 25×19 chunk view (800×600 px at one pixel per cell)
+to the middle of the plan.
+
+    python bench_chunks.py [rooms]
+"""
+import json
+import random
+import sys
+import time
+
+from house_chunks import CHUNK, ChunkedGrid
+from house_model import RoomType, TileType, make_tile
+from house_render import ChunkViewport, GridInput, describe_tile
+from house_store import decode_chunked, encode_grid
+from house_thumbnails import render_png
+
+SIZE = 10_000
+ROOM = 24
+
+def build(rooms: int) -> ChunkedGrid:
+    rng = random.Random(1)
+    grid = ChunkedGrid(SIZE)
+    wall = make_tile(TileType.WALL, color='#808080')
+    floor = make_tile(TileType.FLOOR, room_type=RoomType.BEDROOM, color='#8B4513')
+    for _ in range(rooms):
+        top, left = rng.randrange(SIZE - ROOM), rng.randrange(SIZE - ROOM)
+        for x in range(top, top + ROOM):
+            for y in range(left, left + ROOM):
+                edge = x in (top, top + ROOM - 1) or y in (left, left + ROOM - 1)
+                grid.set(x, y, wall if edge else floor)
+    return grid
+
+def viewport() -> ChunkViewport:
+    """A viewport outside any page; ``run_method`` calls are recorded instead of sent."""
+    view = ChunkViewport.__new__(ChunkViewport)
+    view.size, view.describe, view.max_cached = SIZE, describe_tile, 4096
+    view.palette, view.palette_ids, view.unsent_palette, view.code_palette_ids = [], {}, [], {}
+    view.sent, view.view, view.grid, view.initialized = set(), (0, 0, -1, -1), None, True
+    view.calls = []
+    view.run_method = lambda name, *args: view.calls.append((name, args))
+    return view
+
+def bench(rooms: int):
+    start = time.perf_counter()
+    grid = build(rooms)
+    build_s = time.perf_counter() - start
+    cells = rooms * ROOM * ROOM
+    print(f'{rooms} rooms on {SIZE}x{SIZE}: {cells / build_s / 1e3:.0f}k cell writes/s, '
+          f'{len(grid.chunks)} chunks, {grid.nbytes / 1e6:.1f} MB (flat arrays: {6 * SIZE * SIZE / 1e6:.0f} MB)')
+
+    start = time.perf_counter()
+    data = encode_grid(grid)
+    encode_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    decoded = decode_chunked(data)
+    decode_ms = (time.perf_counter() - start) * 1000
+    assert decoded.chunks == grid.chunks and decoded.stats.walls == grid.stats.walls
+    print(f'encode {encode_ms:7.1f} ms   decode {decode_ms:7.1f} ms   {len(data) / 1e3:.0f} kB')
+    start = time.perf_counter()
+    render_png(data)
+    print(f'thumbnail {(time.perf_counter() - start) * 1000:7.1f} ms')
+
+    view = viewport()
+    view.render(grid, ())
+    middle = (SIZE // CHUNK // 2, SIZE // CHUNK // 2)
+    start = time.perf_counter()
+    view._handle_view(middle[0], middle[1], middle[0] + 18, middle[1] + 24)
+    view_ms = (time.perf_counter() - start) * 1000
+    sent = sum(len(json.dumps(args)) for _, args in view.calls)
+    print(f'scroll into view: {len(view.sent)} chunks in {view_ms:.1f} ms, {sent / 1e3:.1f} kB '
+          f'(raw cells would be {len(view.sent) * CHUNK * CHUNK * 4 / 1e3:.0f} kB)')
+    view.calls.clear()
+    start = time.perf_counter()
+    view._handle_view(middle[0], middle[1], middle[0] + 18, middle[1] + 24)
+    print(f'same view again:  {(time.perf_counter() - start) * 1000:.2f} ms, {len(view.calls)} messages')
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
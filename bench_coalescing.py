@@ -0,0 +1,48 @@
+"""Event coalescing under a burst: how often a costly handler runs and how busy the loop gets.
+
+A burst of events arrives every ``gap`` seconds (as from a color picker being dragged or a
+mouse moving) and each handler run costs ~``cost`` seconds of CPU, like repricing and
+re-rendering. Direct handling runs it for every event; the coalesced modes drop stale events
+and run it on the latest one only.
+
+    python bench_coalescing.py [events] [gap ms] [cost ms]
+"""
+import asyncio
+import sys
+import time
+
+from nicegui import core
+
+from event_coalescing import Coalescer
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+async def burst(handler, events: int, gap: float) -> float:
+    """Wall time until the burst and its trailing handler runs are done."""
+    start = time.perf_counter()
+    for n in range(events):
+        handler(n)
+        await asyncio.sleep(gap)
+    await asyncio.sleep(0.5)  # let trailing runs happen
+    return time.perf_counter() - start - 0.5
+
+async def bench(events: int, gap: float, cost: float):
+    core.loop = asyncio.get_running_loop()
+    runs = []
+    elapsed = await burst(lambda n: (runs.append(n), busy(cost)), events, gap)
+    print(f'{"direct":10s} {len(runs):6d} runs  {elapsed * 1000:8.1f} ms  last {runs[-1]}')
+    for mode, interval in (('debounce', 0.1), ('throttle', 0.1), ('latest', 1 / 30)):
+        runs = []
+        coalescer = Coalescer(lambda n: (runs.append(n), busy(cost)), mode, interval)
+        elapsed = await burst(coalescer, events, gap)
+        counts = coalescer.counts
+        print(f'{mode:10s} {counts.processed:6d} runs  {elapsed * 1000:8.1f} ms  last {runs[-1]}  '
+              f'(received {counts.received}, dropped {counts.dropped})')
+
+if __name__ == '__main__':
+    arguments = [float(argument) for argument in sys.argv[1:]]
+    events, gap, cost = arguments + [1000, 1, 5][len(arguments):]
+    asyncio.run(bench(int(events), gap / 1000, cost / 1000))
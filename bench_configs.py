@@ -0,0 +1,54 @@
+"""Build and query cost of the car configuration space for growing catalogs.
+
+Every category gets N parts with random prices and stat bonuses. The space is tabulated in
+full while it is small; budget queries always go through the per-objective frontiers, whose
+first build prunes each category and meets in the middle instead of enumerating N⁴ designs.
+
+    python bench_configs.py [parts per category ...]
+"""
+import random
+import sys
+import time
+from types import MappingProxyType
+
+from car_catalog import CATEGORIES, STATS, Catalog, Part
+from car_configs import OBJECTIVES, ConfigSpace
+
+def random_catalog(count: int, seed: int = 1) -> Catalog:
+    rng = random.Random(seed)
+    return Catalog({category: [Part(category, f'{category}-{n}', f'{category} {n}', rng.randrange(0, 20000, 50), '',
+                                    MappingProxyType({stat: rng.randrange(0, 40) / 100
+                                                      for stat in STATS if rng.random() < 0.6}))
+                               for n in range(count)]
+                    for category in CATEGORIES}, [])
+
+def bench(counts):
+    print(f'{"parts":>6s} {"designs":>9s} {"build ms":>9s} {"frontiers ms":>13s} {"score µs":>9s} '
+          f'{"best µs":>8s} {"pareto µs":>10s}')
+    for count in counts:
+        catalog = random_catalog(count)
+        start = time.perf_counter()
+        space = ConfigSpace(catalog)
+        built = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for objective in OBJECTIVES:
+            space.frontier_table(objective)
+        frontiers = (time.perf_counter() - start) * 1000
+        design = {category: catalog.ids[category][count // 2] for category in CATEGORIES}
+        runs = 10000
+        start = time.perf_counter()
+        for _ in range(runs):
+            space.score(design)
+        score_us = (time.perf_counter() - start) / runs * 1e6
+        start = time.perf_counter()
+        for n in range(runs):
+            space.best(OBJECTIVES[n % len(OBJECTIVES)], 20000 + n)
+        best_us = (time.perf_counter() - start) / runs * 1e6
+        start = time.perf_counter()
+        for n in range(runs):
+            space.pareto(OBJECTIVES[n % len(OBJECTIVES)], 20000 + n)
+        pareto_us = (time.perf_counter() - start) / runs * 1e6
+        print(f'{count:6d} {space.size:9.1e} {built:9.1f} {frontiers:13.1f} {score_us:9.2f} {best_us:8.2f} {pareto_us:10.2f}')
+
+if __name__ == '__main__':
+    bench([int(argument) for argument in sys.argv[1:]] or [5, 17, 100, 1000, 5000])
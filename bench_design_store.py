@@ -0,0 +1,90 @@
+"""Save/load latency of the SQLite design store against the old in-memory JSON-dict format.
+
+The store is pre-filled with many designs first to show that listing, loading and deleting
+do not slow down as the collection grows.
+
+    python bench_design_store.py [designs]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from house_model import FurnitureType, HouseGrid, RoomType, TileType, make_tile
+from house_store import DesignStore, encode_grid
+
+def random_grid(size: int, seed: int) -> HouseGrid:
+    rng = random.Random(seed)
+    grid = HouseGrid(size)
+    for i in range(size // 4, size - size // 4):
+        for edge in (size // 4, size - size // 4 - 1):
+            grid.set(edge, i, make_tile(TileType.WALL, color="#8B4513"))
+            grid.set(i, edge, make_tile(TileType.WALL, color="#8B4513"))
+    for _ in range(size * size // 4):
+        x, y = rng.randrange(size), rng.randrange(size)
+        grid.set(x, y, make_tile(TileType.FLOOR, room_type=rng.choice(list(RoomType)), color="#DEB887"))
+    for _ in range(size):
+        x, y = rng.randrange(size), rng.randrange(size)
+        grid.set(x, y, make_tile(TileType.FURNITURE, furniture_type=rng.choice(list(FurnitureType)), color="#4682B4"))
+    return grid
+
+def legacy_save(name: str, grid: HouseGrid) -> str:
+    return json.dumps({
+        'name': name,
+        'grid': [[{
+            'type': tile.type.value,
+            'room_type': tile.room_type.value if tile.room_type else None,
+            'furniture_type': tile.furniture_type.value if tile.furniture_type else None,
+            'color': tile.color
+        } for tile in row] for row in grid]
+    })
+
+def legacy_load(data: str, grid: HouseGrid):
+    design = json.loads(data)
+    for i, row in enumerate(design['grid']):
+        for j, tile_data in enumerate(row):
+            grid.set(i, j, make_tile(
+                TileType(tile_data['type']),
+                RoomType(tile_data['room_type']) if tile_data['room_type'] else None,
+                FurnitureType(tile_data['furniture_type']) if tile_data['furniture_type'] else None,
+                tile_data['color']
+            ))
+
+def timed(func, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main(prefill: int):
+    with tempfile.TemporaryDirectory() as directory:
+        store = DesignStore(os.path.join(directory, 'designs.sqlite3'))
+        grids = [random_grid(20, seed) for seed in range(50)]
+        start = time.perf_counter()
+        for n in range(prefill):
+            store.save(f'Design {n}', grids[n % len(grids)])
+        print(f'prefilled {prefill} designs in {time.perf_counter() - start:.1f} s, '
+              f'db size {os.path.getsize(os.path.join(directory, "designs.sqlite3")) / 1e6:.1f} MB')
+
+        for size in (20, 200):
+            grid = random_grid(size, 1)
+            target = HouseGrid(size)
+            legacy = legacy_save('bench', grid)
+            design_id = store.save('bench', grid)
+            repeat = 200 if size == 20 else 10
+            print(f'\n{size}x{size} grid: legacy JSON {len(legacy):,} B, encoded {len(encode_grid(grid)):,} B')
+            print(f'  legacy save   {timed(lambda: legacy_save("bench", grid), repeat):10.1f} us')
+            print(f'  legacy load   {timed(lambda: legacy_load(legacy, target), repeat):10.1f} us')
+            print(f'  store save    {timed(lambda: store.save("bench", grid), repeat):10.1f} us')
+            print(f'  store load    {timed(lambda: target.assign(store.load(design_id)[1]), repeat):10.1f} us')
+
+        print(f'\nstore list 50  {timed(lambda: store.list(20, limit=50)):10.1f} us')
+        print(f'store by name  {timed(lambda: store.list(20, name="Design 7")):10.1f} us')
+        ids = [info.id for info in store.list(20, limit=200)]
+        print(f'store delete   {timed(lambda: store.delete(ids.pop()), 200):10.1f} us')
+        store.close()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,91 @@
+"""Community gallery queries with many shared designs.
+
+The gallery is filled with N random designs of the default catalog, reopened (rebuilding
+the in-memory rankings from SQLite) and queried for the top designs by every ranking, with
+and without a budget. Listing the gallery in a Car Design Studio page reuses its cards.
+
+    python bench_gallery.py [designs]
+"""
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+
+from nicegui import Client, core, run
+from nicegui.page import page
+
+from bench_renders import random_designs
+from car_catalog import DEFAULT_PATH, load_catalog
+from car_configs import config_space
+from car_gallery import RANKINGS, CarGallery
+
+def bench(count: int):
+    space = config_space(load_catalog(DEFAULT_PATH))
+    designs = random_designs(1000)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'gallery.sqlite3')
+        gallery = CarGallery(path)
+        start = time.perf_counter()
+        gallery.publish_many((design['name'], design, *space.score(design)) for design in
+                             (random.Random(n).choice(designs) for n in range(count)))
+        print(f'{count:,} designs stored in {(time.perf_counter() - start) * 1000:.0f} ms')
+        gallery.close()
+        start = time.perf_counter()
+        gallery = CarGallery(path)
+        print(f'reopened with rankings in {(time.perf_counter() - start) * 1000:.0f} ms')
+
+        runs = 200
+        for budget in (None, 50000, 30000, 25000):
+            timings = []
+            for ranking in RANKINGS:
+                start = time.perf_counter()
+                for _ in range(runs):
+                    gallery.top(ranking, 50, budget)
+                timings.append(f'{ranking} {(time.perf_counter() - start) / runs * 1e6:6.1f}')
+            print(f'top 50 µs, budget {budget or "-":>6}: ' + '  '.join(timings))
+        start = time.perf_counter()
+        for n in range(runs):
+            gallery.publish(f'Design {n}', designs[n], *space.score(designs[n]))
+        print(f'publish {(time.perf_counter() - start) / runs * 1000:.2f} ms')
+
+        studio.car_gallery = gallery
+        with Client(page('/'), request=None) as client:
+            game = studio.CarDesignGame()
+            for budget in (False, True):  # every listing once, creating the cards
+                game.within_budget.value = budget
+                for ranking in RANKINGS:
+                    game.ranking_select.value = ranking
+            timings = []
+            for n in range(runs):
+                game.ranking_select.value = RANKINGS[n % len(RANKINGS)]
+                start = time.perf_counter()
+                game.show_community_designs()
+                timings.append(time.perf_counter() - start)
+            print(f'gallery listing {sorted(timings)[runs // 2] * 1000:.2f} ms (median), {len(client.elements)} elements')
+        client.delete()
+        gallery.close()
+
+async def main(count: int):
+    """Render the designs the gallery will show, as a running server has long done by then.
+
+    The benchmark runs on the same loop, where the studio's page can start its render tasks.
+    """
+    core.loop = asyncio.get_running_loop()
+    run.setup()
+    try:
+        await studio.car_renders.urls(random_designs(1000))
+        bench(count)
+    finally:
+        run.process_pool.shutdown()
+
+os.environ.setdefault('CAR_GALLERY_DB', ':memory:')  # replaced by the benchmark's gallery
+spec = importlib.util.spec_from_file_location('car_studio', os.path.join(os.path.dirname(__file__), '1nicegui.project.py'))
+studio = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(studio)
+
+if __name__ == '__main__':
+    designs = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    asyncio.run(main(designs))
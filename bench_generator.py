@@ -0,0 +1,45 @@
+"""Throughput of the BSP house generator and cost of applying compiled templates.
+
+Templates are compared against rebuilding them with ``grid.clear()`` and per-cell ``grid.set``.
+
+    python bench_generator.py [seconds per size]
+"""
+import sys
+import time
+
+from house_generator import generate_layouts
+from house_model import HouseGrid
+from house_templates import TEMPLATES, compile_template
+
+def layouts_per_second(size: int, seconds: float) -> float:
+    count, batch = 0, 10
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        generate_layouts(size, batch, seed=count)
+        count += batch
+    return count / (time.perf_counter() - start)
+
+def timed(func, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main(seconds: float):
+    print(f'{"grid":9s} {"layouts/s":>10s}')
+    for size in (20, 50, 100, 200):
+        print(f'{size:4d}x{size:<4d} {layouts_per_second(size, seconds):10.0f}')
+
+    print(f'\n{"template":10s} {"grid":9s} {"rebuild us":>11s} {"compile us":>11s} {"apply us":>9s}')
+    for size in (20, 200):
+        grid = HouseGrid(size)
+        for name in TEMPLATES:
+            rebuild_us = timed(lambda: (grid.clear(), TEMPLATES[name](grid)), 50)
+            compile_us = timed(lambda: (compile_template.cache_clear(), compile_template(name, size)), 20)
+            other = compile_template('small' if name != 'small' else 'mansion', size)
+            snapshot = compile_template(name, size)
+            apply_us = timed(lambda: (grid.assign(other), grid.assign(snapshot)), 50) / 2
+            print(f'{name:10s} {size:4d}x{size:<4d} {rebuild_us:11.1f} {compile_us:11.1f} {apply_us:9.1f}')
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
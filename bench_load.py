@@ -0,0 +1,154 @@
+"""Load test: many concurrent House Maker sessions in one process.
+
+N pages are built through the real ``/`` page function inside detached NiceGUI clients on a
+running event loop. Random tile clicks and template loads are then replayed as browser events
+through ``Client.handle_event``, exactly as the websocket handler would dispatch them. We report
+p50/p99 server latency, outbound bytes per event (element updates plus queued messages such as
+canvas paints), RSS per session, and finally delete every client and check that no session
+objects survive garbage collection.
+
+    python bench_load.py [--sessions 50] [--renderer buttons|canvas|optimistic] [--size 20] [--clicks 2000] [--design NAME]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import statistics
+import time
+import weakref
+from typing import List
+
+from nicegui import Client, core, ui
+from nicegui.page import page
+
+import main
+
+sessions: List[main.HouseMakerGame] = []
+
+class TrackedGame(main.HouseMakerGame):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        sessions.append(self)
+
+def rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak only, outside Linux
+
+def fire(client: Client, element: ui.element, event_type: str, args=None) -> float:
+    """Dispatch a browser event to ``element`` and return the server time in ms."""
+    listener_id = next(listener_id for listener_id, listener in element._event_listeners.items()
+                       if listener.type.split('.')[0] == event_type)
+    start = time.perf_counter()
+    client.handle_event({'id': element.id, 'listener_id': listener_id,
+                         'args': [] if args is None else [json.dumps(args)]})
+    return (time.perf_counter() - start) * 1000
+
+def drain(client: Client) -> int:
+    """Bytes the outbox would send for everything queued since the last call."""
+    size = 0
+    if client.outbox.updates:
+        size += len(json.dumps({element_id: element._to_dict()
+                                for element_id, element in client.outbox.updates.items()}, default=str))
+    size += sum(len(json.dumps(data, default=str)) for _, _, data in client.outbox.messages)
+    client.outbox.updates.clear()
+    client.outbox.messages.clear()
+    return size
+
+def click(client: Client, game: main.HouseMakerGame, x: int, y: int) -> float:
+    if game.renderer_name == 'optimistic':
+        game.update_brush()  # a tool selection, not part of the click
+        drain(client)
+        # the browser already painted the cell; only the batched operation arrives
+        index = x * game.grid_size + y
+        return fire(client, game.renderer, 'ops', {'seq': 1, 'ops': [index, game.renderer._props['brush'][0]]})
+    if game.renderer_name in ('canvas', 'viewport'):
+        return fire(client, game.renderer, 'stroke', {'path': [[x, y]], 'button': 0})
+    button = game.renderer.elements[x][y]
+    return fire(client, button, 'mousedown') + fire(client, button, 'mouseup')
+
+def report(name: str, latencies: List[float], sizes: List[int]):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f'{name:9s} n={len(latencies):6d}  p50 {statistics.median(latencies):7.2f} ms  p99 {p99:7.2f} ms  '
+          f'{statistics.mean(sizes):9.0f} B/event')
+
+async def run(args: argparse.Namespace):
+    core.loop = asyncio.get_running_loop()
+    main.HouseMakerGame = TrackedGame
+    rng = random.Random(1)
+    gc.collect()
+    baseline = rss_bytes()
+
+    start = time.perf_counter()
+    clients = []
+    for _ in range(args.sessions):
+        client = Client(page('/'), request=None)
+        with client:
+            main.main(renderer=args.renderer, size=args.size, design=args.design)
+        clients.append(client)
+    build_s = time.perf_counter() - start
+    for client, game in zip(clients, sessions):
+        if game.renderer_name != 'buttons':
+            game.renderer._handle_init()
+        drain(client)
+    gc.collect()
+    loaded = rss_bytes()
+    elements = sum(len(client.elements) for client in clients) / len(clients)
+    print(f'{args.sessions} sessions ({sessions[0].renderer_name}, {args.size}x{args.size}'
+          f'{", shared design " + args.design if args.design else ""}) built in {build_s:.1f} s')
+    print(f'RSS {(loaded - baseline) / args.sessions / 1e6:.2f} MB/session, {elements:.0f} elements/session')
+
+    click_latency, click_bytes = [], []
+    for _ in range(args.clicks):
+        n = rng.randrange(args.sessions)
+        game = sessions[n]
+        game.selected_tool = rng.choice(list(main.TileType)[1:])
+        click_latency.append(click(clients[n], game, rng.randrange(args.size), rng.randrange(args.size)))
+        if game.shared:
+            game.shared.flush()
+        click_bytes.append(sum(drain(client) for client in clients))
+    report('click', click_latency, click_bytes)
+
+    template_latency, template_bytes = [], []
+    button = None
+    for _ in range(0 if sessions[0].chunked else max(1, args.clicks // 20)):
+        n = rng.randrange(args.sessions)
+        label = rng.choice(['Small House', 'Mansion', 'Apartment'])
+        button = next(element for element in clients[n].elements.values()
+                      if isinstance(element, ui.button) and element.text == label)
+        template_latency.append(fire(clients[n], button, 'click'))
+        if sessions[n].shared:
+            sessions[n].shared.flush()
+        template_bytes.append(sum(drain(client) for client in clients))
+    if template_latency:
+        report('template', template_latency, template_bytes)
+
+    references = [weakref.ref(game) for game in sessions] + [weakref.ref(client) for client in clients]
+    for client in clients:
+        client.delete()
+    sessions.clear()
+    clients.clear()
+    del game, client, button
+    await asyncio.sleep(0)
+    gc.collect()
+    leaked = [reference() for reference in references if reference() is not None]
+    print(f'after disconnect: RSS {(rss_bytes() - baseline) / 1e6:.1f} MB above baseline, '
+          f'{len(leaked)} session objects still alive')
+    for obj in leaked[:3]:
+        print(f'  leaked {type(obj).__name__} referenced by',
+              sorted({type(referrer).__name__ for referrer in gc.get_referrers(obj)}))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--renderer', choices=sorted(main.RENDERERS), default='buttons')
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--clicks', type=int, default=2000)
+    parser.add_argument('--design', default=None, help='put all sessions on one shared design')
+    asyncio.run(run(parser.parse_args()))
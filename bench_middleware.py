@@ -0,0 +1,90 @@
+"""Per-request cost of HTTP middleware: BaseHTTPMiddleware against the pure ASGI HeaderMiddleware.
+
+Each middleware adds the same security headers to every response of a small ASGI app
+(which reads the request body and answers with a short text), driven directly through
+ASGI without a server, so only the app and middleware costs are measured. Requests per
+second and the peak Python allocation per request are reported for the app alone, both
+middleware classes, and HeaderMiddleware with headers_only=False.
+
+    python bench_middleware.py [requests]
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+
+spec = importlib.util.spec_from_file_location('project_base', os.path.join(os.path.dirname(__file__), '1.2nicegui.project_base.py'))
+project_base = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(project_base)
+
+SECURITY_HEADERS = {'x-content-type-options': 'nosniff', 'x-frame-options': 'DENY',
+                    'referrer-policy': 'same-origin'}
+
+async def app(scope, receive, send):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'text/plain'), (b'x-frame-options', b'SAMEORIGIN')]})
+    await send({'type': 'http.response.body', 'body': b'Hello, ' + body})
+
+async def security_headers(request, call_next):
+    response = await call_next(request)
+    response.headers.update(SECURITY_HEADERS)
+    return response
+
+async def request(handler) -> list:
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+             'scheme': 'http', 'path': '/', 'raw_path': b'/', 'query_string': b'', 'root_path': '',
+             'headers': [(b'host', b'localhost'), (b'content-length', b'5')],
+             'client': ('127.0.0.1', 50000), 'server': ('localhost', 80)}
+    messages = [{'type': 'http.request', 'body': b'world', 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(3600)  # the client stays connected
+
+    async def send(message):
+        sent.append(message)
+
+    await handler(scope, receive, send)
+    return sent
+
+async def bench(count: int):
+    handlers = {
+        'app alone': app,
+        'BaseHTTPMiddleware': project_base.BaseHTTPMiddleware(app, security_headers),
+        'HeaderMiddleware': project_base.HeaderMiddleware(app, security_headers),
+        'headers_only=False': project_base.HeaderMiddleware(app, security_headers, headers_only=False),
+    }
+    for name, handler in handlers.items():
+        sent = await request(handler)
+        headers = dict(sent[0]['headers'])
+        assert b''.join(message.get('body', b'') for message in sent[1:]) == b'Hello, world', sent
+        assert handler is app or headers[b'x-frame-options'] == b'DENY', headers
+
+        start = time.perf_counter()
+        for _ in range(count):
+            await request(handler)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        peaks = []
+        for _ in range(200):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await request(handler)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        print(f'{name:20s} {count / elapsed:9.0f} req/s  {elapsed / count * 1e6:6.1f} µs/req  '
+              f'peak {sorted(peaks)[len(peaks) // 2] / 1024:5.1f} KiB/req')
+
+if __name__ == '__main__':
+    asyncio.run(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
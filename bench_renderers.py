@@ -0,0 +1,61 @@
+"""Compare the button-grid and canvas renderers of the House Maker game.
+
+For every renderer and grid size a fresh page is built inside a detached NiceGUI client
+and we report the element count per client, the page build time, and the server time and
+outbound payload for a single tile click and for a template load.
+
+    python bench_renderers.py
+"""
+import json
+import time
+
+from nicegui import Client
+from nicegui.page import page
+
+import main
+from house_model import TileType
+from house_render import HouseCanvas
+
+SIZES = {'buttons': [20, 50, 100], 'canvas': [20, 50, 100, 200]}
+
+def outbound_bytes(client: Client, calls: list) -> int:
+    updates = {element_id: element._to_dict() for element_id, element in client.outbox.updates.items()}
+    size = len(json.dumps(updates, default=str)) if updates else 0
+    size += sum(len(json.dumps(args)) for args in calls)
+    client.outbox.updates.clear()
+    calls.clear()
+    return size
+
+def bench(renderer: str, size: int):
+    calls = []
+    with Client(page('/'), request=None) as client:
+        start = time.perf_counter()
+        game = main.HouseMakerGame(grid_size=size, renderer=renderer)
+        build_ms = (time.perf_counter() - start) * 1000
+        if isinstance(game.renderer, HouseCanvas):
+            game.renderer.run_method = lambda name, *args: calls.append(args)
+            game.renderer._handle_init()
+        outbound_bytes(client, calls)
+
+        game.selected_tool = TileType.WALL
+        start = time.perf_counter()
+        game.place_tile(size // 2, size // 2)
+        click_ms = (time.perf_counter() - start) * 1000
+        click_bytes = outbound_bytes(client, calls)
+
+        start = time.perf_counter()
+        game.load_template('mansion')
+        template_ms = (time.perf_counter() - start) * 1000
+        template_bytes = outbound_bytes(client, calls)
+
+        elements = len(client.elements)
+    client.delete()
+    print(f'{renderer:8s} {size:4d}x{size:<4d} {elements:7d} {build_ms:10.1f} '
+          f'{click_ms:9.2f} {click_bytes:9d} {template_ms:10.2f} {template_bytes:10d}')
+
+if __name__ == '__main__':
+    print(f'{"renderer":8s} {"grid":9s} {"elements":>7s} {"build ms":>10s} '
+          f'{"click ms":>9s} {"click B":>9s} {"tmpl ms":>10s} {"tmpl B":>10s}')
+    for renderer, sizes in SIZES.items():
+        for size in sizes:
+            bench(renderer, size)
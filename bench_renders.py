@@ -0,0 +1,53 @@
+"""Car renders: inline cost, cold rendering in the process pool, cached lookups and sharing.
+
+Many sessions asking for the same designs at once share the renders under way, so each
+distinct design is drawn once however many sessions show it.
+
+    python bench_renders.py [designs] [sessions]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from nicegui import core, run
+
+from car_catalog import CATEGORIES, DEFAULT_PATH, load_catalog
+from car_render import CarRenderCache, render_svg
+
+def random_designs(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    catalog = load_catalog(DEFAULT_PATH)
+    return [{**{category: rng.choice(catalog.ids[category]) for category in CATEGORIES},
+             **{field: f'#{rng.randrange(1 << 24):06x}' for field in ('body_color', 'roof_color', 'wheel_color')},
+             'name': f'Design {n}'}
+            for n in range(count)]
+
+async def bench(count: int, sessions: int):
+    core.loop = asyncio.get_running_loop()
+    run.setup()
+    designs = random_designs(count)
+    start = time.perf_counter()
+    for design in designs:
+        render_svg(design)
+    print(f'inline SVG per design                  {(time.perf_counter() - start) * 1e6 / count:8.1f} µs')
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CarRenderCache(directory)
+        start = time.perf_counter()
+        await cache.urls(designs)
+        print(f'{count} designs cold (process pool)     {(time.perf_counter() - start) * 1000:8.1f} ms')
+        start = time.perf_counter()
+        await cache.urls(designs)
+        print(f'{count} designs cached                  {(time.perf_counter() - start) * 1000:8.1f} ms')
+
+        cache = CarRenderCache(os.path.join(directory, 'shared'))
+        start = time.perf_counter()
+        await asyncio.gather(*(cache.urls(random.Random(n).sample(designs, len(designs))) for n in range(sessions)))
+        print(f'{sessions} sessions x {count} designs cold      {(time.perf_counter() - start) * 1000:8.1f} ms'
+              f'  ({len(os.listdir(cache.directory))} files)')
+    run.process_pool.shutdown()
+
+if __name__ == '__main__':
+    asyncio.run(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 100))
@@ -0,0 +1,74 @@
+"""Cost of saving, deleting and scrolling through many saved car designs.
+
+Designs are saved one by one into a Car Design Studio page in a detached client. The saved
+list only renders the cards in view, recycling the ones that scroll out, so save, delete and
+scroll times and the element count stay flat however many designs there are.
+
+    python bench_saved.py [designs]
+"""
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from nicegui import Client, core, run, ui
+from nicegui.page import page
+
+spec = importlib.util.spec_from_file_location('car_studio', os.path.join(os.path.dirname(__file__), '1nicegui.project.py'))
+studio = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(studio)
+
+def percentiles(timings: list) -> str:
+    timings = sorted(timings)
+    return f'p50 {timings[len(timings) // 2] * 1000:6.3f} ms  p99 {timings[len(timings) * 99 // 100] * 1000:6.3f} ms'
+
+def bench(count: int):
+    ui.notify = lambda *args, **kwargs: None  # no toasts piling up in the detached client
+    rng = random.Random(1)
+    with Client(page('/'), request=None) as client:
+        game = studio.CarDesignGame()
+        saves = []
+        for n in range(count):
+            game.current_design['name'] = f'Design {n}'
+            start = time.perf_counter()
+            game.save_design()
+            saves.append(time.perf_counter() - start)
+        print(f'save     {percentiles(saves)}  ({count:,} designs, {len(client.elements)} elements)')
+
+        scrolls = []
+        for _ in range(1000):
+            position = rng.randrange(count) * studio.SAVED_ROW_HEIGHT
+            start = time.perf_counter()
+            game.on_saved_scroll(SimpleNamespace(args={'verticalPosition': position, 'verticalContainerSize': 800}))
+            scrolls.append(time.perf_counter() - start)
+        print(f'jump     {percentiles(scrolls)}')
+        scrolls = []
+        for n in range(1000):
+            start = time.perf_counter()
+            game.on_saved_scroll(SimpleNamespace(args={'verticalPosition': n * 40, 'verticalContainerSize': 800}))
+            scrolls.append(time.perf_counter() - start)
+        print(f'scroll   {percentiles(scrolls)}')
+
+        deletes = []
+        for _ in range(min(1000, count)):
+            design = game.saved_designs[rng.choice(game.saved_order)]
+            start = time.perf_counter()
+            game.delete_design(design)
+            deletes.append(time.perf_counter() - start)
+        print(f'delete   {percentiles(deletes)}  ({len(client.elements)} elements)')
+    client.delete()
+
+async def warm_renders():
+    """Render the default design and the presets, as a running server has long done by then."""
+    core.loop = asyncio.get_running_loop()
+    run.setup()
+    default = {'body_style': 'sports', 'wheel_style': 'sport', 'decal': 'none', 'spoiler': 'none'}
+    await studio.car_renders.urls([default, *studio.parts_catalog.get().presets])
+    run.process_pool.shutdown()
+
+if __name__ == '__main__':
+    asyncio.run(warm_renders())
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
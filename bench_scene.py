@@ -0,0 +1,54 @@
+"""Size and update cost of the 3D preview on a generated plan.
+
+Reports how many instanced boxes the plan needs compared with its non-empty tiles, the time
+to build the scene from scratch, and the time per single-tile edit, which only redoes the
+rows and columns around the edit.
+
+    python bench_scene.py [size] [edits]
+"""
+import random
+import statistics
+import sys
+import time
+
+from nicegui import Client
+from nicegui.page import page
+
+from house_generator import generate_layout
+from house_model import EMPTY_TILE, HouseGrid, RoomType, TileType, make_tile
+from house_scene import HouseScene
+
+TILES = {
+    'floor': make_tile(TileType.FLOOR, room_type=RoomType.BEDROOM, color='#8B4513'),
+    'furniture': make_tile(TileType.FURNITURE, color='#8B4513'),
+    'wall': make_tile(TileType.WALL),
+    'window': make_tile(TileType.WINDOW),
+    'erase': EMPTY_TILE,
+}
+
+def bench(size: int, edits: int):
+    rng = random.Random(1)
+    grid = HouseGrid(size)
+    grid.assign(generate_layout(size, rng))
+    grid.take_dirty()
+    with Client(page('/'), request=None):
+        scene = HouseScene(size)
+        start = time.perf_counter()
+        scene.render(grid, [(x, y) for x in range(size) for y in range(size)])
+        tiles = sum(1 for tile_type in grid.types if tile_type)
+        print(f'{size}x{size}: {tiles} tiles as {scene.box_count} boxes in 2 meshes, '
+              f'built in {(time.perf_counter() - start) * 1000:.1f} ms')
+        print(f'{"edit":10s} {"p50 ms":>8s} {"p99 ms":>8s}')
+        for name, tile in TILES.items():
+            times = []
+            for _ in range(edits):
+                grid.set(rng.randrange(size), rng.randrange(size), tile)
+                cells = grid.take_dirty()
+                start = time.perf_counter()
+                scene.render(grid, cells)
+                times.append((time.perf_counter() - start) * 1000)
+            times.sort()
+            print(f'{name:10s} {statistics.median(times):8.3f} {times[int(edits * 0.99)]:8.3f}')
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
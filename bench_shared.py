@@ -0,0 +1,67 @@
+"""Fan-out cost of the shared-design mode as the number of connected clients grows.
+
+Every client is a detached NiceGUI client with the canvas renderer whose ``paint`` calls are
+recorded. Client 0 edits; we report the server time for the edit itself and for broadcasting
+it, the bytes each other client receives, and how many messages a burst of edits turns into.
+
+    python bench_shared.py
+"""
+import asyncio
+import json
+import time
+
+from nicegui import Client, core
+from nicegui.page import page
+
+import main
+from house_model import TileType
+from house_shared import SharedDesign
+
+CLIENTS = [1, 2, 5, 10, 25, 50]
+BURST = 50
+
+def connect(shared: SharedDesign, calls: list):
+    with Client(page('/'), request=None) as client:
+        game = main.HouseMakerGame(grid_size=shared.grid.size, renderer='canvas', shared=shared)
+        game.renderer.run_method = lambda name, *args: calls.append(args)
+        game.renderer._handle_init()
+    calls.clear()
+    return client, game
+
+async def bench(clients: int, size: int):
+    shared = SharedDesign('bench', size, interval=0.01)
+    calls = [[] for _ in range(clients)]
+    sessions = [connect(shared, calls[n]) for n in range(clients)]
+    editor = sessions[0][1]
+    editor.selected_tool = TileType.WALL
+
+    start = time.perf_counter()
+    editor.place_tile(size // 2, size // 2)
+    edit_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    shared.flush()
+    fanout_ms = (time.perf_counter() - start) * 1000
+    remote_bytes = sum(len(json.dumps(args)) for n in range(1, clients) for args in calls[n]) / max(clients - 1, 1)
+    for recorded in calls:
+        recorded.clear()
+
+    for y in range(BURST):
+        editor.place_tile(size // 3, y % size)
+    await asyncio.sleep(shared.interval * 3)
+    burst_messages = sum(len(calls[n]) for n in range(1, clients)) / max(clients - 1, 1)
+
+    for client, _ in sessions:
+        client.delete()
+    print(f'{clients:7d} {size:4d}x{size:<4d} {edit_ms:8.2f} {fanout_ms:10.2f} {remote_bytes:9.0f} '
+          f'{burst_messages:12.1f}')
+
+async def run():
+    core.loop = asyncio.get_running_loop()
+    print(f'{"clients":>7s} {"grid":9s} {"edit ms":>8s} {"fan-out ms":>10s} {"remote B":>9s} '
+          f'{f"msgs/{BURST} ed.":>12s}')
+    for size in (20, 100):
+        for clients in CLIENTS:
+            await bench(clients, size)
+
+if __name__ == '__main__':
+    asyncio.run(run())
@@ -0,0 +1,51 @@
+"""Thumbnail rendering for the saved-designs gallery: cold (process pool) versus cached.
+
+    python bench_thumbnails.py [designs]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from nicegui import core, run
+
+from bench_design_store import random_grid
+from house_store import DesignStore
+from house_thumbnails import ThumbnailCache, render_png, render_svg
+
+async def bench(count: int):
+    core.loop = asyncio.get_running_loop()
+    run.setup()
+    with tempfile.TemporaryDirectory() as directory:
+        store = DesignStore(os.path.join(directory, 'designs.sqlite3'))
+        for n in range(count):
+            store.save(f'Design {n}', random_grid(20, n))
+        infos = store.list(20, limit=count)
+
+        start = time.perf_counter()
+        grids = store.grids([info.id for info in infos])
+        blobs = [grids[info.id] for info in infos]
+        print(f'{count} designs, fetch blobs      {(time.perf_counter() - start) * 1000:8.1f} ms')
+
+        start = time.perf_counter()
+        for data in blobs[:50]:
+            render_png(data)
+        print(f'inline PNG per design            {(time.perf_counter() - start) * 1000 / 50:8.2f} ms')
+        start = time.perf_counter()
+        for data in blobs[:50]:
+            render_svg(data)
+        print(f'inline SVG per design            {(time.perf_counter() - start) * 1000 / 50:8.2f} ms')
+
+        cache = ThumbnailCache(os.path.join(directory, 'thumbnails'))
+        start = time.perf_counter()
+        await cache.urls(blobs)
+        print(f'cold gallery (process pool)      {(time.perf_counter() - start) * 1000:8.1f} ms')
+        start = time.perf_counter()
+        await cache.urls(blobs)
+        print(f'warm gallery (cached)            {(time.perf_counter() - start) * 1000:8.1f} ms')
+        store.close()
+    run.process_pool.shutdown()
+
+if __name__ == '__main__':
+    asyncio.run(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -0,0 +1,54 @@
+"""Cost of live layout validation per single-tile edit on a generated plan.
+
+Room detection and validation are timed separately after every edit; floor and furniture
+edits never redo the reachability search, wall and door edits may.
+
+    python bench_validation.py [size] [edits]
+"""
+import random
+import statistics
+import sys
+import time
+
+from house_generator import generate_layout
+from house_model import EMPTY_TILE, HouseGrid, RoomType, TileType, make_tile
+from house_rooms import RoomAnalyzer
+from house_validation import LayoutValidator
+
+TILES = {
+    'floor': make_tile(TileType.FLOOR, room_type=RoomType.BEDROOM, color='#8B4513'),
+    'furniture': make_tile(TileType.FURNITURE, color='#8B4513'),
+    'wall': make_tile(TileType.WALL),
+    'door': make_tile(TileType.DOOR),
+    'erase': EMPTY_TILE,
+}
+
+def bench(size: int, edits: int):
+    rng = random.Random(1)
+    grid = HouseGrid(size)
+    grid.assign(generate_layout(size, rng))
+    grid.take_dirty()
+    start = time.perf_counter()
+    analyzer = RoomAnalyzer(grid)
+    validator = LayoutValidator(analyzer)
+    print(f'{size}x{size}: {len(analyzer.rooms())} rooms, {len(validator.issues())} issues, '
+          f'built in {(time.perf_counter() - start) * 1000:.1f} ms')
+    print(f'{"edit":10s} {"rooms p50":>10s} {"p99":>7s} {"check p50":>10s} {"p99":>7s}')
+    for name, tile in TILES.items():
+        rooms_ms, check_ms = [], []
+        for _ in range(edits):
+            grid.set(rng.randrange(size), rng.randrange(size), tile)
+            cells = grid.take_dirty()
+            start = time.perf_counter()
+            analyzer.update(cells)
+            middle = time.perf_counter()
+            validator.update(cells)
+            rooms_ms.append((middle - start) * 1000)
+            check_ms.append((time.perf_counter() - middle) * 1000)
+        rooms_ms.sort()
+        check_ms.sort()
+        print(f'{name:10s} {statistics.median(rooms_ms):10.3f} {rooms_ms[int(edits * 0.99)]:7.3f} '
+              f'{statistics.median(check_ms):10.3f} {check_ms[int(edits * 0.99)]:7.3f}')
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+from car_catalog import CATEGORIES, Catalog
+from car_configs import config_space
+from car_render import COLOR, DEFAULT_COLORS, VISUAL_FIELDS, canonical_design
+
+# Car design archives are gzip-compressed newline-delimited JSON. The first line is the header
+# {"format": "car-designs", "version": N}, every further line one saved design
+# {"id", "name", "date", "price", "design"}, so archives are written and read chunk by chunk
+# and a whole collection is never held in memory, compressed or not. Uncompressed archives
+# are read as well.
+ARCHIVE_FORMAT = 'car-designs'
+ARCHIVE_VERSION = 1
+MAX_ERRORS = 20  # error messages kept per import; further bad lines are only counted
+MAX_LINE = 1 << 16  # longer lines are skipped unread
+CHUNK_SIZE = 1 << 16  # compressed bytes per exported chunk
+GZIP_MAGIC = b'\x1f\x8b'
+
+def design_hash(design: Mapping[str, str]) -> str:
+    """Content hash of a design: its name and everything it looks like, colors normalized."""
+    canonical = canonical_design(design)
+    content = [str(design.get('name', ''))] + [canonical[field] for field in VISUAL_FIELDS]
+    return hashlib.blake2b(json.dumps(content).encode(), digest_size=16).hexdigest()
+
+def export_lines(designs: Iterable[Mapping]) -> Iterator[bytes]:
+    """Archive lines (header first) for saved designs."""
+    yield json.dumps({'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION}).encode() + b'\n'
+    for saved in designs:
+        yield json.dumps({'id': saved['id'], 'name': saved['name'], 'date': saved['date'], 'price': saved['price'],
+                          'design': saved['design']}, separators=(',', ':')).encode() + b'\n'
+
+def gzip_chunks(lines: Iterable[bytes], level: int = 6, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Compress lines into a gzip stream, yielded in chunks of about ``chunk_size`` bytes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffered: List[bytes] = []
+    size = 0
+    for line in lines:
+        data = compressor.compress(line)
+        if data:
+            buffered.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                yield b''.join(buffered)
+                buffered, size = [], 0
+    buffered.append(compressor.flush())
+    yield b''.join(buffered)
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+class DesignImporter:
+    """Feed archive bytes in, compressed or not and in chunks of any size; valid designs come out
+    in batches of ``batch`` through ``on_designs``.
+
+    Each design is checked against the catalog (unknown parts or malformed colors skip it) and
+    repriced with it; designs whose content hash is in ``known`` (or came earlier in the
+    archive) are counted as duplicates. A malformed header or an unsupported version raises
+    ``ValueError``; a bad design line is skipped and reported, and the import goes on.
+    """
+
+    def __init__(self, catalog: Catalog, on_designs: Callable[[List[dict]], None],
+                 known: Optional[Set[str]] = None, taken_ids: Iterable[str] = (), batch: int = 500):
+        self.catalog = catalog
+        self.space = config_space(catalog)
+        self.on_designs = on_designs
+        self.known = set(known or ())
+        self.taken_ids = set(taken_ids)
+        self.next_suffix: Dict[str, int] = {}  # per taken id, where to look for a free "<id>-<n>"
+        self.batch = batch
+        self.report = ImportReport()
+        self.header = False
+        self.line_number = 0
+        self.pending: List[dict] = []
+        self.partial = b''
+        self.discarding = False  # inside a line that is too long
+        self.decompressor = None  # for gzip-compressed archives
+        self.started = False
+
+    def write(self, chunk: bytes):
+        """Accept raw bytes, e.g. upload chunks, which need not end at line boundaries."""
+        if not self.started:
+            chunk = self.partial + chunk
+            if len(chunk) < len(GZIP_MAGIC):  # too short to tell yet
+                self.partial = chunk
+                return
+            self.partial, self.started = b'', True
+            if chunk.startswith(GZIP_MAGIC):
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self.decompressor is None:
+            self._split(chunk)
+            return
+        try:
+            # a bounded amount at a time, so a small chunk cannot inflate into a huge one
+            while chunk:
+                self._split(self.decompressor.decompress(chunk, 16 * CHUNK_SIZE))
+                chunk = self.decompressor.unconsumed_tail
+        except zlib.error as error:
+            raise ValueError(f'Corrupt archive: {error}') from error
+
+    def _split(self, data: bytes):
+        lines = data.split(b'\n')
+        if self.discarding:
+            if len(lines) == 1:
+                return
+            del lines[0]  # the rest of the long line
+            self.discarding = False
+        else:
+            lines[0] = self.partial + lines[0]
+        self.partial = lines.pop()
+        for line in lines:
+            self.feed(line)
+        if len(self.partial) > MAX_LINE:
+            self.line_number += 1
+            self._skip('line too long')
+            self.partial, self.discarding = b'', True
+
+    def feed(self, line: bytes):
+        self.line_number += 1
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            if not self.header:
+                raise ValueError(f'Not a car design archive: {error}') from error
+            self._skip(f'invalid JSON ({error})')
+            return
+        if not self.header:
+            if not isinstance(record, dict) or record.get('format') != ARCHIVE_FORMAT:
+                raise ValueError('Not a car design archive: missing header')
+            if record.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f'Unsupported car design archive version: {record.get("version")}')
+            self.header = True
+            return
+        try:
+            saved = self._read(record)
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            self._skip(f'{type(error).__name__}: {error}')
+            return
+        content = design_hash(saved['design'])
+        if content in self.known:
+            self.report.duplicates += 1
+            return
+        self.known.add(content)
+        saved['id'] = self._free_id(saved['id'])
+        self.taken_ids.add(saved['id'])
+        self.pending.append(saved)
+        if len(self.pending) >= self.batch:
+            self.flush()
+
+    def _read(self, record: dict) -> dict:
+        source = record['design']
+        design: Dict[str, str] = {}
+        for category in CATEGORIES:
+            part = source[category]
+            if part not in self.catalog.parts[category]:
+                raise ValueError(f'unknown {category} "{part}"')
+            design[category] = part
+        for name, default in DEFAULT_COLORS.items():
+            color = source.get(name, default)
+            if not isinstance(color, str) or COLOR.fullmatch(color) is None:
+                raise ValueError(f'invalid {name} {color!r}')
+            design[name] = color if color.startswith('#') else f'#{color}'
+        name = str(record.get('name', source.get('name', 'Imported Design')))
+        design['name'] = name
+        price, _ = self.space.score(design)
+        return {'id': str(record.get('id') or datetime.now().isoformat()), 'name': name, 'design': design, 'price': price,
+                'date': str(record.get('date') or datetime.now().strftime('%Y-%m-%d %H:%M'))}
+
+    def _free_id(self, design_id: str) -> str:
+        """The id itself if it is free, else the first free "<id>-2", "<id>-3", ...
+
+        Each id continues where its previous collision left off, so any number of designs
+        sharing one id cost linear time.
+        """
+        if design_id not in self.taken_ids:
+            return design_id
+        suffix = self.next_suffix.get(design_id, 2)
+        while f'{design_id}-{suffix}' in self.taken_ids:
+            suffix += 1
+        self.next_suffix[design_id] = suffix + 1
+        return f'{design_id}-{suffix}'
+
+    def flush(self):
+        if self.pending:
+            self.on_designs(self.pending)
+            self.report.imported += len(self.pending)
+            self.pending = []
+
+    def close(self) -> ImportReport:
+        if not self.started:
+            self.started = True
+            self._split(b'')
+        if self.decompressor is not None:
+            if not self.decompressor.eof:
+                raise ValueError('Corrupt archive: truncated gzip stream')
+            self._split(self.decompressor.flush())
+        if self.partial and not self.discarding:
+            self.feed(self.partial)
+        self.partial = b''
+        if not self.header:
+            raise ValueError('Not a car design archive: empty file')
+        self.flush()
+        return self.report
+
+    def _skip(self, reason: str):
+        self.report.skipped += 1
+        if len(self.report.errors) < MAX_ERRORS:
+            self.report.errors.append(f'line {self.line_number}: {reason}')
@@ -0,0 +1,140 @@
+import bisect
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+CATEGORIES = ('body_style', 'wheel_style', 'decal', 'spoiler')  # the design fields a part is chosen for
+STATS = ('speed', 'style', 'value')
+DEFAULT_PATH = Path(__file__).with_name('car_parts.json')
+RELOAD_INTERVAL = 1.0  # seconds between checks of the catalog file
+
+log = logging.getLogger(__name__)
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Part:
+    category: str
+    id: str
+    name: str
+    price: int
+    emoji: str = ''
+    stats: Mapping[str, float] = field(default_factory=dict)  # bonus on top of the base value of each stat
+
+class Catalog:
+    """Immutable snapshot of the car parts file, shared by every session.
+
+    Besides the parts by id (in file order), each category is kept sorted by price, so a
+    price range is two bisections, and for every stat the parts raising it are ranked best first.
+    """
+
+    def __init__(self, parts: Dict[str, List[Part]], presets: List[dict], version: int = 1):
+        self.version = version
+        self.parts: Mapping[str, Mapping[str, Part]] = MappingProxyType(
+            {category: MappingProxyType({part.id: part for part in category_parts})
+             for category, category_parts in parts.items()})
+        self.ids: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {category: tuple(by_id) for category, by_id in self.parts.items()})
+        self.presets: Tuple[Mapping[str, str], ...] = tuple(MappingProxyType(dict(preset)) for preset in presets)
+        self._by_price = {category: sorted(category_parts, key=lambda part: part.price)
+                          for category, category_parts in parts.items()}
+        self._prices = {category: [part.price for part in by_price] for category, by_price in self._by_price.items()}
+        self._by_stat = {(category, stat): sorted((part for part in category_parts if part.stats.get(stat)),
+                                                  key=lambda part: -part.stats[stat])
+                         for category, category_parts in parts.items() for stat in STATS}
+
+    def part(self, category: str, part_id: str) -> Part:
+        return self.parts[category][part_id]
+
+    def cheapest(self, category: str) -> Part:
+        return self._by_price[category][0]
+
+    def price_range(self, category: str, low: int = 0, high: Optional[int] = None) -> List[Part]:
+        """Parts of a category priced from ``low`` to ``high`` (inclusive), cheapest first."""
+        prices = self._prices[category]
+        start = bisect.bisect_left(prices, low)
+        stop = len(prices) if high is None else bisect.bisect_right(prices, high)
+        return self._by_price[category][start:stop]
+
+    def search(self, category: str, text: str = '', max_price: Optional[float] = None,
+               limit: Optional[int] = None) -> List[Part]:
+        """Cheapest first, the parts whose name contains ``text`` and that cost at most ``max_price``."""
+        text = text.strip().lower()
+        found: List[Part] = []
+        for part in self.price_range(category, high=None if max_price is None else int(max_price)):
+            if text in part.name.lower():
+                found.append(part)
+                if len(found) == limit:
+                    break
+        return found
+
+    def best_for(self, category: str, stat: str) -> List[Part]:
+        """Parts of a category that raise ``stat``, biggest bonus first."""
+        return self._by_stat[(category, stat)]
+
+    @classmethod
+    def from_data(cls, data: dict) -> 'Catalog':
+        """Build a catalog from the parsed file; any structural problem raises ``ValueError``."""
+        try:
+            parts: Dict[str, List[Part]] = {}
+            for category in CATEGORIES:
+                entries = data['categories'][category]
+                if not entries:
+                    raise ValueError(f'category "{category}" has no parts')
+                parts[category] = [
+                    Part(category, str(entry['id']), str(entry['name']), int(entry['price']), str(entry.get('emoji', '')),
+                         MappingProxyType({stat: float(entry.get('stats', {})[stat])
+                                           for stat in STATS if stat in entry.get('stats', {})}))
+                    for entry in entries]
+                if len({part.id for part in parts[category]}) != len(parts[category]):
+                    raise ValueError(f'category "{category}" has duplicate part ids')
+            presets = [dict(preset) for preset in data.get('presets', [])]
+            for preset in presets:
+                for category in CATEGORIES:
+                    if preset.get(category) not in {part.id for part in parts[category]}:
+                        raise ValueError(f'preset "{preset.get("name")}" has unknown {category} "{preset.get(category)}"')
+            return cls(parts, presets, int(data.get('version', 1)))
+        except (AttributeError, KeyError, TypeError) as error:
+            raise ValueError(f'Invalid car parts catalog: {type(error).__name__}: {error}') from error
+
+def load_catalog(path: Union[str, Path]) -> Catalog:
+    with open(path, encoding='utf-8') as file:
+        return Catalog.from_data(json.load(file))
+
+class CatalogFile:
+    """The catalog of a parts file, reloaded when the file changes.
+
+    ``get`` looks at the file's modification time at most every ``interval`` seconds. Sessions
+    keep the snapshot they started with; a file that fails to load is logged and the previous
+    catalog stays in use.
+    """
+
+    def __init__(self, path: Union[str, Path], interval: float = RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.interval = interval
+        self._stamp = self._stat()
+        self.catalog = load_catalog(self.path)
+        self._checked = time.monotonic()
+
+    def get(self) -> Catalog:
+        now = time.monotonic()
+        if now - self._checked >= self.interval:
+            self._checked = now
+            stamp = self._stat()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                try:
+                    self.catalog = load_catalog(self.path)
+                except (OSError, ValueError) as error:
+                    log.warning('Keeping the previous car parts catalog, %s failed to load: %s', self.path, error)
+        return self.catalog
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
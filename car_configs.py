@@ -0,0 +1,147 @@
+import bisect
+from array import array
+from itertools import product
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from car_catalog import CATEGORIES, STATS, Catalog
+
+BASE_STAT = 0.5
+MAX_STAT = 1.0  # stats are shown capped at this
+SCALE = 1000  # bonuses are summed as integer thousandths, so equal scores compare equal
+TABLE_LIMIT = 100_000  # spaces up to this many configurations are tabulated in full
+OBJECTIVES = (*STATS, 'overall')  # 'overall' is the sum of all stats, uncapped
+
+Positions = Tuple[int, ...]  # index of the chosen part in each category, in CATEGORIES order
+Candidate = Tuple[int, int, Positions]  # price, objective score, positions
+
+class Config(NamedTuple):
+    parts: Tuple[str, ...]  # part ids in CATEGORIES order
+    price: int
+    stats: Tuple[float, ...]  # in STATS order, not capped at 1
+
+    @property
+    def design(self) -> Dict[str, str]:
+        return dict(zip(CATEGORIES, self.parts))
+
+    def score(self, objective: str) -> float:
+        return sum(self.stats) if objective == 'overall' else min(self.stats[STATS.index(objective)], MAX_STAT)
+
+class Frontier(NamedTuple):
+    """Configurations where spending more buys a strictly better score, cheapest first."""
+    prices: array
+    scores: array
+    positions: List[Positions]
+
+def _prune(candidates: List[Candidate]) -> List[Candidate]:
+    """Drop every candidate that a cheaper (or equally priced) one matches or beats."""
+    kept: List[Candidate] = []
+    for candidate in sorted(candidates, key=lambda candidate: (candidate[0], -candidate[1])):
+        if not kept or candidate[1] > kept[-1][1]:
+            kept.append(candidate)
+    return kept
+
+class ConfigSpace:
+    """Price and stats of every body × wheels × decal × spoiler combination of a catalog.
+
+    Spaces of up to ``TABLE_LIMIT`` configurations are tabulated into flat arrays indexed by
+    the parts' positions, so scoring a design is one index computation. Budget queries never
+    walk the whole space: per objective, each category is pruned to the parts no cheaper part
+    matches, the two halves (body × wheels, decal × spoiler) are combined and pruned the same
+    way, and only the surviving pairs of halves are combined (meet in the middle). The
+    resulting frontier answers "best under $X" with one bisection.
+    """
+
+    def __init__(self, catalog: Catalog):
+        # no reference back to the catalog: it is the weak key spaces are cached under
+        self.parts = [list(catalog.parts[category].values()) for category in CATEGORIES]
+        self.positions: List[Mapping[str, int]] = [{part.id: n for n, part in enumerate(parts)} for parts in self.parts]
+        self.size = 1
+        for parts in self.parts:
+            self.size *= len(parts)
+        self.prices: Optional[array] = None
+        self.stat_tables: Dict[str, array] = {}
+        if self.size <= TABLE_LIMIT:
+            self._tabulate()
+        self._frontiers: Dict[str, Frontier] = {}
+
+    def _tabulate(self):
+        prices, tables = [0], {stat: [0] for stat in STATS}
+        for parts in self.parts:
+            prices = [total + part.price for total in prices for part in parts]
+            for stat in STATS:
+                bonuses = [round(part.stats.get(stat, 0) * SCALE) for part in parts]
+                tables[stat] = [total + bonus for total in tables[stat] for bonus in bonuses]
+        self.prices = array('q', prices)
+        self.stat_tables = {stat: array('l', table) for stat, table in tables.items()}
+
+    def locate(self, design: Mapping[str, str]) -> Positions:
+        return tuple(positions[design[category]] for positions, category in zip(self.positions, CATEGORIES))
+
+    def score(self, design: Mapping[str, str]) -> Tuple[int, Tuple[float, ...]]:
+        """Price and stats (``STATS`` order, uncapped) of a design."""
+        return self._score(self.locate(design))
+
+    def _score(self, positions: Positions) -> Tuple[int, Tuple[float, ...]]:
+        if self.prices is None:
+            parts = [parts[n] for parts, n in zip(self.parts, positions)]
+            return (sum(part.price for part in parts),
+                    tuple(BASE_STAT + sum(round(part.stats.get(stat, 0) * SCALE) for part in parts) / SCALE
+                          for stat in STATS))
+        index = 0
+        for parts, n in zip(self.parts, positions):
+            index = index * len(parts) + n
+        return self.prices[index], tuple(BASE_STAT + self.stat_tables[stat][index] / SCALE for stat in STATS)
+
+    def config(self, positions: Positions) -> Config:
+        price, stats = self._score(positions)
+        return Config(tuple(parts[n].id for parts, n in zip(self.parts, positions)), price, stats)
+
+    def best(self, objective: str, budget: int) -> Optional[Config]:
+        """The highest scoring configuration within budget (the cheapest of equals), if any fits."""
+        frontier = self.frontier_table(objective)
+        n = bisect.bisect_right(frontier.prices, budget)
+        return self.config(frontier.positions[n - 1]) if n else None
+
+    def pareto(self, objective: str, budget: Optional[int] = None) -> List[Config]:
+        """Price/score Pareto-optimal configurations within budget, cheapest first."""
+        frontier = self.frontier_table(objective)
+        n = len(frontier.prices) if budget is None else bisect.bisect_right(frontier.prices, budget)
+        return [self.config(positions) for positions in frontier.positions[:n]]
+
+    def frontier_table(self, objective: str) -> Frontier:
+        frontier = self._frontiers.get(objective)
+        if frontier is None:
+            frontier = self._frontiers[objective] = self._build_frontier(objective)
+        return frontier
+
+    def _build_frontier(self, objective: str) -> Frontier:
+        stats = STATS if objective == 'overall' else (objective,)
+        categories = [_prune([(part.price, sum(round(part.stats.get(stat, 0) * SCALE) for stat in stats), (n,))
+                              for n, part in enumerate(parts)])
+                      for parts in self.parts]
+        halves = [_combine(categories[0], categories[1]), _combine(categories[2], categories[3])]
+        candidates = _combine(*halves)
+        if objective != 'overall':
+            # a single stat is capped: nothing beyond the cheapest configuration that reaches the cap is better
+            cap = round((MAX_STAT - BASE_STAT) * SCALE)
+            reached = next((n for n, (_, score, _) in enumerate(candidates) if score >= cap), None)
+            if reached is not None:
+                del candidates[reached + 1:]
+        return Frontier(array('q', (price for price, _, _ in candidates)),
+                        array('q', (score for _, score, _ in candidates)),
+                        [positions for _, _, positions in candidates])
+
+def _combine(left: List[Candidate], right: List[Candidate]) -> List[Candidate]:
+    return _prune([(left_price + right_price, left_score + right_score, left_positions + right_positions)
+                   for (left_price, left_score, left_positions), (right_price, right_score, right_positions)
+                   in product(left, right)])
+
+_spaces: 'WeakKeyDictionary[Catalog, ConfigSpace]' = WeakKeyDictionary()
+
+def config_space(catalog: Catalog) -> ConfigSpace:
+    """The configuration space of a catalog, built once and shared until the catalog is dropped."""
+    space = _spaces.get(catalog)
+    if space is None:
+        space = _spaces[catalog] = ConfigSpace(catalog)
+    return space
@@ -0,0 +1,159 @@
+import bisect
+import heapq
+import json
+import sqlite3
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from car_catalog import STATS
+
+RANKINGS = (*STATS, 'overall', 'newest')
+BUCKET_SIZE = 1024  # designs per price bucket of the rankings; a bucket twice as big is split
+
+class GalleryEntry(NamedTuple):
+    id: int
+    name: str
+    created: float
+    price: int
+    stats: tuple  # in STATS order
+
+    @property
+    def overall(self) -> float:
+        return sum(self.stats)
+
+class CarGallery:
+    """Community gallery of car designs shared by all sessions, persisted in SQLite.
+
+    The designs themselves stay on disk; memory holds one small entry per design and its id
+    in the order of every ranking, once overall and once per price bucket. "Top K by X" reads
+    the overall ranking from the best end. Under a budget, the rankings of the buckets below
+    the budget are merged best first, together with the affordable part of the bucket the
+    budget falls in, so at most one bucket is scanned however prices and scores correlate.
+    A generous budget is answered from the overall ranking before it comes to that.
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        with self.db:
+            self.db.execute('''CREATE TABLE IF NOT EXISTS gallery (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                created REAL NOT NULL,
+                price INTEGER NOT NULL,
+                speed REAL NOT NULL,
+                style REAL NOT NULL,
+                value REAL NOT NULL,
+                design TEXT NOT NULL
+            )''')
+        self._keys: Dict[str, Callable[[int], tuple]] = {
+            **{stat: (lambda design_id, n=n: (self.entries[design_id].stats[n], design_id)) for n, stat in enumerate(STATS)},
+            'overall': lambda design_id: (self.entries[design_id].overall, design_id),
+            'newest': lambda design_id: (design_id,),  # ids grow with time
+        }
+        self._load()
+
+    def _load(self):
+        self.entries: Dict[int, GalleryEntry] = {}
+        rows = self.db.execute('SELECT id, name, created, price, speed, style, value FROM gallery ORDER BY id')
+        for design_id, name, created, price, *stats in rows:
+            self.entries[design_id] = GalleryEntry(design_id, name, created, price, tuple(stats))
+        self._orders: Dict[str, List[int]] = self._rank(self.entries)
+        prices = sorted(entry.price for entry in self.entries.values())
+        self._lows: List[int] = sorted({prices[start] for start in range(0, len(prices), BUCKET_SIZE)}) or [0]
+        members: List[List[int]] = [[] for _ in self._lows]
+        for design_id, entry in self.entries.items():
+            members[self._bucket(entry.price)].append(design_id)
+        self._buckets: List[Dict[str, List[int]]] = [self._rank(bucket) for bucket in members]
+
+    def _rank(self, design_ids: Iterable[int]) -> Dict[str, List[int]]:
+        design_ids = list(design_ids)
+        return {ranking: sorted(design_ids, key=key) for ranking, key in self._keys.items()}
+
+    def _bucket(self, price: int) -> int:
+        """Index of the price bucket holding ``price``; bucket ``i`` starts at ``_lows[i]`` (the first at any price)."""
+        return max(bisect.bisect_right(self._lows, price) - 1, 0)
+
+    def _split(self, index: int):
+        """Split a price bucket at its median price, unless all its designs cost the same."""
+        members = self._buckets[index]['newest']
+        prices = sorted(self.entries[design_id].price for design_id in members)
+        median = prices[len(prices) // 2]
+        if median == prices[0]:
+            return
+        self._lows.insert(index + 1, median)
+        self._buckets[index:index + 1] = [
+            self._rank(design_id for design_id in members if self.entries[design_id].price < median),
+            self._rank(design_id for design_id in members if self.entries[design_id].price >= median)]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def publish(self, name: str, design: Mapping[str, str], price: int, stats: tuple) -> GalleryEntry:
+        """Store a design and add it to the rankings."""
+        created = time.time()
+        with self.db:
+            cursor = self.db.execute('INSERT INTO gallery (name, created, price, speed, style, value, design) '
+                                     'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                     (name, created, price, *stats, json.dumps(dict(design))))
+        entry = self.entries[cursor.lastrowid] = GalleryEntry(cursor.lastrowid, name, created, price, tuple(stats))
+        index = self._bucket(price)
+        for ranking, key in self._keys.items():
+            bisect.insort(self._orders[ranking], entry.id, key=key)
+            bisect.insort(self._buckets[index][ranking], entry.id, key=key)
+        if len(self._buckets[index]['newest']) > 2 * BUCKET_SIZE:
+            self._split(index)
+        return entry
+
+    def publish_many(self, designs: Iterable[Tuple[str, Mapping[str, str], int, tuple]]) -> int:
+        """Store many ``(name, design, price, stats)`` in a single transaction, then rebuild the rankings."""
+        created = time.time()
+        with self.db:
+            count = self.db.executemany('INSERT INTO gallery (name, created, price, speed, style, value, design) '
+                                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                        ((name, created, price, *stats, json.dumps(dict(design)))
+                                         for name, design, price, stats in designs)).rowcount
+        self._load()
+        return count
+
+    def remove(self, design_id: int) -> bool:
+        entry = self.entries.get(design_id)
+        if entry is None:
+            return False
+        with self.db:
+            self.db.execute('DELETE FROM gallery WHERE id = ?', (design_id,))
+        bucket = self._buckets[self._bucket(entry.price)]
+        for ranking, key in self._keys.items():
+            for order in (self._orders[ranking], bucket[ranking]):
+                del order[bisect.bisect_left(order, key(design_id), key=key)]
+        del self.entries[design_id]
+        return True
+
+    def top(self, ranking: str, limit: int = 50, max_price: Optional[int] = None) -> List[GalleryEntry]:
+        """The best ``limit`` designs by a ranking (best first), optionally only those within budget."""
+        key = self._keys[ranking]
+        if max_price is None:
+            return [self.entries[design_id] for design_id in self._orders[ranking][:-limit - 1:-1]]
+        # usually most of the best designs fit the budget: look at a few before merging buckets
+        found = []
+        for design_id in islice(reversed(self._orders[ranking]), 4 * limit):
+            if self.entries[design_id].price <= max_price:
+                found.append(self.entries[design_id])
+                if len(found) == limit:
+                    return found
+        last = self._bucket(max_price)
+        streams = [reversed(bucket[ranking]) for bucket in self._buckets[:last]]
+        streams.append(design_id for design_id in reversed(self._buckets[last][ranking])
+                       if self.entries[design_id].price <= max_price)
+        return [self.entries[design_id] for design_id in islice(heapq.merge(*streams, key=key, reverse=True), limit)]
+
+    def designs(self, design_ids: List[int]) -> Dict[int, dict]:
+        """The stored designs of several entries in one query, e.g. to render or load them."""
+        rows = self.db.execute(f'SELECT id, design FROM gallery WHERE id IN ({",".join("?" * len(design_ids))})',
+                               design_ids)
+        return {design_id: json.loads(design) for design_id, design in rows}
+
+    def close(self):
+        self.db.close()
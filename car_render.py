@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Mapping
+
+from nicegui import run
+
+# what a render depends on; the name, price and anything else of a design are ignored
+VISUAL_FIELDS = ('body_color', 'roof_color', 'wheel_color', 'window_tint', 'body_style', 'wheel_style', 'decal', 'spoiler')
+DEFAULT_COLORS = {'body_color': '#ff4444', 'roof_color': '#333333', 'wheel_color': '#888888', 'window_tint': '#4a90e2'}
+COLOR = re.compile(r'#?([0-9a-fA-F]{6}|[0-9a-fA-F]{3})')
+
+# side view, front to the right; each body is (lower body, roof or None, window, top of the tail)
+BODIES = {
+    'sports': ('M18 128 Q20 108 48 104 L120 96 L250 98 Q296 102 300 120 L300 132 L18 132 Z',
+               'M110 97 Q140 70 185 68 Q220 70 245 98 Z', 'M124 96 Q148 77 182 75 Q212 77 232 96 Z', 104),
+    'sedan': ('M20 132 L22 108 Q26 100 60 98 L270 98 Q298 100 300 112 L300 132 Z',
+              'M80 99 L110 66 L215 66 L250 99 Z', 'M94 97 L117 72 L208 72 L237 97 Z', 100),
+    'suv': ('M20 134 L20 96 Q22 88 50 86 L280 86 Q300 88 300 100 L300 134 Z',
+            'M40 88 L62 52 L262 52 L284 88 Z', 'M56 86 L73 58 L251 58 L268 86 Z', 88),
+    'truck': ('M18 134 L18 100 Q20 92 40 92 L300 92 L300 134 Z',
+              'M196 93 L206 52 L270 52 L290 93 Z', 'M208 91 L215 58 L262 58 L279 91 Z', 92),
+    'convertible': ('M20 132 L22 110 Q26 102 60 100 L270 100 Q298 102 300 114 L300 132 Z',
+                    None, 'M204 101 L224 80 L230 80 L214 101 Z', 102),
+}
+WHEELS = (80, 240)  # x of the rear and front axle
+AXLE_Y = 134
+SPOILERS = {'small': (30, 8), 'medium': (40, 14), 'large': (55, 22)}  # wing width, stand height
+STAR = '0,-7 2,-2 7,-2 3,1 4,7 0,3 -4,7 -3,1 -7,-2 -2,-2'
+
+def canonical_design(design: Mapping[str, str]) -> Dict[str, str]:
+    """The fields a render depends on, colors as lower-case ``#rrggbb`` (invalid ones replaced by the default)."""
+    canonical = {}
+    for field in VISUAL_FIELDS:
+        value = str(design.get(field, ''))
+        if field in DEFAULT_COLORS:
+            match = COLOR.fullmatch(value.strip())
+            if match is None:
+                value = DEFAULT_COLORS[field]
+            else:
+                digits = match.group(1).lower()
+                value = '#' + (''.join(2 * c for c in digits) if len(digits) == 3 else digits)
+        canonical[field] = value
+    return canonical
+
+def _wheel(x: int, style: str, color: str) -> str:
+    tire = f'<circle cx="{x}" cy="{AXLE_Y}" r="24" fill="#222"/>'
+    if style == 'sport':
+        spokes = ''.join(f'<line x1="{x}" y1="{AXLE_Y}" x2="{x}" y2="{AXLE_Y - 14}" transform="rotate({72 * n} {x} {AXLE_Y})"/>'
+                         for n in range(5))
+        return (tire + f'<circle cx="{x}" cy="{AXLE_Y}" r="15" fill="{color}"/>'
+                f'<g stroke="#222" stroke-width="3">{spokes}</g><circle cx="{x}" cy="{AXLE_Y}" r="4" fill="#222"/>')
+    if style == 'luxury':
+        return (tire + f'<circle cx="{x}" cy="{AXLE_Y}" r="17" fill="{color}"/>'
+                f'<circle cx="{x}" cy="{AXLE_Y}" r="10" fill="none" stroke="#fff" stroke-width="2"/>'
+                f'<circle cx="{x}" cy="{AXLE_Y}" r="4" fill="#d4af37"/>')
+    if style == 'offroad':
+        return (f'<circle cx="{x}" cy="{AXLE_Y}" r="24" fill="#222" stroke="#111" stroke-width="6" stroke-dasharray="6 4"/>'
+                f'<circle cx="{x}" cy="{AXLE_Y}" r="11" fill="{color}"/>')
+    if style == 'classic':
+        return (tire + f'<circle cx="{x}" cy="{AXLE_Y}" r="18" fill="#f5f5f5"/>'
+                f'<circle cx="{x}" cy="{AXLE_Y}" r="11" fill="{color}"/>')
+    return tire + f'<circle cx="{x}" cy="{AXLE_Y}" r="13" fill="{color}"/>'
+
+def _decal(decal: str) -> str:
+    if decal == 'flames':
+        return ('<path d="M40 122 Q70 104 80 114 Q95 98 110 112 Q128 96 140 110 Q150 104 170 118 L40 124 Z" fill="#ff8c00"/>'
+                '<path d="M50 122 Q72 112 82 118 Q96 108 108 116 Q124 106 136 116 L50 123 Z" fill="#ffd700"/>')
+    if decal == 'stripes':
+        return '<rect x="24" y="112" width="274" height="5" fill="#fff"/><rect x="24" y="120" width="274" height="5" fill="#fff"/>'
+    if decal == 'lightning':
+        return '<polygon points="70,110 150,106 138,114 230,110 130,126 144,118 60,122" fill="#ffeb3b"/>'
+    if decal == 'stars':
+        return ''.join(f'<polygon points="{STAR}" transform="translate({x} {y})" fill="#ffeb3b"/>'
+                       for x, y in ((70, 114), (110, 120), (160, 113), (210, 120)))
+    return ''
+
+def _spoiler(spoiler: str, tail: int, color: str) -> str:
+    if spoiler not in SPOILERS:
+        return ''
+    width, stand = SPOILERS[spoiler]
+    return (f'<rect x="34" y="{tail - stand}" width="4" height="{stand}" fill="#222"/>'
+            f'<rect x="{36 - width // 2}" y="{tail - stand - 5}" width="{width}" height="6" rx="2" fill="{color}" stroke="#222"/>')
+
+def render_svg(design: Mapping[str, str], width: int = 320) -> str:
+    """Side view of a car design; part ids the renderer does not know get a generic look."""
+    design = canonical_design(design)
+    body, roof, window, tail = BODIES.get(design['body_style'], BODIES['sedan'])
+    parts = [
+        '<rect width="320" height="180" rx="10" fill="url(#sky)"/>',
+        '<ellipse cx="160" cy="160" rx="140" ry="8" fill="#000" opacity="0.25"/>',
+        f'<path d="{roof}" fill="{design["roof_color"]}"/>' if roof else '',
+        f'<path d="{window}" fill="{design["window_tint"]}" opacity="0.8"/>',
+        f'<path d="{body}" fill="{design["body_color"]}" stroke="#0003" stroke-width="2"/>',
+        _decal(design['decal']),
+        _spoiler(design['spoiler'], tail, design['body_color']),
+        '<rect x="292" y="106" width="8" height="6" rx="2" fill="#ffe082"/>',  # headlight
+        *(_wheel(x, design['wheel_style'], design['wheel_color']) for x in WHEELS),
+    ]
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{width * 180 // 320}" viewBox="0 0 320 180">'
+            '<defs><linearGradient id="sky" x1="0" y1="0" x2="1" y2="1">'
+            '<stop offset="0" stop-color="#667eea"/><stop offset="1" stop-color="#764ba2"/></linearGradient></defs>'
+            f'{"".join(parts)}</svg>')
+
+def render_svgs(designs: List[Mapping[str, str]]) -> List[str]:
+    return [render_svg(design) for design in designs]
+
+class CarRenderCache:
+    """SVG renders of car designs on disk, named by a hash of the canonical design.
+
+    Every design that looks the same (whatever its name, price or session) shares one file,
+    which never needs invalidating. Missing renders are drawn in the process pool in chunks;
+    a render already under way is awaited rather than started again. At most ``max_files``
+    renders are kept: the least recently used ones are deleted, and drawn again if needed.
+    """
+
+    def __init__(self, directory: str, url_path: str = '/car_renders', chunk: int = 32, max_files: int = 10_000):
+        self.directory = directory
+        self.url_path = url_path
+        self.chunk = chunk
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+        names = sorted((entry.stat().st_mtime, entry.name[:-4]) for entry in os.scandir(directory)
+                       if entry.name.endswith('.svg'))
+        self.known: 'OrderedDict[str, None]' = OrderedDict((key, None) for _, key in names)  # least recently used first
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self._evict()
+
+    def cached(self, key: str) -> bool:
+        """Whether a render is on disk, counting as a use of it."""
+        if key in self.known:
+            self.known.move_to_end(key)
+            return True
+        return False
+
+    def key(self, design: Mapping[str, str]) -> str:
+        """Hash of a canonical design (see ``canonical_design``)."""
+        canonical = json.dumps([design[field] for field in VISUAL_FIELDS])
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+    def url(self, key: str) -> str:
+        return f'{self.url_path}/{key}.svg'
+
+    async def urls(self, designs: List[Mapping[str, str]]) -> List[str]:
+        """Render URLs for car designs, rendering the ones not cached yet."""
+        designs = [canonical_design(design) for design in designs]
+        keys = [self.key(design) for design in designs]
+        missing = {key: design for key, design in zip(keys, designs)
+                   if not self.cached(key) and key not in self._rendering}
+        items = list(missing.items())
+        for start in range(0, len(items), self.chunk):
+            batch = items[start:start + self.chunk]
+            task = asyncio.ensure_future(self._render(batch))
+            for key, _ in batch:
+                self._rendering[key] = task
+        # shielded, so a client going away does not cancel renders other clients wait for
+        await asyncio.gather(*(asyncio.shield(task) for task in {self._rendering[key] for key in keys if key in self._rendering}))
+        return [self.url(key) for key in keys]
+
+    async def _render(self, batch: list):
+        try:
+            svgs = await run.cpu_bound(render_svgs, [design for _, design in batch])
+            if svgs is not None:  # None while the app is shutting down
+                for (key, _), svg in zip(batch, svgs):
+                    self._write(key, svg)
+        finally:
+            for key, _ in batch:
+                self._rendering.pop(key, None)
+
+    def _write(self, key: str, svg: str):
+        path = os.path.join(self.directory, f'{key}.svg')
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            file.write(svg)
+        os.replace(path + '.tmp', path)
+        self.known[key] = None
+        self.known.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self.known) > self.max_files:
+            key, _ = self.known.popitem(last=False)
+            try:
+                os.remove(os.path.join(self.directory, f'{key}.svg'))
+            except FileNotFoundError:
+                pass
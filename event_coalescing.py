@@ -0,0 +1,153 @@
+import asyncio
+import weakref
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Literal, Optional
+
+from nicegui import background_tasks, core, helpers
+from nicegui.events import UiEventArguments
+
+Mode = Literal['debounce', 'throttle', 'latest']
+
+@dataclass
+class EventCounts:
+    received: int = 0
+    processed: int = 0  # handler runs
+    dropped: int = 0  # superseded by a newer event before being handled
+    merged: int = 0  # folded into the pending event by ``merge``
+
+class Coalescer:
+    """Event handler wrapper that keeps bursts of events from running a handler for each one.
+
+    Events arriving while one is pending replace it (or are combined with it by ``merge``),
+    so the handler only ever sees the latest state:
+
+    - ``debounce``: runs once the events have paused for ``interval`` seconds
+    - ``throttle``: runs at most once per ``interval`` seconds, the first event right away
+    - ``latest``: runs as soon as the previous run has finished, at most once per ``interval``
+
+    In every mode an async handler is awaited before the next run starts, so a slow handler
+    never piles up behind itself. The deferred runs happen in the sender's slot, as with
+    direct event handlers.
+    """
+
+    def __init__(self, handler: Callable, mode: Mode = 'throttle', interval: float = 0.1, *,
+                 merge: Optional[Callable[[Any, Any], Any]] = None, name: Optional[str] = None):
+        if mode not in ('debounce', 'throttle', 'latest'):
+            raise ValueError(f'Unknown coalescing mode "{mode}"')
+        self.handler = handler
+        self.mode = mode
+        self.interval = interval
+        self.merge = merge
+        self.name = name or getattr(handler, '__qualname__', repr(handler))
+        self.counts = EventCounts()
+        self._expect_args = helpers.expects_arguments(handler)
+        self._pending: Any = None
+        self._has_pending = False
+        self._received_at = 0.0
+        self._started_at = float('-inf')
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._busy = False
+        _coalescers.add(self)
+
+    def __call__(self, event: Any):
+        self.counts.received += 1
+        if self._has_pending:
+            if self.merge is not None:
+                event = self.merge(self._pending, event)
+                self.counts.merged += 1
+            else:
+                self.counts.dropped += 1
+        self._pending, self._has_pending = event, True
+        self._received_at = asyncio.get_running_loop().time()
+        if self.mode == 'debounce' and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule()
+
+    def flush(self):
+        """Handle the pending event now, if there is one."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._has_pending and not self._busy:
+            self._run()
+
+    def cancel(self):
+        """Forget the pending event."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._has_pending:
+            self.counts.dropped += 1
+        self._pending, self._has_pending = None, False
+
+    def _schedule(self):
+        if not self._has_pending or self._busy or self._timer is not None:
+            return
+        loop = asyncio.get_running_loop()
+        due = (self._received_at if self.mode == 'debounce' else self._started_at) + self.interval
+        delay = due - loop.time()
+        if delay > 0:
+            self._timer = loop.call_later(delay, self._on_timer)
+        else:
+            self._run()
+
+    def _on_timer(self):
+        self._timer = None
+        if self._has_pending and not self._busy:
+            self._run()
+
+    def _run(self):
+        event, self._pending, self._has_pending = self._pending, None, False
+        if isinstance(event, UiEventArguments):
+            if event.sender.is_deleted:
+                self.counts.dropped += 1
+                return
+            slot = event.sender.parent_slot or event.sender.client.layout.default_slot
+        else:
+            slot = nullcontext()
+        self.counts.processed += 1
+        self._started_at = asyncio.get_running_loop().time()
+        try:
+            with slot:
+                result = self.handler(event) if self._expect_args else self.handler()
+        except Exception as error:
+            core.app.handle_exception(error)
+            return
+        if helpers.should_await(result):
+            self._busy = True
+            background_tasks.create(self._finish(result), name=f'coalesced {self.name}', context=slot)
+
+    async def _finish(self, result):
+        try:
+            await result
+        except Exception as error:
+            core.app.handle_exception(error)
+        finally:
+            self._busy = False
+            if self._has_pending:
+                self._schedule()
+
+def debounce(interval: float, **kwargs) -> Callable[[Callable], Coalescer]:
+    """Decorator: run the handler once events have paused for ``interval`` seconds."""
+    return lambda handler: Coalescer(handler, 'debounce', interval, **kwargs)
+
+def throttle(interval: float, **kwargs) -> Callable[[Callable], Coalescer]:
+    """Decorator: run the handler at most once per ``interval`` seconds, with the latest event."""
+    return lambda handler: Coalescer(handler, 'throttle', interval, **kwargs)
+
+def latest(max_rate: Optional[float] = None, **kwargs) -> Callable[[Callable], Coalescer]:
+    """Decorator: run the handler with the latest event once the previous run is done (at most ``max_rate`` per second)."""
+    return lambda handler: Coalescer(handler, 'latest', 1 / max_rate if max_rate else 0.0, **kwargs)
+
+_coalescers: 'weakref.WeakSet[Coalescer]' = weakref.WeakSet()
+
+def event_counts() -> Dict[str, Dict[str, int]]:
+    """Counts of all live coalescers, summed by name."""
+    totals: Dict[str, Dict[str, int]] = {}
+    for coalescer in list(_coalescers):
+        total = totals.setdefault(coalescer.name, asdict(EventCounts()))
+        for key, value in asdict(coalescer.counts).items():
+            total[key] += value
+    return totals
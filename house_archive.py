@@ -0,0 +1,148 @@
+import base64
+import json
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from house_chunks import MAX_GRID_SIZE, MIN_GRID_SIZE, new_grid
+from house_model import FurnitureType, RoomType, TileType, make_tile
+from house_store import DesignInfo, DesignStore, encode_grid, grid_size
+
+# Design archives are newline-delimited JSON. The first line is the header
+# {"format": "house-designs", "version": N}, every further line is one design, so archives are
+# written and read line by line and a whole collection is never held in memory.
+#
+# Version 2 lines are {"name", "created", "size", "grid"} with "grid" the base64 encode_grid blob,
+# which carries its own grid format version. Version 1 lines are the per-cell dicts the first
+# save_design built: {"name", "grid": [[{"type", "room_type", "furniture_type", "color"}, ...]]}.
+# Files without a header are read as version 1 too.
+ARCHIVE_FORMAT = 'house-designs'
+ARCHIVE_VERSION = 2
+MAX_ERRORS = 20  # error messages kept per import; further bad lines are only counted
+MAX_LINE = 1 << 26  # a longer line fails the import, so a file without newlines is never buffered whole
+
+DesignRow = Tuple[str, float, int, bytes]  # name, created, size, encoded grid
+
+def export_lines(designs: Iterable[Tuple[DesignInfo, bytes]]) -> Iterator[bytes]:
+    """Archive lines (header first) for ``(info, encoded grid)`` pairs such as ``DesignStore.iterate``."""
+    yield json.dumps({'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION}).encode() + b'\n'
+    for info, grid in designs:
+        yield json.dumps({'name': info.name, 'created': info.created, 'size': info.size,
+                          'grid': base64.b64encode(grid).decode()}).encode() + b'\n'
+
+def export_designs(store: DesignStore, file: BinaryIO, size: Optional[int] = None) -> int:
+    """Write all designs (of one grid size) to ``file``; returns the number written."""
+    count = -1
+    for count, line in enumerate(export_lines(store.iterate(size))):
+        file.write(line)
+    return count
+
+def _read_v1(record: dict) -> DesignRow:
+    rows = record['grid']
+    if not MIN_GRID_SIZE <= len(rows) <= MAX_GRID_SIZE:
+        raise ValueError(f'unsupported grid size {len(rows)}')
+    grid = new_grid(len(rows))
+    for x, row in enumerate(rows):
+        if len(row) != grid.size:
+            raise ValueError(f'row {x} has {len(row)} cells, expected {grid.size}')
+        for y, cell in enumerate(row):
+            grid.set(x, y, make_tile(TileType(cell['type']),
+                                     RoomType(cell['room_type']) if cell.get('room_type') else None,
+                                     FurnitureType(cell['furniture_type']) if cell.get('furniture_type') else None,
+                                     cell.get('color', '#E0E0E0')))
+    return str(record['name']), float(record.get('created', time.time())), grid.size, encode_grid(grid)
+
+def _read_v2(record: dict) -> DesignRow:
+    data = base64.b64decode(record['grid'], validate=True)
+    size = grid_size(data)
+    if size != record['size']:
+        raise ValueError(f'grid is {size}x{size}, record says {record["size"]}')
+    return str(record['name']), float(record['created']), size, data
+
+READERS = {1: _read_v1, 2: _read_v2}
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+class DesignImporter:
+    """Feed archive lines (or arbitrary byte chunks) in; designs are stored in batches of ``batch``.
+
+    A malformed header, an unsupported version or a line longer than ``MAX_LINE`` raises
+    ``ValueError``; a bad design line is skipped and reported, and the import goes on.
+    """
+
+    def __init__(self, store: DesignStore, batch: int = 500):
+        self.store = store
+        self.batch = batch
+        self.report = ImportReport()
+        self.reader = None
+        self.line_number = 0
+        self.pending: List[DesignRow] = []
+        self.partial = b''
+
+    def write(self, chunk: bytes):
+        """Accept raw bytes, e.g. upload chunks, which need not end at line boundaries."""
+        lines = (self.partial + chunk).split(b'\n')
+        self.partial = lines.pop()
+        for line in lines:
+            self.feed(line)
+        if len(self.partial) > MAX_LINE:
+            raise ValueError(f'Line {self.line_number + 1} is longer than {MAX_LINE} bytes')
+
+    def feed(self, line: bytes):
+        self.line_number += 1
+        if len(line) > MAX_LINE:
+            raise ValueError(f'Line {self.line_number} is longer than {MAX_LINE} bytes')
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            if self.reader is None:
+                raise ValueError(f'Not a design archive: {error}') from error
+            self._skip(f'invalid JSON ({error})')
+            return
+        if self.reader is None:
+            if isinstance(record, dict) and record.get('format') == ARCHIVE_FORMAT:
+                version = record.get('version')
+                if version not in READERS:
+                    raise ValueError(f'Unsupported design archive version: {version}')
+                self.reader = READERS[version]
+                return
+            if not isinstance(record, dict) or not isinstance(record.get('grid'), list):
+                raise ValueError('Not a design archive: missing header')
+            self.reader = _read_v1  # designs saved before archives had a header
+        try:
+            self.pending.append(self.reader(record))
+        except (AttributeError, KeyError, OverflowError, TypeError, ValueError, struct.error) as error:
+            self._skip(f'{type(error).__name__}: {error}')
+            return
+        if len(self.pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.report.imported += self.store.save_many(self.pending)
+            self.pending = []
+
+    def close(self) -> ImportReport:
+        if self.partial:
+            self.feed(self.partial)
+            self.partial = b''
+        self.flush()
+        return self.report
+
+    def _skip(self, reason: str):
+        self.report.skipped += 1
+        if len(self.report.errors) < MAX_ERRORS:
+            self.report.errors.append(f'line {self.line_number}: {reason}')
+
+def import_designs(store: DesignStore, file: BinaryIO, batch: int = 500) -> ImportReport:
+    importer = DesignImporter(store, batch)
+    for line in file:
+        importer.feed(line)
+    return importer.close()
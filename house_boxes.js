@@ -0,0 +1,44 @@
+import { THREE } from "nicegui-scene";
+
+export default class HouseBoxes {
+  create_mesh(opacity, boxes) {
+    // every box of one material is an instance of a single unit cube; a box is [x, y, z, sx, sy, sz, color]
+    const material = new THREE.MeshPhongMaterial({ transparent: opacity < 1, opacity, depthWrite: opacity >= 1 });
+    this.mesh = new THREE.InstancedMesh(new THREE.BoxGeometry(1, 1, 1), material, 0);
+    this.mesh.frustumCulled = false;
+    this.matrix = new THREE.Matrix4();
+    this.color = new THREE.Color();
+    this.capacity = 0;
+    this.reserve(Math.max(64, boxes.length));
+    this.update(boxes.map((box, slot) => [slot, box]));
+    return this.mesh;
+  }
+
+  reserve(capacity) {
+    const matrices = new Float32Array(capacity * 16);
+    const colors = new Float32Array(capacity * 3);
+    if (this.capacity) {
+      matrices.set(this.mesh.instanceMatrix.array);
+      colors.set(this.mesh.instanceColor.array);
+    }
+    this.mesh.instanceMatrix = new THREE.InstancedBufferAttribute(matrices, 16);
+    this.mesh.instanceColor = new THREE.InstancedBufferAttribute(colors, 3);
+    this.capacity = capacity;
+  }
+
+  update(changes) {
+    for (const [slot, box] of changes) {
+      if (slot >= this.capacity) this.reserve(Math.max(slot + 1, this.capacity * 2));
+      if (box) {
+        const [x, y, z, sx, sy, sz, color] = box;
+        this.mesh.setMatrixAt(slot, this.matrix.makeScale(sx, sy, sz).setPosition(x, y, z));
+        this.mesh.setColorAt(slot, this.color.set(color));
+      } else {
+        this.mesh.setMatrixAt(slot, this.matrix.makeScale(0, 0, 0)); // free slot, reused by a later box
+      }
+      this.mesh.count = Math.max(this.mesh.count, slot + 1);
+    }
+    this.mesh.instanceMatrix.needsUpdate = true;
+    this.mesh.instanceColor.needsUpdate = true;
+  }
+}
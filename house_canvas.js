@@ -0,0 +1,129 @@
+export default {
+  template: `<canvas ref="canvas" :width="size * tile_size" :height="size * tile_size"
+    style="cursor: pointer; image-rendering: pixelated"
+    @mousedown="onDown" @mousemove="onMove" @mouseup="onUp" @mouseleave="onUp"
+    @contextmenu.prevent></canvas>`,
+  props: {
+    size: Number,
+    tile_size: Number,
+    optimistic: Boolean,
+    flush_ms: Number,
+    brush: Array,
+    eraser: Array,
+  },
+  mounted() {
+    this.palette = [];
+    this.stroke = null;
+    this.cells = new Int32Array(this.size * this.size).fill(-1);
+    // optimistic mode: operations not sent yet, and painted cells waiting for their batch to be acknowledged
+    this.queue = [];
+    this.pending = new Map();
+    this.seq = 0;
+    this.version = 0;
+    this.open = false; // a batch of the current drag was sent, the final one is still to come
+    const connectInterval = setInterval(() => {
+      if (window.socket.id === undefined) return;
+      this.$emit("init");
+      clearInterval(connectInterval);
+    }, 100);
+    if (this.optimistic) this.flushInterval = setInterval(() => this.flush(), this.flush_ms);
+  },
+  unmounted() {
+    clearInterval(this.flushInterval);
+  },
+  methods: {
+    paint(palette, changes) {
+      this.palette.push(...palette);
+      const ctx = this.$refs.canvas.getContext("2d");
+      for (let i = 0; i < changes.length; i += 2) {
+        // the server has not applied our newer operation on this cell yet; it will win by server order
+        if (this.pending.has(changes[i])) continue;
+        this.cells[changes[i]] = changes[i + 1];
+        this.drawCell(ctx, changes[i]);
+      }
+    },
+    ack(seq, version) {
+      this.version = version;
+      for (const [index, batch] of this.pending) {
+        if (batch <= seq) this.pending.delete(index);
+      }
+    },
+    flush(done = false) {
+      // a drag may span several batches; "done" marks its last one so the server records one undo step
+      if (!this.queue.length && !(done && this.open)) return;
+      const last = done || !this.stroke;
+      this.seq += 1;
+      this.$emit("ops", { seq: this.seq, ops: this.queue, done: last });
+      this.queue = [];
+      this.open = !last;
+    },
+    drawCell(ctx, index) {
+      const [text, color] = this.palette[this.cells[index]];
+      const t = this.tile_size;
+      const left = (index % this.size) * t;
+      const top = Math.floor(index / this.size) * t;
+      ctx.fillStyle = color;
+      ctx.fillRect(left, top, t, t);
+      if (t >= 8) {
+        ctx.strokeStyle = "#E5E7EB";
+        ctx.strokeRect(left + 0.5, top + 0.5, t - 1, t - 1);
+      }
+      if (text && t >= 14) {
+        ctx.font = `${Math.floor(t * 0.6)}px sans-serif`;
+        ctx.textAlign = "center";
+        ctx.textBaseline = "middle";
+        ctx.fillText(text, left + t / 2, top + t / 2);
+      }
+    },
+    paintLocal(cell, [brushId, paletteId]) {
+      const index = cell[0] * this.size + cell[1];
+      this.queue.push(index, brushId);
+      this.pending.set(index, this.seq + 1);
+      this.cells[index] = paletteId;
+      this.drawCell(this.$refs.canvas.getContext("2d"), index);
+    },
+    paintLine(from, to, brush) {
+      let [x0, y0] = from;
+      const [x1, y1] = to;
+      const dx = Math.abs(x1 - x0), dy = -Math.abs(y1 - y0);
+      const sx = x1 > x0 ? 1 : -1, sy = y1 > y0 ? 1 : -1;
+      let error = dx + dy;
+      while (x0 !== x1 || y0 !== y1) {
+        const doubled = 2 * error;
+        if (doubled >= dy) { error += dy; x0 += sx; }
+        if (doubled <= dx) { error += dx; y0 += sy; }
+        this.paintLocal([x0, y0], brush);
+      }
+    },
+    cellAt(event) {
+      const rect = this.$refs.canvas.getBoundingClientRect();
+      const scale = rect.width / (this.size * this.tile_size);
+      const x = Math.floor((event.clientY - rect.top) / scale / this.tile_size);
+      const y = Math.floor((event.clientX - rect.left) / scale / this.tile_size);
+      if (x < 0 || y < 0 || x >= this.size || y >= this.size) return null;
+      return [x, y];
+    },
+    onDown(event) {
+      const cell = this.cellAt(event);
+      if (!cell) return;
+      const brush = this.optimistic ? (event.button === 2 ? this.eraser : this.brush) : null;
+      this.stroke = { path: [cell], button: event.button, brush };
+      if (brush) this.paintLocal(cell, brush);
+    },
+    onMove(event) {
+      if (!this.stroke) return;
+      const cell = this.cellAt(event);
+      const last = this.stroke.path[this.stroke.path.length - 1];
+      if (!cell || (cell[0] === last[0] && cell[1] === last[1])) return;
+      this.stroke.path.push(cell);
+      if (this.stroke.brush) this.paintLine(last, cell, this.stroke.brush);
+    },
+    onUp() {
+      // the whole drag is sent as one event; the server fills gaps between the sampled cells
+      if (this.stroke && !this.stroke.brush) this.$emit("stroke", this.stroke);
+      const painted = this.stroke && this.stroke.brush;
+      this.stroke = null;
+      if (painted) this.flush(true);
+    },
+  },
+};
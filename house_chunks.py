@@ -0,0 +1,136 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, Optional, Set, Tuple, Union
+
+from house_model import Cell, HouseGrid, HouseStats, Tile, pack_codes, tile_codes, tile_from_codes, unpack_codes
+
+CHUNK = 32  # cells per chunk side
+FLAT_GRID_LIMIT = 200  # larger plans are chunked
+MIN_GRID_SIZE = 5
+MAX_GRID_SIZE = 10_000  # chunk coordinates and sizes are stored as unsigned shorts
+ChunkKey = Tuple[int, int]
+
+def packed_tile(code: int) -> Tile:
+    return tile_from_codes(unpack_codes(code))
+
+class ChunkedGrid:
+    """Sparse grid for very large plans, made of ``CHUNK``×``CHUNK`` blocks allocated on first use.
+
+    Each chunk is one array of packed cell codes (see ``pack_codes``) and is freed again when
+    its last non-empty cell is cleared, so memory follows the cells actually in use rather
+    than ``size²``. It offers the same cell-level interface as ``HouseGrid``: ``get``/``set``,
+    dirty tracking, incremental ``stats`` and the undo ``journal``. Indexes in the journal
+    are ``x * size + y`` as in ``HouseGrid``.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.chunks: Dict[ChunkKey, array] = {}
+        self.filled: Dict[ChunkKey, int] = {}  # non-empty cells per allocated chunk
+        self.dirty: Set[Cell] = set()
+        self.stats = HouseStats()
+        self.journal: Optional[array] = None
+
+    def code(self, x: int, y: int) -> int:
+        block = self.chunks.get((x // CHUNK, y // CHUNK))
+        return block[x % CHUNK * CHUNK + y % CHUNK] if block is not None else 0
+
+    def get(self, x: int, y: int) -> Tile:
+        return packed_tile(self.code(x, y))
+
+    def set(self, x: int, y: int, tile: Tile):
+        key = (x // CHUNK, y // CHUNK)
+        i = x % CHUNK * CHUNK + y % CHUNK
+        new = pack_codes(tile_codes(tile))
+        block = self.chunks.get(key)
+        old = block[i] if block is not None else 0
+        if old == new:
+            return
+        if block is None:
+            block = self.chunks[key] = array('I', bytes(4 * CHUNK * CHUNK))
+            self.filled[key] = 0
+        block[i] = new
+        filled = self.filled[key] + (new != 0) - (old != 0)
+        if filled:
+            self.filled[key] = filled
+        else:
+            del self.chunks[key], self.filled[key]
+        if self.journal is not None:
+            self.journal.extend((x * self.size + y, old, new))
+        self.stats.apply(packed_tile(old), tile)
+        self.dirty.add((x, y))
+
+    def cells(self, key: ChunkKey) -> Iterator[Tuple[Cell, int]]:
+        """``((x, y), code)`` of the non-empty cells of one chunk."""
+        block = self.chunks.get(key)
+        if block is None:
+            return
+        x0, y0 = key[0] * CHUNK, key[1] * CHUNK
+        for i, code in enumerate(block):
+            if code:
+                yield (x0 + i // CHUNK, y0 + i % CHUNK), code
+
+    def clear(self):
+        for key in self.chunks:
+            for (x, y), code in self.cells(key):
+                self.dirty.add((x, y))
+                if self.journal is not None:
+                    self.journal.extend((x * self.size + y, code, 0))
+        self.chunks.clear()
+        self.filled.clear()
+        self.stats = HouseStats()
+
+    def snapshot(self) -> 'ChunkedGrid':
+        copy = ChunkedGrid(self.size)
+        copy.load_chunks({key: array('I', block) for key, block in self.chunks.items()})
+        return copy
+
+    def load_chunks(self, chunks: Dict[ChunkKey, array], counts: Optional[Counter] = None):
+        """Replace the contents wholesale without dirty marks or journal entries, e.g. after decoding.
+
+        ``counts`` (cells per packed code) saves a pass over all cells when the caller already has them.
+        """
+        self.filled = {key: CHUNK * CHUNK - block.count(0) for key, block in chunks.items()}
+        self.chunks = {key: block for key, block in chunks.items() if self.filled[key]}
+        self.filled = {key: self.filled[key] for key in self.chunks}
+        if counts is None:
+            counts = Counter()
+            for block in self.chunks.values():
+                counts.update(block)
+        self.stats = HouseStats()
+        for code, count in counts.items():
+            if code and count:
+                self.stats.add(packed_tile(code), count)
+
+    def assign(self, snapshot: 'ChunkedGrid'):
+        """Make the grid equal to ``snapshot``, marking only the cells that differ."""
+        if snapshot.size != self.size:
+            raise ValueError(f'Snapshot is {snapshot.size}x{snapshot.size}, grid is {self.size}x{self.size}')
+        empty = array('I', bytes(4 * CHUNK * CHUNK))
+        for key in self.chunks.keys() | snapshot.chunks.keys():
+            old_block = self.chunks.get(key, empty)
+            new_block = snapshot.chunks.get(key, empty)
+            if old_block == new_block:
+                continue
+            x0, y0 = key[0] * CHUNK, key[1] * CHUNK
+            for i, (old, new) in enumerate(zip(old_block, new_block)):
+                if old != new:
+                    x, y = x0 + i // CHUNK, y0 + i % CHUNK
+                    self.dirty.add((x, y))
+                    if self.journal is not None:
+                        self.journal.extend((x * self.size + y, old, new))
+                    self.stats.apply(packed_tile(old), packed_tile(new))
+        self.chunks = {key: array('I', block) for key, block in snapshot.chunks.items()}
+        self.filled = dict(snapshot.filled)
+
+    def take_dirty(self) -> Set[Cell]:
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(block) * block.itemsize for block in self.chunks.values())
+
+def new_grid(size: int) -> Union[HouseGrid, ChunkedGrid]:
+    """Flat arrays for ordinary plans, lazily allocated chunks beyond ``FLAT_GRID_LIMIT``."""
+    return ChunkedGrid(size) if size > FLAT_GRID_LIMIT else HouseGrid(size)
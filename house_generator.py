@@ -0,0 +1,157 @@
+import random
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from house_model import FurnitureType, GridSnapshot, RoomType, TileCodes, TileType, make_tile, tile_codes
+
+Rect = Tuple[int, int, int, int]  # top, left, bottom, right (inclusive)
+
+ROOM_COLORS: Dict[RoomType, str] = {
+    RoomType.LIVING_ROOM: "#DEB887",
+    RoomType.BEDROOM: "#E6E6FA",
+    RoomType.KITCHEN: "#F0E68C",
+    RoomType.BATHROOM: "#B0E0E6",
+    RoomType.GARAGE: "#D3D3D3",
+}
+
+ROOM_FURNITURE: Dict[RoomType, List[FurnitureType]] = {
+    RoomType.LIVING_ROOM: [FurnitureType.SOFA, FurnitureType.TV, FurnitureType.TABLE, FurnitureType.CHAIR],
+    RoomType.BEDROOM: [FurnitureType.BED, FurnitureType.TABLE],
+    RoomType.KITCHEN: [FurnitureType.FRIDGE, FurnitureType.TABLE, FurnitureType.CHAIR, FurnitureType.SINK],
+    RoomType.BATHROOM: [FurnitureType.TOILET, FurnitureType.SINK],
+    RoomType.GARAGE: [],
+}
+
+_WALL = tile_codes(make_tile(TileType.WALL, color="#8B4513"))
+_DOOR = tile_codes(make_tile(TileType.DOOR, color="#654321"))
+_WINDOW = tile_codes(make_tile(TileType.WINDOW, color="#87CEEB"))
+_FLOORS = {room: tile_codes(make_tile(TileType.FLOOR, room_type=room, color=color)) for room, color in ROOM_COLORS.items()}
+_FURNITURE = {furniture: tile_codes(make_tile(TileType.FURNITURE, furniture_type=furniture, color="#4682B4"))
+              for furniture in FurnitureType}
+_ROOMS = list(RoomType)
+
+class _Layout:
+    """Code arrays under construction; rectangles are written with one slice assignment per row and field."""
+
+    def __init__(self, size: int):
+        self.size = size
+        cell_count = size * size
+        self.fields = (array('B', bytes(cell_count)), array('B', bytes(cell_count)), array('B', bytes(cell_count)),
+                       array('H', bytes(2 * cell_count)), array('B', bytes(cell_count)))
+
+    def fill(self, rect: Rect, codes: TileCodes):
+        top, left, bottom, right = rect
+        width = right - left + 1
+        if width == 1:
+            start, stop, height = top * self.size + left, bottom * self.size + left + 1, bottom - top + 1
+            for field, code in zip(self.fields, codes):
+                field[start:stop:self.size] = array(field.typecode, [code]) * height
+            return
+        rows = [array(field.typecode, [code]) * width for field, code in zip(self.fields, codes)]
+        for x in range(top, bottom + 1):
+            start = x * self.size + left
+            for field, row in zip(self.fields, rows):
+                field[start:start + width] = row
+
+    def set(self, x: int, y: int, codes: TileCodes):
+        i = x * self.size + y
+        for field, code in zip(self.fields, codes):
+            field[i] = code
+
+    def type_at(self, x: int, y: int) -> int:
+        return self.fields[0][x * self.size + y]
+
+def _split(rect: Rect, rng: random.Random, min_room: int, max_room: int, leaves: List[Rect], walls: List[Rect]):
+    top, left, bottom, right = rect
+    height, width = bottom - top + 1, right - left + 1
+    can_split_rows = height >= 2 * min_room + 1
+    can_split_columns = width >= 2 * min_room + 1
+    if (height <= max_room and width <= max_room) or not (can_split_rows or can_split_columns):
+        leaves.append(rect)
+        return
+    if can_split_rows and (not can_split_columns or height > width or (height == width and rng.random() < 0.5)):
+        x = rng.randint(top + min_room, bottom - min_room)
+        walls.append((x, left, x, right))
+        _split((top, left, x - 1, right), rng, min_room, max_room, leaves, walls)
+        _split((x + 1, left, bottom, right), rng, min_room, max_room, leaves, walls)
+    else:
+        y = rng.randint(left + min_room, right - min_room)
+        walls.append((top, y, bottom, y))
+        _split((top, left, bottom, y - 1), rng, min_room, max_room, leaves, walls)
+        _split((top, y + 1, bottom, right), rng, min_room, max_room, leaves, walls)
+
+def min_layout_size(min_room: int = 3) -> int:
+    """Smallest grid ``generate_layout`` fits a house with rooms of ``min_room`` cells in."""
+    return 2 * min_room + 3
+
+def generate_layout(size: int, rng: Optional[random.Random] = None,
+                    min_room: int = 3, max_room: int = 8) -> GridSnapshot:
+    """Generate a walled house by binary space partitioning.
+
+    The footprint is split recursively until every room is at most ``max_room`` cells across.
+    Every split wall gets one door, which keeps all rooms connected, and the house gets a front
+    door, a window per room that touches the outer wall and a piece of furniture per room.
+    """
+    if size < min_layout_size(min_room):
+        raise ValueError(f'Grid size {size} is too small for rooms of at least {min_room} cells')
+    rng = rng or random.Random()
+    layout = _Layout(size)
+    height = rng.randint(max(2 * min_room + 3, size * 3 // 5), size)
+    width = rng.randint(max(2 * min_room + 3, size * 3 // 5), size)
+    top, left = rng.randint(0, size - height), rng.randint(0, size - width)
+    outline = (top, left, top + height - 1, left + width - 1)
+    inside = (top + 1, left + 1, top + height - 2, left + width - 2)
+    layout.fill(outline, _WALL)
+
+    leaves: List[Rect] = []
+    walls: List[Rect] = []
+    _split(inside, rng, min_room, max_room, leaves, walls)
+    rooms = [rng.choice(_ROOMS) for _ in leaves]
+    for leaf, room in zip(leaves, rooms):
+        layout.fill(leaf, _FLOORS[room])
+    for wall in walls:
+        layout.fill(wall, _WALL)
+
+    wall_type, door_type = _WALL[0], _DOOR[0]
+    for wall in walls:
+        # a door only works where both sides are floor, not where a later wall meets this one
+        if wall[0] == wall[2]:
+            x = wall[0]
+            cells = [(x, y) for y in range(wall[1], wall[3] + 1)
+                     if layout.type_at(x - 1, y) != wall_type and layout.type_at(x + 1, y) != wall_type]
+        else:
+            y = wall[1]
+            cells = [(x, y) for x in range(wall[0], wall[2] + 1)
+                     if layout.type_at(x, y - 1) != wall_type and layout.type_at(x, y + 1) != wall_type]
+        if cells:
+            layout.set(*rng.choice(cells), _DOOR)
+
+    o_top, o_left, o_bottom, o_right = outline
+    front_door = False
+    for (l_top, l_left, l_bottom, l_right), room in zip(leaves, rooms):
+        outer = []
+        if l_top == o_top + 1:
+            outer += [(o_top, y) for y in range(l_left, l_right + 1)]
+        if l_bottom == o_bottom - 1:
+            outer += [(o_bottom, y) for y in range(l_left, l_right + 1)]
+        if l_left == o_left + 1:
+            outer += [(x, o_left) for x in range(l_top, l_bottom + 1)]
+        if l_right == o_right - 1:
+            outer += [(x, o_right) for x in range(l_top, l_bottom + 1)]
+        if outer:
+            if not front_door:
+                layout.set(*outer.pop(rng.randrange(len(outer))), _DOOR)
+                front_door = True
+            layout.set(*rng.choice(outer), _WINDOW)
+
+        if ROOM_FURNITURE[room]:
+            x, y = rng.randint(l_top, l_bottom), rng.randint(l_left, l_right)
+            if door_type not in (layout.type_at(x - 1, y), layout.type_at(x + 1, y),
+                                 layout.type_at(x, y - 1), layout.type_at(x, y + 1)):
+                layout.set(x, y, _FURNITURE[rng.choice(ROOM_FURNITURE[room])])
+    return GridSnapshot(*layout.fields)
+
+def generate_layouts(size: int, count: int, seed: Optional[int] = None, **options) -> List[GridSnapshot]:
+    """Batch API: ``count`` independent layouts from one seeded generator."""
+    rng = random.Random(seed)
+    return [generate_layout(size, rng, **options) for _ in range(count)]
@@ -0,0 +1,170 @@
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Union
+
+from house_chunks import ChunkedGrid
+from house_model import GridSnapshot, HouseGrid, pack_codes, tile_codes, tile_from_codes, unpack_codes
+from house_store import decode_grid, encode_snapshot
+
+@dataclass
+class Delta:
+    """Changed cells of one operation as flat ``(index, old code, new code)`` uint32 triples."""
+    cells: array
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.cells) * self.cells.itemsize
+
+@dataclass
+class Checkpoint:
+    """Run-length encoded full grid before and after an operation that touched most of the grid."""
+    before: bytes
+    after: bytes
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.before) + len(self.after)
+
+Entry = Union[Delta, Checkpoint]
+
+class GridHistory:
+    """Undo/redo stack of grid operations bounded by ``max_bytes``.
+
+    An operation is recorded as a ``Delta`` of the cells it changed. When the delta would be
+    larger than encoding the whole grid twice (clearing, loading a template or a design on a
+    big grid), a ``Checkpoint`` is stored instead; chunked plans always use deltas. Once the
+    stacks exceed ``max_bytes``, the oldest undo steps are forgotten.
+
+    With ``shared`` the grid is edited by other clients too. Only deltas are recorded then,
+    and undo and redo only touch cells that still hold what this history left in them: cells
+    another client has changed since are kept as they are and counted in ``conflicts``.
+    """
+
+    def __init__(self, max_bytes: int = 1 << 20, shared: bool = False):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.conflicts = 0  # cells the last undo or redo left alone
+        self.undo_stack: List[Entry] = []
+        self.redo_stack: List[Entry] = []
+        self.nbytes = 0
+        self._grid: Optional[HouseGrid] = None
+        self._journal: Optional[array] = None
+        self._depth = 0
+        self._held = False
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def begin(self, grid: HouseGrid):
+        """Start journaling changes to ``grid``; nested calls join the outermost operation."""
+        self._depth += 1
+        if self._depth == 1:
+            self._grid = grid
+            if self._journal is None:
+                self._journal = array('I')
+            grid.journal = self._journal
+
+    def end(self):
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        # detach between batches so that edits by other clients of a shared grid are not journaled here
+        self._grid.journal = None
+        if not self._held:
+            self._commit()
+
+    def hold(self):
+        """Keep the current operation open across several batches, e.g. a drag spanning many events."""
+        self._held = True
+
+    def release(self):
+        self._held = False
+        if self._depth == 0:
+            self._commit()
+
+    def _commit(self):
+        cells, self._journal = self._journal, None
+        if cells:
+            self._push(self._compact(self._grid, cells))
+
+    @contextmanager
+    def record(self, grid: HouseGrid) -> Iterator[None]:
+        self.begin(grid)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def undo(self, grid: HouseGrid) -> bool:
+        if not self.undo_stack:
+            return False
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        self.conflicts = 0
+        if isinstance(entry, Checkpoint):
+            grid.assign(decode_grid(entry.before)[1])
+        else:
+            cells = entry.cells
+            for n in range(len(cells) - 3, -1, -3):
+                self._write(grid, cells[n], cells[n + 2], cells[n + 1])
+        return True
+
+    def redo(self, grid: HouseGrid) -> bool:
+        if not self.redo_stack:
+            return False
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        self.conflicts = 0
+        if isinstance(entry, Checkpoint):
+            grid.assign(decode_grid(entry.after)[1])
+        else:
+            cells = entry.cells
+            for n in range(0, len(cells), 3):
+                self._write(grid, cells[n], cells[n + 1], cells[n + 2])
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.nbytes = 0
+
+    def _write(self, grid: HouseGrid, index: int, expected: int, code: int):
+        """Set a cell to ``code``; on a shared grid only if it still holds ``expected``."""
+        x, y = divmod(index, grid.size)
+        if self.shared and pack_codes(tile_codes(grid.get(x, y))) != expected:
+            self.conflicts += 1
+            return
+        grid.set(x, y, tile_from_codes(unpack_codes(code)))
+
+    def _compact(self, grid: HouseGrid, cells: array) -> Entry:
+        delta = Delta(cells)
+        # a chunked plan is mostly empty, so its deltas are bounded by the cells in use anyway;
+        # a shared grid needs the cells to tell its own changes from those of others
+        if len(cells) // 3 <= grid.size or isinstance(grid, ChunkedGrid) or self.shared:
+            return delta
+        after = grid.snapshot()
+        before = GridSnapshot(*(array(field.typecode, field) for field in after))
+        for n in range(len(cells) - 3, -1, -3):
+            index, old = cells[n], unpack_codes(cells[n + 1])
+            for field, value in zip(before, old):
+                field[index] = value
+        checkpoint = Checkpoint(encode_snapshot(grid.size, before), encode_snapshot(grid.size, after))
+        return checkpoint if checkpoint.nbytes < delta.nbytes else delta
+
+    def _push(self, entry: Entry):
+        self.nbytes += entry.nbytes - sum(redone.nbytes for redone in self.redo_stack)
+        self.redo_stack.clear()
+        self.undo_stack.append(entry)
+        dropped = 0
+        while self.nbytes > self.max_bytes and dropped < len(self.undo_stack):
+            self.nbytes -= self.undo_stack[dropped].nbytes
+            dropped += 1
+        del self.undo_stack[:dropped]
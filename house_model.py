@@ -0,0 +1,304 @@
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from dataclasses import dataclass
+from enum import Enum
+
+class TileType(Enum):
+    EMPTY = "empty"
+    WALL = "wall"
+    DOOR = "door"
+    WINDOW = "window"
+    FLOOR = "floor"
+    ROOF = "roof"
+    FURNITURE = "furniture"
+
+class RoomType(Enum):
+    LIVING_ROOM = "Living Room"
+    BEDROOM = "Bedroom"
+    KITCHEN = "Kitchen"
+    BATHROOM = "Bathroom"
+    GARAGE = "Garage"
+
+class FurnitureType(Enum):
+    SOFA = "sofa"
+    BED = "bed"
+    TABLE = "table"
+    CHAIR = "chair"
+    TV = "tv"
+    FRIDGE = "fridge"
+    TOILET = "toilet"
+    SINK = "sink"
+
+@dataclass(frozen=True, slots=True)
+class Tile:
+    type: TileType
+    room_type: Optional[RoomType] = None
+    furniture_type: Optional[FurnitureType] = None
+    color: str = "#E0E0E0"
+    rotation: int = 0
+
+Cell = Tuple[int, int]
+TileCodes = Tuple[int, int, int, int, int]
+
+# Code tables for the grid arrays; code 0 is always the value of an empty tile.
+TILE_TYPES: List[TileType] = list(TileType)
+ROOM_TYPES: List[Optional[RoomType]] = [None, *RoomType]
+FURNITURE_TYPES: List[Optional[FurnitureType]] = [None, *FurnitureType]
+ROTATIONS: List[int] = [0, 90, 180, 270]
+COLORS: List[str] = ["#E0E0E0"]  # shared by all sessions, in normalized "#RRGGBB" form
+MAX_COLORS = 0xFFFF  # palette codes are stored as unsigned shorts
+TILE_CACHE_SIZE = 1 << 14  # distinct tiles remembered by the interning and description caches
+HEX_COLOR = re.compile(r'#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})')
+
+_TILE_TYPE_CODES = {tile_type: code for code, tile_type in enumerate(TILE_TYPES)}
+_ROOM_CODES = {room: code for code, room in enumerate(ROOM_TYPES)}
+_FURNITURE_CODES = {furniture: code for code, furniture in enumerate(FURNITURE_TYPES)}
+_ROTATION_CODES = {rotation: code for code, rotation in enumerate(ROTATIONS)}
+_COLOR_CODES = {color: code for code, color in enumerate(COLORS)}
+
+_TILES_BY_CODES: Dict[TileCodes, Tile] = {}
+_CODES_BY_TILE: Dict[Tile, TileCodes] = {}
+
+def normalize_color(color: str) -> str:
+    """Return a hex colour as "#RRGGBB"; anything else raises ``ValueError``."""
+    match = HEX_COLOR.fullmatch(color) if isinstance(color, str) else None
+    if match is None:
+        raise ValueError(f'Invalid colour: {color!r}')
+    digits = match.group(1).upper()
+    return '#' + (''.join(digit * 2 for digit in digits) if len(digits) == 3 else digits)
+
+def color_code(color: str) -> int:
+    """Return the palette code of a colour, extending the shared palette on first use."""
+    code = _COLOR_CODES.get(color)
+    if code is None:
+        color = normalize_color(color)
+        code = _COLOR_CODES.get(color)
+        if code is None:
+            if len(COLORS) >= MAX_COLORS:
+                raise ValueError(f'The colour palette is full ({MAX_COLORS} colours)')
+            code = _COLOR_CODES[color] = len(COLORS)
+            COLORS.append(color)
+    return code
+
+def _remember(cache: dict, key, value):
+    """Add to one of the tile caches, forgetting the oldest entry once it is full."""
+    if len(cache) >= TILE_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+def tile_codes(tile: Tile) -> TileCodes:
+    codes = _CODES_BY_TILE.get(tile)
+    if codes is None:
+        if tile.rotation not in _ROTATION_CODES:
+            raise ValueError(f'Unsupported tile rotation: {tile.rotation}')
+        codes = (_TILE_TYPE_CODES[tile.type], _ROOM_CODES[tile.room_type], _FURNITURE_CODES[tile.furniture_type],
+                 color_code(tile.color), _ROTATION_CODES[tile.rotation])
+        if codes not in _TILES_BY_CODES:
+            _remember(_TILES_BY_CODES, codes, tile)
+        _remember(_CODES_BY_TILE, tile, codes)
+    return codes
+
+def tile_from_codes(codes: TileCodes) -> Tile:
+    tile = _TILES_BY_CODES.get(codes)
+    if tile is None:
+        tile_type, room, furniture, color, rotation = codes
+        tile = Tile(TILE_TYPES[tile_type], ROOM_TYPES[room], FURNITURE_TYPES[furniture],
+                    COLORS[color], ROTATIONS[rotation])
+        _remember(_TILES_BY_CODES, codes, tile)
+    return tile
+
+def pack_codes(codes: TileCodes) -> int:
+    """Fold a cell's field codes into one integer (the palette colour occupies the high bits)."""
+    tile_type, room, furniture, color, rotation = codes
+    return tile_type | room << 3 | furniture << 6 | rotation << 10 | color << 12
+
+def unpack_codes(code: int) -> TileCodes:
+    return code & 0x7, code >> 3 & 0x7, code >> 6 & 0xF, code >> 12, code >> 10 & 0x3
+
+def intern_tile(tile: Tile) -> Tile:
+    """Return the shared flyweight instance equal to ``tile``."""
+    codes = tile_codes(tile)
+    interned = _TILES_BY_CODES.get(codes)
+    if interned is None:
+        interned = tile_from_codes(codes)
+    return interned
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def make_tile(tile_type: TileType, room_type: Optional[RoomType] = None,
+              furniture_type: Optional[FurnitureType] = None, color: str = "#E0E0E0", rotation: int = 0) -> Tile:
+    """Interned ``Tile`` constructor; repeated calls with the same arguments allocate nothing.
+
+    The colour is normalized to "#RRGGBB"; an invalid one raises ``ValueError``.
+    """
+    return intern_tile(Tile(tile_type, room_type, furniture_type, normalize_color(color), rotation))
+
+EMPTY_TILE = make_tile(TileType.EMPTY)
+
+class GridSnapshot(NamedTuple):
+    """Detached copy of a grid's code arrays, e.g. a decoded design or a compiled template."""
+    types: array
+    rooms: array
+    furniture: array
+    colors: array
+    rotations: array
+
+class HouseStats:
+    """Tile counters maintained from (old, new) tile pairs instead of full-grid rescans."""
+
+    def __init__(self):
+        self.walls = 0
+        self.doors = 0
+        self.windows = 0
+        self.furniture = 0
+        self.room_tiles: Dict[RoomType, int] = {}
+
+    @property
+    def rooms(self) -> int:
+        return len(self.room_tiles)
+
+    def apply(self, old: Tile, new: Tile):
+        self._count(old, -1)
+        self._count(new, 1)
+
+    def add(self, tile: Tile, count: int):
+        """Count ``count`` more cells holding ``tile``, e.g. when a whole block is loaded at once."""
+        self._count(tile, count)
+
+    def _count(self, tile: Tile, delta: int):
+        if tile.type == TileType.WALL:
+            self.walls += delta
+        elif tile.type == TileType.DOOR:
+            self.doors += delta
+        elif tile.type == TileType.WINDOW:
+            self.windows += delta
+        elif tile.type == TileType.FURNITURE:
+            self.furniture += delta
+        elif tile.type == TileType.FLOOR and tile.room_type:
+            remaining = self.room_tiles.get(tile.room_type, 0) + delta
+            if remaining:
+                self.room_tiles[tile.room_type] = remaining
+            else:
+                del self.room_tiles[tile.room_type]
+
+    def rebuild(self, grid: 'HouseGrid'):
+        """Recount from scratch; only needed after bulk loads that bypass ``apply``."""
+        self.__init__()
+        types = grid.types
+        self.walls = types.count(_TILE_TYPE_CODES[TileType.WALL])
+        self.doors = types.count(_TILE_TYPE_CODES[TileType.DOOR])
+        self.windows = types.count(_TILE_TYPE_CODES[TileType.WINDOW])
+        self.furniture = types.count(_TILE_TYPE_CODES[TileType.FURNITURE])
+        floor = _TILE_TYPE_CODES[TileType.FLOOR]
+        room_counts = [0] * len(ROOM_TYPES)
+        for tile_type, room in zip(types, grid.rooms):
+            if tile_type == floor:
+                room_counts[room] += 1
+        for code, count in enumerate(room_counts):
+            if code and count:
+                self.room_tiles[ROOM_TYPES[code]] = count
+
+class HouseGrid:
+    """Square tile grid stored as one compact code array per tile field.
+
+    Cells are addressed as ``(x, y)`` and kept row-major at index ``x * size + y``; ``get``
+    returns the interned ``Tile`` flyweight for a cell. The grid also remembers which cells
+    changed since the last render and, while ``journal`` is set, appends an
+    ``(index, old packed code, new packed code)`` triple to it for every change.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        cell_count = size * size
+        self.types = array('B', bytes(cell_count))
+        self.rooms = array('B', bytes(cell_count))
+        self.furniture = array('B', bytes(cell_count))
+        self.colors = array('H', bytes(2 * cell_count))
+        self.rotations = array('B', bytes(cell_count))
+        self.dirty: Set[Cell] = set()
+        self.stats = HouseStats()
+        self.journal: Optional[array] = None
+
+    def get(self, x: int, y: int) -> Tile:
+        i = x * self.size + y
+        return tile_from_codes((self.types[i], self.rooms[i], self.furniture[i], self.colors[i], self.rotations[i]))
+
+    def set(self, x: int, y: int, tile: Tile):
+        i = x * self.size + y
+        tile_type, room, furniture, color, rotation = tile_codes(tile)
+        if (self.types[i] != tile_type or self.rooms[i] != room or self.furniture[i] != furniture
+                or self.colors[i] != color or self.rotations[i] != rotation):
+            if self.journal is not None:
+                self.journal.extend((i, pack_codes((self.types[i], self.rooms[i], self.furniture[i],
+                                                    self.colors[i], self.rotations[i])),
+                                     pack_codes((tile_type, room, furniture, color, rotation))))
+            self.stats.apply(self.get(x, y), tile)
+            self.types[i] = tile_type
+            self.rooms[i] = room
+            self.furniture[i] = furniture
+            self.colors[i] = color
+            self.rotations[i] = rotation
+            self.dirty.add((x, y))
+
+    def clear(self):
+        size = self.size
+        for i, (tile_type, room, furniture, color, rotation) in enumerate(
+                zip(self.types, self.rooms, self.furniture, self.colors, self.rotations)):
+            if tile_type or room or furniture or color or rotation:
+                self.dirty.add(divmod(i, size))
+                if self.journal is not None:
+                    self.journal.extend((i, pack_codes((tile_type, room, furniture, color, rotation)), 0))
+        cell_count = size * size
+        self.types[:] = array('B', bytes(cell_count))
+        self.rooms[:] = array('B', bytes(cell_count))
+        self.furniture[:] = array('B', bytes(cell_count))
+        self.colors[:] = array('H', bytes(2 * cell_count))
+        self.rotations[:] = array('B', bytes(cell_count))
+        self.stats = HouseStats()
+
+    def snapshot(self) -> GridSnapshot:
+        return GridSnapshot(array('B', self.types), array('B', self.rooms), array('B', self.furniture),
+                            array('H', self.colors), array('B', self.rotations))
+
+    def assign(self, snapshot: GridSnapshot):
+        """Bulk-copy a whole snapshot into the grid, marking only the cells that differ."""
+        if len(snapshot.types) != len(self.types):
+            raise ValueError(f'Snapshot has {len(snapshot.types)} cells, grid has {len(self.types)}')
+        size = self.size
+        fields = (self.types, self.rooms, self.furniture, self.colors, self.rotations)
+        changes: List[Tuple[TileCodes, TileCodes]] = []
+        for start in range(0, size * size, size):
+            stop = start + size
+            # most rows of a template or a reloaded design are unchanged, so compare whole rows first
+            if all(field[start:stop] == new[start:stop] for field, new in zip(fields, snapshot)):
+                continue
+            old = zip(*(field[start:stop] for field in fields))
+            for i, before, after in zip(range(start, stop), old, zip(*(new[start:stop] for new in snapshot))):
+                if before != after:
+                    changes.append((before, after))
+                    self.dirty.add(divmod(i, size))
+                    if self.journal is not None:
+                        self.journal.extend((i, pack_codes(before), pack_codes(after)))
+        self.types[:] = snapshot.types
+        self.rooms[:] = snapshot.rooms
+        self.furniture[:] = snapshot.furniture
+        self.colors[:] = snapshot.colors
+        self.rotations[:] = snapshot.rotations
+        if len(changes) > size * size // 8:
+            self.stats.rebuild(self)
+        else:
+            for before, after in changes:
+                self.stats.apply(tile_from_codes(before), tile_from_codes(after))
+
+    def mark_all_dirty(self):
+        self.dirty.update((x, y) for x in range(self.size) for y in range(self.size))
+
+    def take_dirty(self) -> Set[Cell]:
+        """Return the cells changed since the previous call and start a new change set."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def __iter__(self) -> Iterator[List[Tile]]:
+        for x in range(self.size):
+            yield [self.get(x, y) for y in range(self.size)]
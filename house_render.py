@@ -0,0 +1,339 @@
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from nicegui import ui
+
+from house_chunks import CHUNK, ChunkedGrid, ChunkKey, packed_tile
+from house_model import EMPTY_TILE, TILE_CACHE_SIZE, Cell, FurnitureType, HouseGrid, RoomType, Tile, TileType
+
+Rendered = Tuple[str, str]
+DescribeTile = Callable[[Tile], Rendered]
+CellHandler = Callable[[int, int], None]
+
+class GridInput(NamedTuple):
+    """Callbacks a renderer reports pointer input to.
+
+    ``stroke`` receives a complete stroke (sampled path and whether it erases). Renderers that
+    cannot collect a drag in the browser report ``press``/``enter``/``release`` per cell instead.
+    ``apply`` receives brush operations the browser has already painted optimistically, and
+    whether the batch is the last one of its drag.
+    """
+    stroke: Callable[[List[Cell], bool], None]
+    press: CellHandler
+    enter: CellHandler
+    release: Callable[[], None]
+    apply: Callable[[List[Tuple[Cell, Tile]], bool], int]
+
+TILE_EMOJIS = {
+    TileType.WALL: "🧱",
+    TileType.DOOR: "🚪",
+    TileType.WINDOW: "🪟",
+    TileType.FLOOR: "🟫",
+    TileType.ROOF: "🔺",
+    TileType.FURNITURE: "🪑"
+}
+
+ROOM_EMOJIS = {
+    RoomType.LIVING_ROOM: "🛋️",
+    RoomType.BEDROOM: "🛏️",
+    RoomType.KITCHEN: "🍳",
+    RoomType.BATHROOM: "🚿",
+    RoomType.GARAGE: "🚗"
+}
+
+FURNITURE_EMOJIS = {
+    FurnitureType.SOFA: "🛋️",
+    FurnitureType.BED: "🛏️",
+    FurnitureType.TABLE: "🪑",
+    FurnitureType.CHAIR: "💺",
+    FurnitureType.TV: "📺",
+    FurnitureType.FRIDGE: "🧊",
+    FurnitureType.TOILET: "🚽",
+    FurnitureType.SINK: "🚰"
+}
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def describe_tile(tile: Tile) -> Rendered:
+    """Return the ``(text, background colour)`` of a tile; computed once per distinct tile."""
+    if tile.type == TileType.EMPTY:
+        return '', '#F5F5F5'
+    elif tile.type == TileType.FURNITURE:
+        return FURNITURE_EMOJIS.get(tile.furniture_type, "📦"), tile.color
+    elif tile.type == TileType.FLOOR:
+        return ROOM_EMOJIS.get(tile.room_type, "🏠") if tile.room_type else '', tile.color
+    else:
+        return TILE_EMOJIS.get(tile.type, "⬜"), tile.color
+
+# browser-side filters, so hovering without drawing sends nothing to the server
+WHILE_DRAWING = '(e) => { if (e.buttons & 1) emit(); }'
+LEFT_BUTTON = '(e) => { if (e.button === 0) emit(); }'
+
+class ButtonGridRenderer:
+    """One ``ui.button`` per cell; every client holds ``size²`` server-side elements."""
+
+    def __init__(self, size: int, tile_size: int, describe: DescribeTile, grid_input: GridInput):
+        self.tile_size = tile_size
+        self.describe = describe
+        self.rendered: Dict[Cell, Rendered] = {}
+        self.styles: Dict[str, str] = {}
+        self.container = ui.column().classes('inline-block border-2 border-gray-300')
+        self.container.on('mouseleave', grid_input.release, js_handler=WHILE_DRAWING)
+        self.container.on('mouseup', grid_input.release, js_handler=LEFT_BUTTON)  # bubbles up from the buttons
+        with self.container:
+            self.elements = []
+            for i in range(size):
+                with ui.row().classes('gap-0'):
+                    row_elements = []
+                    for j in range(size):
+                        tile_elem = ui.button('').classes(
+                            f'border border-gray-200 hover:border-blue-400 transition-colors'
+                        ).style(f'width: {tile_size}px; height: {tile_size}px;')
+                        tile_elem.on('mousedown.left', lambda e, x=i, y=j: grid_input.press(x, y))
+                        tile_elem.on('mouseenter', lambda e, x=i, y=j: grid_input.enter(x, y), js_handler=WHILE_DRAWING)
+                        tile_elem.on('contextmenu', lambda e, x=i, y=j: grid_input.stroke([(x, y)], True))
+                        row_elements.append(tile_elem)
+                    self.elements.append(row_elements)
+
+    def set_brush(self, tile: Optional[Tile]):
+        """Buttons only change after a server round trip, so there is nothing to prepare."""
+
+    def render(self, grid: HouseGrid, cells: Iterable[Cell]):
+        for x, y in cells:
+            rendered = self.describe(grid.get(x, y))
+            if self.rendered.get((x, y)) == rendered:
+                continue
+            self.rendered[(x, y)] = rendered
+            text, color = rendered
+            elem = self.elements[x][y]
+            style = self.styles.get(color)
+            if style is None:
+                style = self.styles[color] = f'background-color: {color}; width: {self.tile_size}px; height: {self.tile_size}px;'
+            elem.text = text
+            elem.style(style)
+
+class HouseCanvas(ui.element, component='house_canvas.js'):
+    """Whole grid drawn on a single canvas element; drags are mapped back to cell paths in the browser.
+
+    Only changed cells travel to the client, encoded as flat ``[index, palette_id, ...]`` pairs
+    against a palette of distinct ``(text, color)`` tiles that is extended on demand.
+
+    With ``optimistic`` the browser paints brush strokes itself and sends the queued
+    ``[index, brush_id, ...]`` operations every ``flush_ms`` and the rest when the drag ends,
+    marked as its last batch. The server applies each batch in arrival order and acknowledges
+    it with the design version. Cells whose outcome differs
+    from what the browser painted are then repainted.
+    """
+
+    def __init__(self, size: int, tile_size: int, describe: DescribeTile, grid_input: GridInput,
+                 optimistic: bool = False, flush_ms: int = 50):
+        super().__init__()
+        self._props['size'] = size
+        self._props['tile_size'] = tile_size
+        self._props['optimistic'] = optimistic
+        self._props['flush_ms'] = flush_ms
+        self._props['brush'] = None
+        self._props['eraser'] = None
+        self.size = size
+        self.describe = describe
+        self.grid_input = grid_input
+        self.optimistic = optimistic
+        self.palette: List[Rendered] = []
+        self.palette_ids: Dict[Rendered, int] = {}
+        self.unsent_palette: List[Rendered] = []
+        self.cells: List[int] = [-1] * (size * size)
+        self.brushes: Dict[int, Tile] = {0: EMPTY_TILE}
+        self.brush_ids: Dict[Tile, int] = {EMPTY_TILE: 0}
+        self.grid: Optional[HouseGrid] = None
+        self.initialized = False
+        self.on('init', self._handle_init)
+        self.on('stroke', lambda e: grid_input.stroke([(x, y) for x, y in e.args['path']], e.args['button'] == 2))
+        self.on('ops', lambda e: self._handle_ops(e.args['seq'], e.args['ops'], e.args.get('done', True)))
+
+    def _handle_init(self):
+        self.initialized = True
+        self.unsent_palette = []
+        self.run_method('paint', self.palette, [v for i, p in enumerate(self.cells) if p >= 0 for v in (i, p)])
+
+    def _palette_id(self, rendered: Rendered) -> int:
+        palette_id = self.palette_ids.get(rendered)
+        if palette_id is None:
+            palette_id = self.palette_ids[rendered] = len(self.palette)
+            self.palette.append(rendered)
+            self.unsent_palette.append(rendered)
+        return palette_id
+
+    def _paint(self, changes: List[int]):
+        if self.initialized and (changes or self.unsent_palette):
+            self.run_method('paint', self.unsent_palette, changes)
+            self.unsent_palette = []
+
+    def set_brush(self, tile: Optional[Tile]):
+        """Tile the browser may paint by itself (``None`` sends every stroke to the server first)."""
+        if not self.optimistic:
+            return
+        brush = eraser = None
+        if tile is not None:
+            brush_id = self.brush_ids.get(tile)
+            if brush_id is None:
+                brush_id = self.brush_ids[tile] = len(self.brushes)
+                self.brushes[brush_id] = tile
+            brush = [brush_id, self._palette_id(self.describe(tile))]
+            eraser = [0, self._palette_id(self.describe(EMPTY_TILE))]
+            self._paint([])
+        if brush != self._props.get('brush') or eraser != self._props.get('eraser'):
+            self._props['brush'], self._props['eraser'] = brush, eraser
+            self.update()
+
+    def _handle_ops(self, seq: int, ops: List[int], done: bool = True):
+        operations: List[Tuple[Cell, Tile]] = []
+        painted: List[Cell] = []
+        for index, brush_id in zip(ops[::2], ops[1::2]):
+            if not 0 <= index < self.size * self.size:
+                continue
+            painted.append(divmod(index, self.size))
+            tile = self.brushes.get(brush_id)
+            if tile is None:
+                self.cells[index] = -1  # rejected; forces the real cell to be sent back below
+                continue
+            # the browser already shows this tile, so rendering it must not send it again
+            self.cells[index] = self.palette_ids[self.describe(tile)]
+            operations.append((divmod(index, self.size), tile))
+        version = self.grid_input.apply(operations, done)
+        self.run_method('ack', seq, version)
+        if self.grid is not None:
+            self.render(self.grid, painted)
+
+    def render(self, grid: HouseGrid, cells: Iterable[Cell]):
+        self.grid = grid
+        changes: List[int] = []
+        for x, y in cells:
+            palette_id = self._palette_id(self.describe(grid.get(x, y)))
+            index = x * self.size + y
+            if self.cells[index] != palette_id:
+                self.cells[index] = palette_id
+                changes += (index, palette_id)
+        self._paint(changes)
+
+class ChunkViewport(ui.element, component='house_viewport.js'):
+    """Virtualized view of a ``ChunkedGrid``: the browser pans and zooms a fixed-size canvas
+    and asks for the range of chunks it can see.
+
+    Only allocated chunks in that range are sent, as ``[palette_id, count, ...]`` runs against
+    the same kind of palette ``HouseCanvas`` uses. The browser caches them; the server remembers
+    which chunks the browser holds, sends later edits to those (or to visible ones) as
+    ``[index, palette_id, ...]`` pairs, and tells it to drop far-away chunks once it holds more
+    than ``max_cached``. Drags are reported as strokes in grid coordinates.
+    """
+
+    def __init__(self, size: int, tile_size: int, describe: DescribeTile, grid_input: GridInput,
+                 width: int = 800, height: int = 600, max_cached: int = 4096):
+        super().__init__()
+        self._props['size'] = size
+        self._props['tile_size'] = tile_size
+        self._props['chunk'] = CHUNK
+        self._props['width'] = width
+        self._props['height'] = height
+        self._props['empty_color'] = describe(EMPTY_TILE)[1]
+        self.size = size
+        self.describe = describe
+        self.max_cached = max_cached
+        self.palette: List[Rendered] = []
+        self.palette_ids: Dict[Rendered, int] = {}
+        self.unsent_palette: List[Rendered] = []
+        self.code_palette_ids: Dict[int, int] = {}
+        self.sent: Set[ChunkKey] = set()
+        self.view = (0, 0, -1, -1)  # visible chunk range: first row, first column, last row, last column
+        self.grid: Optional[ChunkedGrid] = None
+        self.initialized = False
+        self.on('init', self._handle_init)
+        self.on('view', lambda e: self._handle_view(e.args['x0'], e.args['y0'], e.args['x1'], e.args['y1']))
+        self.on('stroke', lambda e: grid_input.stroke([(x, y) for x, y in e.args['path']], e.args['button'] == 2))
+
+    def set_brush(self, tile: Optional[Tile]):
+        """Edits always round-trip through the server here."""
+
+    def _handle_init(self):
+        self.initialized = True
+        self.sent.clear()
+        self.unsent_palette = []
+        self.run_method('paint', self.palette, [])
+
+    def _palette_id(self, rendered: Rendered) -> int:
+        palette_id = self.palette_ids.get(rendered)
+        if palette_id is None:
+            palette_id = self.palette_ids[rendered] = len(self.palette)
+            self.palette.append(rendered)
+            self.unsent_palette.append(rendered)
+        return palette_id
+
+    def _code_palette_id(self, code: int) -> int:
+        palette_id = self.code_palette_ids.get(code)
+        if palette_id is None:
+            palette_id = self.code_palette_ids[code] = self._palette_id(self.describe(packed_tile(code)))
+        return palette_id
+
+    def _visible(self, key: ChunkKey) -> bool:
+        x0, y0, x1, y1 = self.view
+        return x0 <= key[0] <= x1 and y0 <= key[1] <= y1
+
+    def _visible_chunks(self) -> Iterable[ChunkKey]:
+        """Allocated chunks in view, walking whichever of the two sets is smaller."""
+        x0, y0, x1, y1 = self.view
+        if len(self.grid.chunks) < (x1 - x0 + 1) * (y1 - y0 + 1):
+            return [key for key in self.grid.chunks if self._visible(key)]
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1) if (cx, cy) in self.grid.chunks]
+
+    def _handle_view(self, x0: int, y0: int, x1: int, y1: int):
+        last = (self.size - 1) // CHUNK
+        self.view = (max(0, x0), max(0, y0), min(last, x1), min(last, y1))
+        if self.grid is not None:
+            self._send_chunks([key for key in self._visible_chunks() if key not in self.sent])
+
+    def _send_chunks(self, keys: List[ChunkKey]):
+        if not self.initialized:
+            return
+        chunks = []
+        for key in keys:
+            block = self.grid.chunks.get(key)
+            if block is None:
+                continue  # an unallocated chunk is empty, which is what the browser assumes
+            runs: List[int] = []
+            previous, count = -1, 0
+            for code in block:
+                if code == previous:
+                    count += 1
+                    continue
+                if count:
+                    runs += (self._code_palette_id(previous), count)
+                previous, count = code, 1
+            runs += (self._code_palette_id(previous), count)
+            chunks.append([key[0], key[1], runs])
+            self.sent.add(key)
+        dropped = []
+        if len(self.sent) > self.max_cached:
+            dropped = [key for key in self.sent if not self._visible(key)]
+            self.sent.difference_update(dropped)
+        if chunks or dropped or self.unsent_palette:
+            self.run_method('chunks', self.unsent_palette, chunks, [list(key) for key in dropped])
+            self.unsent_palette = []
+
+    def render(self, grid: ChunkedGrid, cells: Iterable[Cell]):
+        self.grid = grid
+        changes: List[int] = []
+        fetch: Set[ChunkKey] = set()
+        for x, y in cells:
+            key = (x // CHUNK, y // CHUNK)
+            if key in self.sent:
+                changes += (x * self.size + y, self._code_palette_id(grid.code(x, y)))
+            elif self._visible(key):
+                fetch.add(key)  # sent whole below; chunks out of view are fetched once they scroll in
+        if self.initialized and (changes or self.unsent_palette):
+            self.run_method('paint', self.unsent_palette, changes)
+            self.unsent_palette = []
+        self._send_chunks(list(fetch))
+
+RENDERERS = {
+    'buttons': ButtonGridRenderer,
+    'canvas': HouseCanvas,
+    'optimistic': partial(HouseCanvas, optimistic=True),
+}
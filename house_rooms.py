@@ -0,0 +1,303 @@
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from house_model import Cell, HouseGrid, TileType, TILE_TYPES
+
+# Per-cell kinds kept by the analyzer; everything from WALL up blocks a room.
+OPEN, FLOOR, FURNITURE, WALL, DOOR, WINDOW = range(6)
+_KINDS = [{TileType.FLOOR: FLOOR, TileType.FURNITURE: FURNITURE, TileType.WALL: WALL, TileType.DOOR: DOOR,
+           TileType.WINDOW: WINDOW}.get(tile_type, OPEN) for tile_type in TILE_TYPES]
+
+@dataclass
+class Region:
+    """A 4-connected area of non-blocking cells and the doors/windows on its boundary."""
+    id: int
+    cell: int
+    area: int = 0
+    floor: int = 0
+    furniture: int = 0
+    border_cells: int = 0
+    openings: Set[int] = field(default_factory=set)
+
+@dataclass
+class Room:
+    id: int
+    cell: Cell
+    area: int
+    doors: int
+    windows: int
+    furniture: int
+    floor: int
+
+class RoomAnalyzer:
+    """Finds wall-enclosed rooms and keeps them up to date as single cells change.
+
+    Walls, doors and windows separate regions; a region that does not touch the edge of the
+    grid is a room. Adding a blocking tile only searches the region it was placed in, from its
+    neighbours in lockstep, so the cost is bounded by the smaller side of a split. Removing one
+    merges the adjacent regions into the largest.
+
+    The ids of regions created, changed or removed by ``update`` collect in ``touched`` until
+    ``take_touched``, so that per-region results computed on top can be refreshed selectively.
+    ``layout_version`` only changes when regions are split, merged, created or removed, or a
+    door or the grid edge changes which regions they connect.
+    """
+
+    def __init__(self, grid: HouseGrid, rebuild_fraction: float = 0.125):
+        self.grid = grid
+        self.size = grid.size
+        self.rebuild_fraction = rebuild_fraction
+        self.kinds = bytearray(self.size * self.size)
+        self.labels = array('i', bytes(4 * self.size * self.size))
+        self.regions: Dict[int, Region] = {}
+        self.touched: Set[int] = set()
+        self.layout_version = 0
+        self._next_label = 1
+        self.rebuild()
+
+    def rebuild(self):
+        types = self.grid.types
+        self.kinds[:] = bytes(_KINDS[code] for code in types)
+        self.labels[:] = array('i', bytes(4 * self.size * self.size))
+        self.touched.update(self.regions)
+        self.layout_version += 1
+        self.regions.clear()
+        kinds, labels, size = self.kinds, self.labels, self.size
+        last_row = size * size - size
+        for start, kind in enumerate(kinds):
+            if kind >= WALL or labels[start]:
+                continue
+            label = self._next_label
+            labels[start] = label
+            stack, cells = [start], []
+            while stack:
+                i = stack.pop()
+                cells.append(i)
+                y = i % size
+                for j in (i - size if i >= size else -1, i + size if i < last_row else -1,
+                          i - 1 if y else -1, i + 1 if y < size - 1 else -1):
+                    if j >= 0 and not labels[j] and kinds[j] < WALL:
+                        labels[j] = label
+                        stack.append(j)
+            self._new_region(cells)
+
+    def update(self, cells: Iterable[Cell]):
+        """Apply grid changes at ``cells``; large batches fall back to a full rebuild."""
+        types, kinds, size = self.grid.types, self.kinds, self.size
+        changed = [i for i in (x * size + y for x, y in cells) if _KINDS[types[i]] != kinds[i]]
+        if len(changed) > size * size * self.rebuild_fraction:
+            self.rebuild()
+            return
+        for i in changed:
+            self._change(i, _KINDS[types[i]])
+
+    def take_touched(self) -> Set[int]:
+        touched, self.touched = self.touched, set()
+        return touched
+
+    def rooms(self) -> List[Room]:
+        """Enclosed rooms, largest first."""
+        return sorted((self._room(region) for region in self.regions.values() if not region.border_cells),
+                      key=lambda room: -room.area)
+
+    def room_at(self, x: int, y: int) -> Optional[Room]:
+        region = self.regions.get(self.labels[x * self.size + y])
+        return self._room(region) if region and not region.border_cells else None
+
+    def _room(self, region: Region) -> Room:
+        doors = sum(self.kinds[i] == DOOR for i in region.openings)
+        return Room(region.id, divmod(region.cell, self.size), region.area, doors,
+                    len(region.openings) - doors, region.furniture, region.floor)
+
+    def neighbors(self, i: int) -> List[int]:
+        size = self.size
+        y = i % size
+        result = []
+        if i >= size:
+            result.append(i - size)
+        if i < size * size - size:
+            result.append(i + size)
+        if y:
+            result.append(i - 1)
+        if y < size - 1:
+            result.append(i + 1)
+        return result
+
+    def _is_border(self, i: int) -> bool:
+        x, y = divmod(i, self.size)
+        return x == 0 or y == 0 or x == self.size - 1 or y == self.size - 1
+
+    def _flood(self, start: int, label: int = -1) -> List[int]:
+        """Cells of the region containing ``start`` (optionally only those labelled ``label``)."""
+        kinds, labels = self.kinds, self.labels
+        seen = {start}
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            for j in self.neighbors(i):
+                if j not in seen and kinds[j] < WALL and (label < 0 or labels[j] == label):
+                    seen.add(j)
+                    stack.append(j)
+        return list(seen)
+
+    def _new_region(self, cells: List[int]) -> Region:
+        region = Region(self._next_label, cells[0])
+        self._next_label += 1
+        self.regions[region.id] = region
+        self.touched.add(region.id)
+        self.layout_version += 1
+        kinds, labels = self.kinds, self.labels
+        for i in cells:
+            labels[i] = region.id
+            region.floor += kinds[i] == FLOOR
+            region.furniture += kinds[i] == FURNITURE
+            region.border_cells += self._is_border(i)
+            for j in self.neighbors(i):
+                if kinds[j] >= DOOR:
+                    region.openings.add(j)
+        region.area = len(cells)
+        return region
+
+    def _change(self, i: int, kind: int):
+        old = self.kinds[i]
+        if old < WALL and kind < WALL:
+            self.kinds[i] = kind
+            region = self.regions[self.labels[i]]
+            region.floor += (kind == FLOOR) - (old == FLOOR)
+            region.furniture += (kind == FURNITURE) - (old == FURNITURE)
+            self.touched.add(region.id)
+        elif old >= WALL and kind >= WALL:
+            self.kinds[i] = kind
+            self.layout_version += DOOR in (old, kind)
+            for j in self.neighbors(i):
+                region = self.regions.get(self.labels[j])
+                if region:
+                    self.touched.add(region.id)
+                    if kind >= DOOR:
+                        region.openings.add(i)
+                    else:
+                        region.openings.discard(i)
+        elif kind >= WALL:
+            self._block(i, kind)
+        else:
+            self._unblock(i, kind)
+
+    def _unblock(self, i: int, kind: int):
+        """A wall, door or window was removed: join the cell and merge all regions around it."""
+        self.layout_version += self.kinds[i] == DOOR or self._is_border(i)
+        self.kinds[i] = kind
+        neighbors = self.neighbors(i)
+        regions = {self.labels[j]: self.regions[self.labels[j]] for j in neighbors if self.labels[j]}
+        for region in regions.values():
+            region.openings.discard(i)
+        self.touched.update(regions)
+        if not regions:
+            self._new_region([i])
+            return
+        target = max(regions.values(), key=lambda region: region.area)
+        self.layout_version += len(regions) > 1
+        for region in regions.values():
+            if region is not target:
+                for j in self._flood(region.cell, region.id):
+                    self.labels[j] = target.id
+                target.area += region.area
+                target.floor += region.floor
+                target.furniture += region.furniture
+                target.border_cells += region.border_cells
+                target.openings |= region.openings
+                del self.regions[region.id]
+        self.labels[i] = target.id
+        target.area += 1
+        target.floor += kind == FLOOR
+        target.furniture += kind == FURNITURE
+        target.border_cells += self._is_border(i)
+        target.openings.update(j for j in neighbors if self.kinds[j] >= DOOR)
+        self.layout_version += any(self.kinds[j] == DOOR for j in neighbors)
+
+    def _block(self, i: int, kind: int):
+        """A wall, door or window was placed: remove the cell and split its region if needed."""
+        region = self.regions[self.labels[i]]
+        self.touched.add(region.id)
+        self.layout_version += kind == DOOR or self._is_border(i)
+        region.area -= 1
+        region.floor -= self.kinds[i] == FLOOR
+        region.furniture -= self.kinds[i] == FURNITURE
+        region.border_cells -= self._is_border(i)
+        self.kinds[i] = kind
+        self.labels[i] = 0
+        if region.area == 0:
+            del self.regions[region.id]
+            self.layout_version += 1
+        else:
+            seeds = [j for j in self.neighbors(i) if self.labels[j] == region.id]
+            if region.cell == i:
+                region.cell = seeds[0]
+            if len(seeds) > 1:
+                for piece in self._split_off(seeds):
+                    split = self._new_region(piece)
+                    region.area -= split.area
+                    region.floor -= split.floor
+                    region.furniture -= split.furniture
+                    region.border_cells -= split.border_cells
+                    if region.cell in piece:
+                        region.cell = next(j for j in seeds if self.labels[j] == region.id)
+            # openings next to the new blocking cell may no longer touch this region
+            for j in list(region.openings):
+                if not any(self.labels[k] == region.id for k in self.neighbors(j)):
+                    region.openings.discard(j)
+                    self.layout_version += self.kinds[j] == DOOR
+        if kind >= DOOR:
+            for j in self.neighbors(i):
+                if self.labels[j]:
+                    self.regions[self.labels[j]].openings.add(i)
+                    self.touched.add(self.labels[j])
+
+    def _split_off(self, seeds: List[int]) -> List[List[int]]:
+        """Search from every seed in lockstep and return the pieces that got cut off.
+
+        Searches that meet are merged; a group whose frontier runs dry is a separate piece.
+        The search ends once a single group is left, which keeps the region's label.
+        """
+        kinds = self.kinds
+        parent = list(range(len(seeds)))
+
+        def find(n: int) -> int:
+            while parent[n] != n:
+                parent[n] = parent[parent[n]]
+                n = parent[n]
+            return n
+
+        owner = {seed: n for n, seed in enumerate(seeds)}
+        frontiers = [deque([seed]) for seed in seeds]
+        visited: List[List[int]] = [[seed] for seed in seeds]
+        finished: Set[int] = set()
+        pieces: List[List[int]] = []
+        while True:
+            groups: Dict[int, List[int]] = {}
+            for n in range(len(seeds)):
+                root = find(n)
+                if root not in finished:
+                    groups.setdefault(root, []).append(n)
+            for root, members in list(groups.items()):
+                if len(groups) > 1 and not any(frontiers[n] for n in members):
+                    finished.add(root)
+                    pieces.append([i for n in members for i in visited[n]])
+                    del groups[root]
+            if len(groups) <= 1:
+                return pieces
+            for n in range(len(seeds)):
+                if find(n) in finished or not frontiers[n]:
+                    continue
+                i = frontiers[n].popleft()
+                for j in self.neighbors(i):
+                    if kinds[j] >= WALL:
+                        continue
+                    other = owner.get(j)
+                    if other is None:
+                        owner[j] = n
+                        frontiers[n].append(j)
+                        visited[n].append(j)
+                    elif find(other) != find(n):
+                        parent[find(other)] = find(n)
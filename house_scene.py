@@ -0,0 +1,219 @@
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from nicegui import ui
+from nicegui.elements.scene.scene_object3d import Object3D
+
+from house_model import COLORS, TILE_CACHE_SIZE, TILE_TYPES, Cell, FurnitureType, HouseGrid, Tile, TileType, make_tile, tile_from_codes
+
+Box = List  # [x, y, z, sx, sy, sz, colour] in scene units, z pointing up
+ItemKey = Tuple[int, int, Tile, bool]  # first row/column, cells covered, tile, turned by 90°
+Slots = List[Tuple['InstancedBoxes', int]]
+
+WALL_HEIGHT = 2.5
+DOOR_HEIGHT = 2.1
+SILL_HEIGHT = 0.9
+GLASS_COLOR = '#9FD3F0'
+
+class Part(NamedTuple):
+    """One box of a tile; ``width`` runs along the grid row, ``depth`` across it, both in cells."""
+    glass: bool
+    width: float
+    depth: float
+    bottom: float
+    top: float
+    color: str
+
+FURNITURE_SIZES = {  # width, depth, height
+    FurnitureType.SOFA: (0.9, 0.45, 0.45),
+    FurnitureType.BED: (0.9, 0.9, 0.5),
+    FurnitureType.TABLE: (0.8, 0.8, 0.75),
+    FurnitureType.CHAIR: (0.45, 0.45, 0.5),
+    FurnitureType.TV: (0.8, 0.15, 0.6),
+    FurnitureType.FRIDGE: (0.7, 0.7, 1.8),
+    FurnitureType.TOILET: (0.4, 0.6, 0.45),
+    FurnitureType.SINK: (0.6, 0.45, 0.9),
+}
+
+# walls, floors and roofs of one colour are merged into runs; every other tile is a box group of its own
+MERGED = {TILE_TYPES.index(tile_type) for tile_type in (TileType.WALL, TileType.FLOOR, TileType.ROOF)}
+STRUCTURE = {TILE_TYPES.index(tile_type) for tile_type in (TileType.WALL, TileType.DOOR, TileType.WINDOW)}
+OPENINGS = {TILE_TYPES.index(TileType.DOOR), TILE_TYPES.index(TileType.WINDOW)}
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def tile_parts(tile: Tile) -> Tuple[Part, ...]:
+    """The boxes a tile is extruded to, for a door or window set in a wall along the row."""
+    color = tile.color
+    if tile.type == TileType.WALL:
+        return Part(False, 1, 1, 0, WALL_HEIGHT, color),
+    if tile.type == TileType.FLOOR:
+        return Part(False, 1, 1, 0, 0.08, color),
+    if tile.type == TileType.ROOF:
+        return Part(True, 1, 1, WALL_HEIGHT, WALL_HEIGHT + 0.15, color),
+    if tile.type == TileType.DOOR:
+        return Part(False, 1, 0.12, 0, DOOR_HEIGHT, color), Part(False, 1, 1, DOOR_HEIGHT, WALL_HEIGHT, color)
+    if tile.type == TileType.WINDOW:
+        return (Part(False, 1, 1, 0, SILL_HEIGHT, color), Part(True, 1, 0.1, SILL_HEIGHT, DOOR_HEIGHT, GLASS_COLOR),
+                Part(False, 1, 1, DOOR_HEIGHT, WALL_HEIGHT, color))
+    if tile.type == TileType.FURNITURE:
+        width, depth, height = FURNITURE_SIZES.get(tile.furniture_type, (0.7, 0.7, 0.7))
+        if tile.rotation in (90, 270):
+            width, depth = depth, width
+        return Part(False, width, depth, 0, height, color),
+    return ()
+
+class InstancedBoxes(Object3D, component='house_boxes.js'):
+    """Coloured boxes of one material, drawn as a single three.js ``InstancedMesh``.
+
+    Boxes live in numbered slots; freed slots are hidden and handed out again, and ``flush``
+    sends the slots changed since the previous flush in one message.
+    """
+
+    def __init__(self, opacity: float = 1.0):
+        self.boxes: List[Optional[Box]] = []
+        self.free: List[int] = []
+        self.changed: Set[int] = set()
+        super().__init__(opacity, self.boxes)  # the scene re-creates the mesh from the current boxes after a reload
+
+    def add(self, box: Box) -> int:
+        if self.free:
+            slot = self.free.pop()
+            self.boxes[slot] = box
+        else:
+            slot = len(self.boxes)
+            self.boxes.append(box)
+        self.changed.add(slot)
+        return slot
+
+    def remove(self, slot: int):
+        self.boxes[slot] = None
+        self.free.append(slot)
+        self.changed.add(slot)
+
+    @property
+    def count(self) -> int:
+        return len(self.boxes) - len(self.free)
+
+    def flush(self):
+        if self.changed:
+            self.run_method('update', [[slot, self.boxes[slot]] for slot in sorted(self.changed)])
+            self.changed.clear()
+
+class HouseScene(ui.scene):
+    """3D preview of a ``HouseGrid``: walls extruded to full height, floors as slabs, furniture as blocks.
+
+    All solid boxes share one instanced mesh and all glass boxes (windows, roofs) another.
+    Walls, floors and roofs of one colour are merged into runs along each row, and the cells
+    left over as single tiles into runs along each column. ``render`` redoes only the rows
+    and columns of the changed cells (and their neighbours, on which door and window
+    orientation depends) and sends the boxes that differ.
+    """
+
+    def __init__(self, size: int, width: int = 600, height: int = 400):
+        super().__init__(width=width, height=height, grid=(size, size), background_color='#F8FAFC')
+        self.size = size
+        self.grid: Optional[HouseGrid] = None
+        self.singles = bytearray(size * size)  # merged-kind cells without a row run, collected into column runs
+        self.row_items: List[Dict[ItemKey, Slots]] = [{} for _ in range(size)]
+        self.column_items: List[Dict[ItemKey, Slots]] = [{} for _ in range(size)]
+        with self:
+            self.solid = InstancedBoxes()
+            self.glass = InstancedBoxes(opacity=0.45)
+        self.move_camera(x=0, y=-size * 0.9, z=size * 0.8, look_at_x=0, look_at_y=0, look_at_z=0, duration=0)
+
+    @property
+    def box_count(self) -> int:
+        return self.solid.count + self.glass.count
+
+    def render(self, grid: HouseGrid, cells: Iterable[Cell]):
+        self.grid = grid
+        size = self.size
+        rows: Set[int] = set()
+        columns: Set[int] = set()
+        for x, y in cells:
+            rows.update((x - 1, x, x + 1))
+            columns.add(y)
+        rows.discard(-1)
+        rows.discard(size)
+        for x in rows:
+            columns.update(self._update_row(x))
+        for y in columns:
+            self._update_column(y)
+        self.solid.flush()
+        self.glass.flush()
+
+    def _update_row(self, x: int) -> List[int]:
+        """Rebuild the boxes of row ``x``; returns the columns whose single cells changed."""
+        grid, size = self.grid, self.size
+        start = x * size
+        stop = start + size
+        types = grid.types
+        codes = zip(types[start:stop], grid.rooms[start:stop], grid.furniture[start:stop],
+                    grid.colors[start:stop], grid.rotations[start:stop])
+        singles = bytearray(size)
+        items: Set[ItemKey] = set()
+        y = 0
+        for key, run in groupby(codes, key=lambda c: (c[0], c[3]) if c[0] in MERGED else c):
+            length = sum(1 for _ in run)
+            if key[0] in MERGED:
+                if length > 1:
+                    items.add((y, length, _merged_tile(key), False))
+                else:
+                    singles[y] = 1
+            elif key[0]:
+                tile = tile_from_codes(key)
+                for i in range(start + y, start + y + length):
+                    # a door or window turns when it has no wall beside it in the row, but one above or below
+                    turned = (key[0] in OPENINGS
+                              and not (i > start and types[i - 1] in STRUCTURE or i < stop - 1 and types[i + 1] in STRUCTURE)
+                              and (i >= size and types[i - size] in STRUCTURE
+                                   or i < size * size - size and types[i + size] in STRUCTURE))
+                    items.add((i - start, 1, tile, turned))
+            y += length
+        self._replace(self.row_items[x], items, lambda item: self._row_boxes(x, item))
+        changed = [y for y, (old, new) in enumerate(zip(self.singles[start:stop], singles)) if old != new]
+        self.singles[start:stop] = singles
+        return changed
+
+    def _update_column(self, y: int):
+        grid, size, singles = self.grid, self.size, self.singles
+        types, colors = grid.types, grid.colors
+        items: Set[ItemKey] = set()
+        x = 0
+        for key, run in groupby(range(y, size * size, size), key=lambda i: (types[i], colors[i]) if singles[i] else None):
+            length = sum(1 for _ in run)
+            if key:
+                items.add((x, length, _merged_tile(key), False))
+            x += length
+        self._replace(self.column_items[y], items, lambda item: self._column_boxes(y, item))
+
+    def _replace(self, current: Dict[ItemKey, Slots], items: Set[ItemKey], boxes):
+        for key in [key for key in current if key not in items]:
+            for mesh, slot in current.pop(key):
+                mesh.remove(slot)
+        for key in items:
+            if key not in current:
+                current[key] = [(mesh, mesh.add(box)) for mesh, box in boxes(key)]
+
+    def _row_boxes(self, x: int, item: ItemKey) -> Iterable[Tuple[InstancedBoxes, Box]]:
+        y, length, tile, turned = item
+        center_y = self.size / 2 - x - 0.5
+        for part in tile_parts(tile):
+            width, depth = (part.depth, part.width) if turned else (part.width, part.depth)
+            yield self._box(part, y - self.size / 2 + length / 2, center_y, width * length, depth)
+
+    def _column_boxes(self, y: int, item: ItemKey) -> Iterable[Tuple[InstancedBoxes, Box]]:
+        x, length, tile, _ = item
+        for part in tile_parts(tile):
+            yield self._box(part, y - self.size / 2 + 0.5, self.size / 2 - x - length / 2, part.width, part.depth * length)
+
+    def _box(self, part: Part, x: float, y: float, width: float, depth: float) -> Tuple[InstancedBoxes, Box]:
+        box = [x, y, (part.bottom + part.top) / 2, width, depth, part.top - part.bottom, part.color]
+        return self.glass if part.glass else self.solid, box
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def _merged_tile(key: Tuple[int, int]) -> Tile:
+    """Representative tile of a merged run of one tile type and colour code."""
+    tile_type, color = key
+    return make_tile(TILE_TYPES[tile_type], color=COLORS[color])
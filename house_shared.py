@@ -0,0 +1,77 @@
+import re
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from nicegui import core
+
+from house_chunks import ChunkedGrid, new_grid
+from house_model import Cell
+from house_rooms import RoomAnalyzer
+from house_validation import LayoutValidator
+
+Subscriber = Callable[[Set[Cell]], None]
+DESIGN_NAME = re.compile(r'[\w .-]{1,64}')
+
+class SharedDesign:
+    """One authoritative grid edited by several clients.
+
+    Every edit is published as the set of cells it changed. Each subscriber collects the cells
+    changed by others and receives them at most once per ``interval`` seconds, so a burst of
+    edits (a brush drag, fast clicking) reaches every other client as a single render update.
+    """
+
+    def __init__(self, name: str, size: int, interval: float = 0.05):
+        self.name = name
+        self.grid = new_grid(size)
+        self.room_analyzer = None if isinstance(self.grid, ChunkedGrid) else RoomAnalyzer(self.grid)
+        self.validator = LayoutValidator(self.room_analyzer) if self.room_analyzer else None
+        self.interval = interval
+        self.version = 0
+        self.subscribers: Dict[Subscriber, Set[Cell]] = {}
+        self._flush_scheduled = False
+
+    def subscribe(self, subscriber: Subscriber):
+        self.subscribers[subscriber] = set()
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber; the design is forgotten once nobody is editing it anymore."""
+        self.subscribers.pop(subscriber, None)
+        if not self.subscribers and shared_designs.get((self.name, self.grid.size)) is self:
+            del shared_designs[(self.name, self.grid.size)]
+
+    def publish(self, cells: Set[Cell], source: Optional[Subscriber] = None):
+        """Record cells changed by ``source``; the source is expected to render them itself."""
+        if not cells:
+            return
+        self.version += 1
+        if self.room_analyzer:
+            self.room_analyzer.update(cells)
+            self.validator.update(cells)
+        for subscriber, pending in self.subscribers.items():
+            if subscriber != source:
+                pending |= cells
+        if not core.is_loop_running():
+            self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            core.loop.call_later(self.interval, self.flush)
+
+    def flush(self):
+        self._flush_scheduled = False
+        for subscriber, pending in list(self.subscribers.items()):
+            if pending:
+                self.subscribers[subscriber] = set()
+                subscriber(pending)
+
+shared_designs: Dict[Tuple[str, int], SharedDesign] = {}
+
+def get_shared_design(name: str, size: int) -> SharedDesign:
+    """The shared design with this name and size, created for its first subscriber.
+
+    Names come from the page URL, so they are limited to ``DESIGN_NAME``.
+    """
+    if not DESIGN_NAME.fullmatch(name):
+        raise ValueError(f'Invalid shared design name: {name[:64]!r}')
+    design = shared_designs.get((name, size))
+    if design is None:
+        design = shared_designs[(name, size)] = SharedDesign(name, size)
+    return design
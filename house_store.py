@@ -0,0 +1,273 @@
+import sqlite3
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from house_chunks import CHUNK, FLAT_GRID_LIMIT, MAX_GRID_SIZE, MIN_GRID_SIZE, ChunkedGrid, ChunkKey
+from house_model import (COLORS, FURNITURE_TYPES, ROOM_TYPES, TILE_TYPES, GridSnapshot, HouseGrid, color_code,
+                         normalize_color)
+
+GRID_FORMAT = 1
+CHUNKED_FORMAT = 2
+_HEADER = struct.Struct('<BHI')  # format version, grid size, byte length of the colour table
+_CHUNK_HEADER = struct.Struct('<HHI')  # chunk row, chunk column, number of (count, code) pairs
+
+def encode_grid(grid: Union[HouseGrid, ChunkedGrid]) -> bytes:
+    """Run-length encode a grid as ``(count, cell code)`` uint32 pairs with a per-design colour table.
+
+    Palette codes in ``HouseGrid.colors`` are only meaningful inside this process, so every
+    design carries the colour strings it uses and cell codes refer to that local table.
+    """
+    if isinstance(grid, ChunkedGrid):
+        return encode_chunked(grid)
+    return encode_snapshot(grid.size, grid)
+
+def encode_snapshot(size: int, snapshot: GridSnapshot) -> bytes:
+    """``encode_grid`` for a detached snapshot (or anything else with the five code arrays)."""
+    local_colors: Dict[int, int] = {}
+    runs = array('I')
+    previous, count = -1, 0
+    for tile_type, room, furniture, color, rotation in zip(
+            snapshot.types, snapshot.rooms, snapshot.furniture, snapshot.colors, snapshot.rotations):
+        local = local_colors.get(color)
+        if local is None:
+            local = local_colors[color] = len(local_colors)
+        code = tile_type | room << 3 | furniture << 6 | rotation << 10 | local << 12
+        if code == previous:
+            count += 1
+        else:
+            if count:
+                runs.append(count)
+                runs.append(previous)
+            previous, count = code, 1
+    runs.append(count)
+    runs.append(previous)
+    if sys.byteorder == 'big':
+        runs.byteswap()
+    colors = '\n'.join(COLORS[code] for code in local_colors).encode()
+    return _HEADER.pack(GRID_FORMAT, size, len(colors)) + colors + runs.tobytes()
+
+def _color_table(data: bytes) -> List[str]:
+    # an empty chunked plan has no colours at all, not a single empty one
+    return data.decode().split('\n') if data else []
+
+def decode_runs(data: bytes) -> Tuple[int, List[str], array]:
+    """Return ``(size, colour table, runs)`` of a blob without expanding it to cells."""
+    version, size, colors_length = _HEADER.unpack_from(data)
+    if version != GRID_FORMAT:
+        raise ValueError(f'Unsupported grid format version: {version}')
+    offset = _HEADER.size
+    runs = array('I')
+    runs.frombytes(data[offset + colors_length:])
+    if sys.byteorder == 'big':
+        runs.byteswap()
+    return size, _color_table(data[offset:offset + colors_length]), runs
+
+def encode_chunked(grid: ChunkedGrid) -> bytes:
+    """Like ``encode_grid``, but only the allocated chunks are stored, each run-length encoded on its own."""
+    local_colors: Dict[int, int] = {}
+    parts = []
+    for (cx, cy), block in sorted(grid.chunks.items()):
+        table = {}
+        for code in set(block):
+            local = local_colors.get(code >> 12)
+            if local is None:
+                local = local_colors[code >> 12] = len(local_colors)
+            table[code] = code & 0xFFF | local << 12
+        runs = array('I')
+        for code, run in groupby(block):
+            runs.append(sum(1 for _ in run))
+            runs.append(table[code])
+        if sys.byteorder == 'big':
+            runs.byteswap()
+        parts.append(_CHUNK_HEADER.pack(cx, cy, len(runs) // 2) + runs.tobytes())
+    colors = '\n'.join(COLORS[code] for code in local_colors).encode()
+    return _HEADER.pack(CHUNKED_FORMAT, grid.size, len(colors)) + colors + b''.join(parts)
+
+def decode_chunk_runs(data: bytes) -> Tuple[int, List[str], List[Tuple[ChunkKey, array]]]:
+    """Return ``(size, colour table, [(chunk key, runs), ...])`` of a blob written by ``encode_chunked``."""
+    version, size, colors_length = _HEADER.unpack_from(data)
+    if version != CHUNKED_FORMAT:
+        raise ValueError(f'Unsupported chunked grid format version: {version}')
+    offset = _HEADER.size + colors_length
+    chunks = []
+    while offset < len(data):
+        cx, cy, pairs = _CHUNK_HEADER.unpack_from(data, offset)
+        offset += _CHUNK_HEADER.size
+        runs = array('I')
+        runs.frombytes(data[offset:offset + 8 * pairs])
+        if sys.byteorder == 'big':
+            runs.byteswap()
+        offset += 8 * pairs
+        chunks.append(((cx, cy), runs))
+    return size, _color_table(data[_HEADER.size:_HEADER.size + colors_length]), chunks
+
+def decode_chunked(data: bytes) -> ChunkedGrid:
+    size, color_table, chunk_runs = decode_chunk_runs(data)
+    colors = [color_code(color) for color in color_table]
+    chunks = {}
+    counts = Counter()
+    for key, runs in chunk_runs:
+        block = array('I')
+        for count, code in zip(runs[::2], runs[1::2]):
+            code = code & 0xFFF | colors[code >> 12] << 12
+            block.extend(array('I', [code]) * count)
+            counts[code] += count
+        if len(block) != CHUNK * CHUNK:
+            raise ValueError(f'Corrupt grid data: chunk {key} has {len(block)} cells')
+        chunks[key] = block
+    grid = ChunkedGrid(size)
+    grid.load_chunks(chunks, counts)
+    return grid
+
+def decode_grid(data: bytes) -> Tuple[int, GridSnapshot]:
+    """Return ``(size, snapshot)`` for a blob produced by ``encode_grid``."""
+    size, color_table, runs = decode_runs(data)
+    colors = [color_code(color) for color in color_table]
+    cells: List[int] = []
+    for count, code in zip(runs[::2], runs[1::2]):
+        cells += [code] * count
+    distinct = set(cells)
+
+    def field(typecode: str, value) -> array:
+        table = {code: value(code) for code in distinct}
+        return array(typecode, map(table.__getitem__, cells))
+
+    snapshot = GridSnapshot(
+        types=field('B', lambda code: code & 0x7),
+        rooms=field('B', lambda code: code >> 3 & 0x7),
+        furniture=field('B', lambda code: code >> 6 & 0xF),
+        colors=field('H', lambda code: colors[code >> 12]),
+        rotations=field('B', lambda code: code >> 10 & 0x3),
+    )
+    if len(snapshot.types) != size * size:
+        raise ValueError(f'Corrupt grid data: {len(snapshot.types)} cells for a {size}x{size} grid')
+    return size, snapshot
+
+def _check_codes(codes: Iterable[int], colors: List[str]):
+    """Check cell codes against the field code tables and a blob's colour table."""
+    for color in colors:
+        normalize_color(color)
+    for code in set(codes):
+        if (code & 0x7 >= len(TILE_TYPES) or code >> 3 & 0x7 >= len(ROOM_TYPES)
+                or code >> 6 & 0xF >= len(FURNITURE_TYPES) or code >> 12 >= len(colors)):
+            raise ValueError(f'Corrupt grid data: invalid cell code {code:#x}')
+
+def grid_size(data: bytes) -> int:
+    """Check that a blob is a complete, valid grid of a known format version and return its size.
+
+    Only the run lengths are summed and the distinct cell codes checked, nothing is expanded,
+    so this is cheap enough for imports. The format must be the one ``new_grid`` uses for the
+    size, so ``DesignStore.load`` hands back the grid type a plan of that size is edited in.
+    """
+    chunked = data[:1] == bytes([CHUNKED_FORMAT])
+    size = _HEADER.unpack_from(data)[1]
+    if not MIN_GRID_SIZE <= size <= MAX_GRID_SIZE:
+        raise ValueError(f'Unsupported grid size: {size}')
+    if chunked != (size > FLAT_GRID_LIMIT):
+        raise ValueError(f'Corrupt grid data: a {size}x{size} grid stored {"chunked" if chunked else "flat"}')
+    if chunked:
+        size, colors, chunks = decode_chunk_runs(data)
+        for key, runs in chunks:
+            if sum(runs[::2]) != CHUNK * CHUNK or max(key) > (size - 1) // CHUNK:
+                raise ValueError(f'Corrupt grid data: bad chunk {key}')
+            _check_codes(runs[1::2], colors)
+        return size
+    size, colors, runs = decode_runs(data)
+    if sum(runs[::2]) != size * size:
+        raise ValueError(f'Corrupt grid data: {sum(runs[::2])} cells for a {size}x{size} grid')
+    _check_codes(runs[1::2], colors)
+    return size
+
+@dataclass
+class DesignInfo:
+    id: int
+    name: str
+    created: float
+    size: int
+
+class DesignStore:
+    """SQLite-backed store of saved house designs.
+
+    Grids are stored as ``encode_grid`` blobs; listing only touches the ``(size, created)`` and
+    ``name`` indexes, so it stays fast with tens of thousands of designs.
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        with self.db:
+            self.db.execute('''CREATE TABLE IF NOT EXISTS designs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                created REAL NOT NULL,
+                size INTEGER NOT NULL,
+                grid BLOB NOT NULL
+            )''')
+            self.db.execute('CREATE INDEX IF NOT EXISTS designs_by_size_created ON designs (size, created)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS designs_by_name ON designs (name, size, created)')
+
+    def save(self, name: str, grid: Union[HouseGrid, ChunkedGrid]) -> int:
+        with self.db:
+            cursor = self.db.execute('INSERT INTO designs (name, created, size, grid) VALUES (?, ?, ?, ?)',
+                                     (name, time.time(), grid.size, encode_grid(grid)))
+        return cursor.lastrowid
+
+    def save_many(self, designs: Iterable[Tuple[str, float, int, bytes]]) -> int:
+        """Insert already encoded ``(name, created, size, grid)`` rows in a single transaction."""
+        with self.db:
+            return self.db.executemany('INSERT INTO designs (name, created, size, grid) VALUES (?, ?, ?, ?)',
+                                       designs).rowcount
+
+    def iterate(self, size: Optional[int] = None) -> Iterator[Tuple[DesignInfo, bytes]]:
+        """All designs (of one grid size) oldest first, with their encoded grids, read row by row."""
+        if size is None:
+            rows = self.db.execute('SELECT id, name, created, size, grid FROM designs ORDER BY id')
+        else:
+            rows = self.db.execute('SELECT id, name, created, size, grid FROM designs WHERE size = ? '
+                                   'ORDER BY created', (size,))
+        for row in rows:
+            yield DesignInfo(*row[:4]), row[4]
+
+    def list(self, size: int, limit: int = 50, offset: int = 0, name: Optional[str] = None) -> List[DesignInfo]:
+        """Newest designs of the given grid size first, optionally restricted to one name."""
+        if name is None:
+            rows = self.db.execute('SELECT id, name, created, size FROM designs WHERE size = ? '
+                                   'ORDER BY created DESC LIMIT ? OFFSET ?', (size, limit, offset))
+        else:
+            rows = self.db.execute('SELECT id, name, created, size FROM designs WHERE name = ? AND size = ? '
+                                   'ORDER BY created DESC LIMIT ? OFFSET ?', (name, size, limit, offset))
+        return [DesignInfo(*row) for row in rows]
+
+    def load(self, design_id: int) -> Optional[Tuple[DesignInfo, Union[GridSnapshot, ChunkedGrid]]]:
+        """The design and its grid contents, ready for ``assign`` on a grid of the same size."""
+        row = self.db.execute('SELECT id, name, created, size, grid FROM designs WHERE id = ?',
+                              (design_id,)).fetchone()
+        if row is None:
+            return None
+        if row[4][0] == CHUNKED_FORMAT:
+            return DesignInfo(*row[:4]), decode_chunked(row[4])
+        _, snapshot = decode_grid(row[4])
+        return DesignInfo(*row[:4]), snapshot
+
+    def grids(self, design_ids: List[int]) -> Dict[int, bytes]:
+        """Encoded grids of several designs in one query, e.g. for rendering thumbnails."""
+        rows = self.db.execute(f'SELECT id, grid FROM designs WHERE id IN ({",".join("?" * len(design_ids))})',
+                               design_ids)
+        return dict(rows)
+
+    def delete(self, design_id: int) -> bool:
+        with self.db:
+            return self.db.execute('DELETE FROM designs WHERE id = ?', (design_id,)).rowcount > 0
+
+    def count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM designs').fetchone()[0]
+
+    def close(self):
+        self.db.close()
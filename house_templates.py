@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import Callable, Dict, List
+
+from house_model import FurnitureType, GridSnapshot, HouseGrid, RoomType, TileType, make_tile
+
+def _walls(grid: HouseGrid, top: int, left: int, bottom: int, right: int, color: str):
+    wall = make_tile(TileType.WALL, color=color)
+    for i in range(left, right + 1):
+        grid.set(top, i, wall)
+        grid.set(bottom, i, wall)
+    for i in range(top, bottom + 1):
+        grid.set(i, left, wall)
+        grid.set(i, right, wall)
+
+def _floor(grid: HouseGrid, top: int, left: int, bottom: int, right: int, room: RoomType, color: str):
+    floor = make_tile(TileType.FLOOR, room_type=room, color=color)
+    for i in range(top, bottom + 1):
+        for j in range(left, right + 1):
+            grid.set(i, j, floor)
+
+def _small(grid: HouseGrid):
+    _walls(grid, 7, 7, 12, 12, "#8B4513")
+    grid.set(7, 10, make_tile(TileType.DOOR, color="#654321"))
+    grid.set(9, 7, make_tile(TileType.WINDOW, color="#87CEEB"))
+    _floor(grid, 8, 8, 11, 11, RoomType.LIVING_ROOM, "#DEB887")
+    grid.set(9, 9, make_tile(TileType.FURNITURE, furniture_type=FurnitureType.SOFA, color="#4682B4"))
+    grid.set(10, 10, make_tile(TileType.FURNITURE, furniture_type=FurnitureType.TV, color="#2F4F4F"))
+
+def _mansion(grid: HouseGrid):
+    _walls(grid, 3, 3, 16, 16, "#8B4513")
+    grid.set(3, 10, make_tile(TileType.DOOR, color="#654321"))
+    for x, y in ((8, 3), (8, 16), (12, 3), (12, 16)):
+        grid.set(x, y, make_tile(TileType.WINDOW, color="#87CEEB"))
+    _floor(grid, 4, 4, 9, 9, RoomType.LIVING_ROOM, "#DEB887")
+    _floor(grid, 4, 10, 9, 15, RoomType.KITCHEN, "#F0E68C")
+    _floor(grid, 10, 4, 15, 9, RoomType.BEDROOM, "#E6E6FA")
+    _floor(grid, 10, 10, 15, 15, RoomType.BATHROOM, "#B0E0E6")
+
+def _apartment(grid: HouseGrid):
+    _walls(grid, 5, 5, 14, 14, "#696969")
+    grid.set(5, 10, make_tile(TileType.DOOR, color="#4A4A4A"))
+    grid.set(9, 5, make_tile(TileType.WINDOW, color="#87CEEB"))
+    grid.set(10, 14, make_tile(TileType.WINDOW, color="#87CEEB"))
+    _floor(grid, 6, 6, 9, 13, RoomType.LIVING_ROOM, "#D3D3D3")
+    _floor(grid, 10, 6, 13, 13, RoomType.BEDROOM, "#DDA0DD")
+    grid.set(7, 8, make_tile(TileType.FURNITURE, furniture_type=FurnitureType.SOFA, color="#708090"))
+    grid.set(11, 11, make_tile(TileType.FURNITURE, furniture_type=FurnitureType.BED, color="#8B7355"))
+
+TEMPLATES: Dict[str, Callable[[HouseGrid], None]] = {
+    'small': _small,
+    'mansion': _mansion,
+    'apartment': _apartment,
+}
+
+@lru_cache(maxsize=None)
+def template_min_size(name: str) -> int:
+    """Smallest grid a template fits in: templates are drawn at fixed coordinates."""
+    size = 64
+    grid = HouseGrid(size)
+    TEMPLATES[name](grid)
+    return max(max(divmod(i, size)) for i, tile_type in enumerate(grid.types) if tile_type) + 1
+
+def fitting_templates(size: int) -> List[str]:
+    return [name for name in TEMPLATES if template_min_size(name) <= size]
+
+@lru_cache(maxsize=32)
+def compile_template(name: str, size: int) -> GridSnapshot:
+    """Build a template once per grid size; the cached snapshot is shared and must not be modified.
+
+    ``HouseGrid.assign`` copies it into a grid in one bulk operation. A grid smaller than
+    ``template_min_size`` raises ``ValueError``.
+    """
+    if size < template_min_size(name):
+        raise ValueError(f'The {name} template needs a grid of at least {template_min_size(name)} cells')
+    grid = HouseGrid(size)
+    TEMPLATES[name](grid)
+    return grid.snapshot()
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import os
+import struct
+import zlib
+from typing import List, Set, Tuple
+
+from nicegui import run
+
+from house_chunks import CHUNK
+from house_store import CHUNKED_FORMAT, decode_chunk_runs, decode_runs
+
+EMPTY_COLOR = "#F5F5F5"  # what the grid renderers show for an empty tile
+
+def _rgb(color: str) -> bytes:
+    color = color.lstrip('#')
+    if len(color) == 3:
+        color = ''.join(2 * c for c in color)
+    return bytes.fromhex(color[:6])
+
+def _color_runs(data: bytes) -> Tuple[int, List[Tuple[int, str]]]:
+    """``(size, [(count, colour), ...])`` straight from the run-length encoded blob."""
+    size, colors, runs = decode_runs(data)
+    return size, [(count, colors[code >> 12] if code & 0x7 else EMPTY_COLOR)
+                  for count, code in zip(runs[::2], runs[1::2])]
+
+def _png_chunk(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+def _chunked_pixels(data: bytes, max_px: int) -> Tuple[int, bytearray]:
+    """``(side, RGB pixels)`` of a chunked plan, with ``step``×``step`` cells sharing one pixel.
+
+    Only stored chunks are visited, so the cost follows the cells in use, not the plan area.
+    """
+    size, colors, chunks = decode_chunk_runs(data)
+    step = -(-size // max_px)
+    side = -(-size // step)
+    empty = _rgb(EMPTY_COLOR)
+    pixels = bytearray(empty * (side * side))
+    rgb = [_rgb(color) for color in colors]
+    for (cx, cy), runs in chunks:
+        i = 0
+        for count, code in zip(runs[::2], runs[1::2]):
+            # split the run into its rows and paint the span of pixels each row segment covers
+            while count and code & 0x7:
+                x, y = cx * CHUNK + i // CHUNK, cy * CHUNK + i % CHUNK
+                width = min(count, CHUNK - i % CHUNK, size - y)
+                if x >= size or width <= 0:
+                    break
+                start, stop = y // step, (y + width - 1) // step + 1
+                row = x // step * side
+                pixels[3 * (row + start):3 * (row + stop)] = rgb[code >> 12] * (stop - start)
+                i += width
+                count -= width
+            i += count
+    return side, pixels
+
+def render_png(data: bytes, max_px: int = 200) -> bytes:
+    """Rasterize an encoded grid to an RGB PNG of at most ``max_px`` (at least one pixel per cell,
+    except for chunked plans larger than ``max_px``, which are downsampled)."""
+    if data[0] == CHUNKED_FORMAT:
+        size, pixels = _chunked_pixels(data, max_px)
+    else:
+        size, color_runs = _color_runs(data)
+        pixels = bytearray()
+        for count, color in color_runs:
+            pixels += _rgb(color) * count
+    scale = max(1, max_px // size)
+    raw = bytearray()
+    for x in range(size):
+        row = pixels[3 * size * x:3 * size * (x + 1)]
+        if scale > 1:
+            row = b''.join(row[3 * y:3 * y + 3] * scale for y in range(size))
+        raw += (b'\0' + row) * scale
+    side = size * scale
+    return (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', side, side, 8, 2, 0, 0, 0))
+            + _png_chunk(b'IDAT', zlib.compress(bytes(raw), 6))
+            + _png_chunk(b'IEND', b''))
+
+def render_svg(data: bytes, cell_px: int = 10) -> str:
+    """Vector version of ``render_png``: one ``<rect>`` per horizontal run of equal colour."""
+    size, color_runs = _color_runs(data)
+    rects = []
+    index = 0
+    for count, color in color_runs:
+        while count:
+            x, y = divmod(index, size)
+            width = min(count, size - y)
+            if color != EMPTY_COLOR:
+                rects.append(f'<rect x="{y}" y="{x}" width="{width}" height="1" fill="{color}"/>')
+            index += width
+            count -= width
+    side = size * cell_px
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{side}" height="{side}" '
+            f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+            f'<rect width="{size}" height="{size}" fill="{EMPTY_COLOR}"/>{"".join(rects)}</svg>')
+
+def render_pngs(blobs: List[bytes], max_px: int) -> List[bytes]:
+    return [render_png(data, max_px) for data in blobs]
+
+class ThumbnailCache:
+    """PNG thumbnails on disk, named by a content hash of the encoded grid.
+
+    Identical designs share one file and a thumbnail never needs invalidation. Missing ones
+    are rendered in the process pool in chunks so the event loop stays responsive.
+    """
+
+    def __init__(self, directory: str, url_path: str = '/thumbnails', max_px: int = 200, chunk: int = 32):
+        self.directory = directory
+        self.url_path = url_path
+        self.max_px = max_px
+        self.chunk = chunk
+        os.makedirs(directory, exist_ok=True)
+        self.known: Set[str] = {name[:-4] for name in os.listdir(directory) if name.endswith('.png')}
+
+    def key(self, data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def url(self, key: str) -> str:
+        return f'{self.url_path}/{key}.png'
+
+    async def urls(self, blobs: List[bytes]) -> List[str]:
+        """Thumbnail URLs for encoded grids, rendering the ones not cached yet."""
+        keys = [self.key(data) for data in blobs]
+        missing = {key: data for key, data in zip(keys, blobs) if key not in self.known}
+        items = list(missing.items())
+        batches = [items[start:start + self.chunk] for start in range(0, len(items), self.chunk)]
+        results = await asyncio.gather(*(run.cpu_bound(render_pngs, [data for _, data in batch], self.max_px)
+                                         for batch in batches))
+        for batch, pngs in zip(batches, results):
+            if pngs is not None:  # None while the app is shutting down
+                for (key, _), png in zip(batch, pngs):
+                    self._write(key, png)
+        return [self.url(key) for key in keys]
+
+    def _write(self, key: str, png: bytes):
+        path = os.path.join(self.directory, f'{key}.png')
+        with open(path + '.tmp', 'wb') as file:
+            file.write(png)
+        os.replace(path + '.tmp', path)
+        self.known.add(key)
@@ -0,0 +1,78 @@
+from enum import Enum
+from typing import List, Sequence
+
+from house_model import Cell, HouseGrid
+
+class DrawTool(Enum):
+    BRUSH = "brush"
+    LINE = "line"
+    RECTANGLE = "rectangle"
+    FILLED_RECTANGLE = "filled rectangle"
+    FILL = "fill"
+
+def line_cells(start: Cell, end: Cell) -> List[Cell]:
+    """Bresenham line from ``start`` to ``end``, both inclusive."""
+    (x0, y0), (x1, y1) = start, end
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx, sy = (1 if x1 > x0 else -1), (1 if y1 > y0 else -1)
+    error = dx + dy
+    cells = []
+    while True:
+        cells.append((x0, y0))
+        if (x0, y0) == (x1, y1):
+            return cells
+        doubled = 2 * error
+        if doubled >= dy:
+            error += dy
+            x0 += sx
+        if doubled <= dx:
+            error += dx
+            y0 += sy
+
+def rectangle_cells(start: Cell, end: Cell, filled: bool) -> List[Cell]:
+    top, bottom = sorted((start[0], end[0]))
+    left, right = sorted((start[1], end[1]))
+    if filled:
+        return [(x, y) for x in range(top, bottom + 1) for y in range(left, right + 1)]
+    cells = [(x, y) for x in (top, bottom) for y in range(left, right + 1)]
+    cells += [(x, y) for x in range(top + 1, bottom) for y in (left, right)]
+    return list(dict.fromkeys(cells))
+
+def path_cells(path: Sequence[Cell]) -> List[Cell]:
+    """Join the sampled points of a drag into a gap-free brush path."""
+    cells = [path[0]]
+    for previous, current in zip(path, path[1:]):
+        cells += line_cells(previous, current)[1:]
+    return list(dict.fromkeys(cells))
+
+def flood_fill_cells(grid: HouseGrid, start: Cell) -> List[Cell]:
+    """4-connected region of cells holding exactly the same tile as ``start``."""
+    size = grid.size
+    fields = (grid.types, grid.rooms, grid.furniture, grid.colors, grid.rotations)
+    origin = start[0] * size + start[1]
+    target = tuple(field[origin] for field in fields)
+    seen = bytearray(size * size)
+    seen[origin] = 1
+    stack = [origin]
+    cells = []
+    while stack:
+        i = stack.pop()
+        cells.append(divmod(i, size))
+        y = i % size
+        for j in (i - size if i >= size else -1, i + size if i + size < size * size else -1,
+                  i - 1 if y > 0 else -1, i + 1 if y < size - 1 else -1):
+            if j >= 0 and not seen[j]:
+                seen[j] = 1
+                if all(field[j] == value for field, value in zip(fields, target)):
+                    stack.append(j)
+    return cells
+
+def tool_cells(tool: DrawTool, grid: HouseGrid, path: Sequence[Cell]) -> List[Cell]:
+    """All cells affected by one stroke of ``tool``; shapes span the first and last point of ``path``."""
+    if tool == DrawTool.BRUSH:
+        return path_cells(path)
+    if tool == DrawTool.FILL:
+        return flood_fill_cells(grid, path[-1])
+    if tool == DrawTool.LINE:
+        return line_cells(path[0], path[-1])
+    return rectangle_cells(path[0], path[-1], filled=tool == DrawTool.FILLED_RECTANGLE)
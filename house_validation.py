@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set
+
+from house_model import Cell
+from house_rooms import DOOR, FURNITURE, WINDOW, RoomAnalyzer
+
+UNREACHABLE = 'unreachable'
+BLOCKED_DOOR = 'blocked door'
+NO_WINDOW = 'no window'
+
+@dataclass(frozen=True)
+class Issue:
+    kind: str
+    cell: Cell
+    message: str
+
+class LayoutValidator:
+    """Live layout checks on top of a ``RoomAnalyzer``.
+
+    * every floor tile can be reached through doors from the outside (a region touching the
+      edge of the grid, or a door in the outer row of cells),
+    * no furniture stands right in front of a door,
+    * every room with floor has at least one window.
+
+    Results are cached. ``update`` re-checks the doors around the changed cells and the
+    rooms the analyzer reports as touched. Reachability is a search over regions and doors,
+    not cells, and is only redone when the analyzer's ``layout_version`` moves, so painting
+    floor or furniture never triggers it. Call ``update`` after ``RoomAnalyzer.update``.
+    """
+
+    def __init__(self, analyzer: RoomAnalyzer):
+        self.analyzer = analyzer
+        self.size = analyzer.size
+        self.door_issues: Dict[int, Issue] = {}
+        self.unreachable: Dict[int, Issue] = {}
+        self.window_issues: Dict[int, Issue] = {}
+        self.reachable: Set[int] = set()
+        self._layout_version = -1
+        analyzer.take_touched()
+        self._check_regions(set(analyzer.regions))
+        for i, kind in enumerate(analyzer.kinds):
+            if kind == DOOR:
+                self._check_door(i)
+
+    def update(self, cells: Iterable[Cell]):
+        size = self.size
+        doors: Set[int] = set()
+        for x, y in cells:
+            i = x * size + y
+            doors.add(i)
+            doors.update(self.analyzer.neighbors(i))
+        for i in doors:
+            self._check_door(i)
+        self._check_regions(self.analyzer.take_touched())
+
+    def issues(self) -> List[Issue]:
+        return [*self.unreachable.values(), *self.door_issues.values(), *self.window_issues.values()]
+
+    def _check_door(self, i: int):
+        kinds = self.analyzer.kinds
+        if kinds[i] == DOOR and any(kinds[j] == FURNITURE for j in self.analyzer.neighbors(i)):
+            cell = divmod(i, self.size)
+            self.door_issues[i] = Issue(BLOCKED_DOOR, cell, f'Furniture blocks the door at {cell}')
+        else:
+            self.door_issues.pop(i, None)
+
+    def _check_regions(self, touched: Set[int]):
+        regions = self.analyzer.regions
+        if self._layout_version != self.analyzer.layout_version:
+            # doors or regions changed: redo the region search and re-check rooms whose reachability flipped
+            self._layout_version = self.analyzer.layout_version
+            reachable = self._reachable()
+            touched = touched | (reachable ^ self.reachable)
+            self.reachable = reachable
+        kinds = self.analyzer.kinds
+        for region_id in touched:
+            self.unreachable.pop(region_id, None)
+            self.window_issues.pop(region_id, None)
+            region = regions.get(region_id)
+            if region is None or region.border_cells or not region.floor:
+                continue
+            cell = divmod(region.cell, self.size)
+            if region_id not in self.reachable:
+                self.unreachable[region_id] = Issue(
+                    UNREACHABLE, cell, f'Room at {cell} ({region.floor} floor tiles) cannot be reached through a door')
+            if not any(kinds[i] == WINDOW for i in region.openings):
+                self.window_issues[region_id] = Issue(
+                    NO_WINDOW, cell, f'Room at {cell} ({region.floor} floor tiles) has no window')
+
+    def _reachable(self) -> Set[int]:
+        """Ids of regions connected to the outside, walking from region to region through doors."""
+        analyzer, size = self.analyzer, self.size
+        kinds, labels, regions = analyzer.kinds, analyzer.labels, analyzer.regions
+        last = size * size - size
+
+        def door_regions(i: int) -> Iterable[int]:
+            y = i % size
+            return (labels[i - size] if i >= size else 0, labels[i + size] if i < last else 0,
+                    labels[i - 1] if y else 0, labels[i + 1] if y < size - 1 else 0)
+
+        reached = {region_id for region_id, region in regions.items() if region.border_cells}
+        for i in (*range(size), *range(last, size * size), *range(size, last, size), *range(2 * size - 1, last, size)):
+            if kinds[i] == DOOR:
+                reached.update(door_regions(i))  # a front door in the outer wall
+        reached.discard(0)
+        stack = list(reached)
+        while stack:
+            for i in regions[stack.pop()].openings:
+                if kinds[i] == DOOR:
+                    for label in door_regions(i):
+                        if label and label not in reached:
+                            reached.add(label)
+                            stack.append(label)
+        return reached
@@ -0,0 +1,199 @@
+export default {
+  template: `<canvas ref="canvas" :width="width" :height="height"
+    style="cursor: crosshair; border: 2px solid #D1D5DB; max-width: 100%"
+    @mousedown="onDown" @mousemove="onMove" @mouseup="onUp" @mouseleave="onUp"
+    @wheel.prevent="onWheel" @contextmenu.prevent></canvas>`,
+  props: {
+    size: Number,
+    tile_size: Number,
+    chunk: Number,
+    width: Number,
+    height: Number,
+    empty_color: String,
+  },
+  mounted() {
+    this.palette = [];
+    this.chunks = new Map(); // "row,column" -> Int32Array of palette ids, -1 for cells never painted
+    this.stroke = null;
+    this.pan = null;
+    this.zoom = this.tile_size; // pixels per cell
+    this.top = 0; // grid row and column at the top left corner of the canvas
+    this.left = 0;
+    this.lastView = "";
+    const connectInterval = setInterval(() => {
+      if (window.socket.id === undefined) return;
+      this.$emit("init");
+      this.reportView();
+      clearInterval(connectInterval);
+    }, 100);
+    this.draw();
+  },
+  unmounted() {
+    clearTimeout(this.viewTimeout);
+  },
+  methods: {
+    paint(palette, changes) {
+      this.palette.push(...palette);
+      for (let i = 0; i < changes.length; i += 2) {
+        const x = Math.floor(changes[i] / this.size);
+        const y = changes[i] % this.size;
+        this.block(Math.floor(x / this.chunk), Math.floor(y / this.chunk))[
+          (x % this.chunk) * this.chunk + (y % this.chunk)
+        ] = changes[i + 1];
+      }
+      this.scheduleDraw();
+    },
+    chunks(palette, chunks, dropped) {
+      this.palette.push(...palette);
+      for (const [cx, cy, runs] of chunks) {
+        const block = this.block(cx, cy);
+        let i = 0;
+        for (let r = 0; r < runs.length; r += 2) {
+          block.fill(runs[r], i, i + runs[r + 1]);
+          i += runs[r + 1];
+        }
+      }
+      for (const [cx, cy] of dropped) this.chunks.delete(`${cx},${cy}`);
+      this.scheduleDraw();
+    },
+    block(cx, cy) {
+      const key = `${cx},${cy}`;
+      let block = this.chunks.get(key);
+      if (!block) this.chunks.set(key, (block = new Int32Array(this.chunk * this.chunk).fill(-1)));
+      return block;
+    },
+    scheduleDraw() {
+      if (this.drawPending) return;
+      this.drawPending = true;
+      requestAnimationFrame(() => {
+        this.drawPending = false;
+        this.draw();
+      });
+    },
+    draw() {
+      const ctx = this.$refs.canvas.getContext("2d");
+      const z = this.zoom;
+      const n = this.chunk;
+      ctx.fillStyle = "#FFFFFF";
+      ctx.fillRect(0, 0, this.width, this.height);
+      ctx.fillStyle = this.empty_color;
+      ctx.fillRect(-this.left * z, -this.top * z, this.size * z, this.size * z);
+      const [x0, y0, x1, y1] = this.visibleChunks();
+      for (let cx = x0; cx <= x1; cx++) {
+        for (let cy = y0; cy <= y1; cy++) {
+          const block = this.chunks.get(`${cx},${cy}`);
+          if (!block) continue;
+          for (let i = 0; i < block.length; i++) {
+            if (block[i] < 0) continue;
+            const [text, color] = this.palette[block[i]];
+            if (color === this.empty_color) continue;
+            const left = (cy * n + (i % n) - this.left) * z;
+            const top = (cx * n + Math.floor(i / n) - this.top) * z;
+            ctx.fillStyle = color;
+            ctx.fillRect(left, top, z, z);
+            if (text && z >= 14) {
+              ctx.font = `${Math.floor(z * 0.6)}px sans-serif`;
+              ctx.textAlign = "center";
+              ctx.textBaseline = "middle";
+              ctx.fillText(text, left + z / 2, top + z / 2);
+            }
+          }
+        }
+      }
+      if (z >= 8) this.drawLines(ctx, 1, "#E5E7EB");
+      this.drawLines(ctx, n, "#CBD5E1");
+    },
+    drawLines(ctx, step, color) {
+      const z = this.zoom;
+      ctx.strokeStyle = color;
+      ctx.beginPath();
+      const first = (start) => Math.max(0, Math.ceil(start / step) * step);
+      for (let y = first(this.left); y <= Math.min(this.size, this.left + this.width / z); y += step) {
+        const px = Math.round((y - this.left) * z) + 0.5;
+        ctx.moveTo(px, Math.max(0, -this.top * z));
+        ctx.lineTo(px, Math.min(this.height, (this.size - this.top) * z));
+      }
+      for (let x = first(this.top); x <= Math.min(this.size, this.top + this.height / z); x += step) {
+        const py = Math.round((x - this.top) * z) + 0.5;
+        ctx.moveTo(Math.max(0, -this.left * z), py);
+        ctx.lineTo(Math.min(this.width, (this.size - this.left) * z), py);
+      }
+      ctx.stroke();
+    },
+    visibleChunks() {
+      const n = this.chunk;
+      const last = Math.floor((this.size - 1) / n);
+      return [
+        Math.max(0, Math.floor(this.top / n)),
+        Math.max(0, Math.floor(this.left / n)),
+        Math.min(last, Math.floor((this.top + this.height / this.zoom) / n)),
+        Math.min(last, Math.floor((this.left + this.width / this.zoom) / n)),
+      ];
+    },
+    reportView() {
+      // panning reports at most every 50 ms; the server only sends chunks the browser lacks
+      if (this.viewTimeout) return;
+      this.viewTimeout = setTimeout(() => {
+        this.viewTimeout = null;
+        const [x0, y0, x1, y1] = this.visibleChunks();
+        const view = `${x0},${y0},${x1},${y1}`;
+        if (view === this.lastView) return;
+        this.lastView = view;
+        this.$emit("view", { x0, y0, x1, y1 });
+      }, 50);
+    },
+    moveTo(top, left) {
+      const rows = this.height / this.zoom;
+      const columns = this.width / this.zoom;
+      this.top = Math.min(Math.max(top, -rows / 2), this.size - rows / 2);
+      this.left = Math.min(Math.max(left, -columns / 2), this.size - columns / 2);
+      this.scheduleDraw();
+      this.reportView();
+    },
+    pointer(event) {
+      const rect = this.$refs.canvas.getBoundingClientRect();
+      const scale = this.width / rect.width;
+      return [(event.clientY - rect.top) * scale, (event.clientX - rect.left) * scale];
+    },
+    cellAt(event) {
+      const [py, px] = this.pointer(event);
+      const x = Math.floor(this.top + py / this.zoom);
+      const y = Math.floor(this.left + px / this.zoom);
+      if (x < 0 || y < 0 || x >= this.size || y >= this.size) return null;
+      return [x, y];
+    },
+    onDown(event) {
+      if (event.button === 1 || event.shiftKey) {
+        const [py, px] = this.pointer(event);
+        this.pan = { py, px, top: this.top, left: this.left };
+        return;
+      }
+      const cell = this.cellAt(event);
+      if (cell) this.stroke = { path: [cell], button: event.button };
+    },
+    onMove(event) {
+      if (this.pan) {
+        const [py, px] = this.pointer(event);
+        this.moveTo(this.pan.top - (py - this.pan.py) / this.zoom, this.pan.left - (px - this.pan.px) / this.zoom);
+        return;
+      }
+      if (!this.stroke) return;
+      const cell = this.cellAt(event);
+      const last = this.stroke.path[this.stroke.path.length - 1];
+      if (cell && (cell[0] !== last[0] || cell[1] !== last[1])) this.stroke.path.push(cell);
+    },
+    onUp() {
+      if (this.stroke) this.$emit("stroke", this.stroke);
+      this.stroke = null;
+      this.pan = null;
+    },
+    onWheel(event) {
+      // zoom around the pointer, from one pixel per cell up to large emoji tiles
+      const [py, px] = this.pointer(event);
+      const row = this.top + py / this.zoom;
+      const column = this.left + px / this.zoom;
+      this.zoom = Math.min(48, Math.max(1, this.zoom * (event.deltaY < 0 ? 1.25 : 0.8)));
+      this.moveTo(row - py / this.zoom, column - px / this.zoom);
+    },
+  },
+};
@@ -1,56 +1,74 @@
-from nicegui import ui, app
-import json
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
-from enum import Enum
-
-class TileType(Enum):
-    EMPTY = "empty"
-    WALL = "wall"
-    DOOR = "door"
-    WINDOW = "window"
-    FLOOR = "floor"
-    ROOF = "roof"
-    FURNITURE = "furniture"
+from nicegui import ui, app, events
+import asyncio
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Set, Tuple, Optional
 
-class RoomType(Enum):
-    LIVING_ROOM = "Living Room"
-    BEDROOM = "Bedroom"
-    KITCHEN = "Kitchen"
-    BATHROOM = "Bathroom"
-    GARAGE = "Garage"
+from house_model import TileType, RoomType, FurnitureType, Tile, Cell, HouseGrid, EMPTY_TILE, make_tile
+from house_render import RENDERERS, TILE_EMOJIS, ROOM_EMOJIS, FURNITURE_EMOJIS, ChunkViewport, GridInput, describe_tile
+from house_tools import DrawTool, line_cells, tool_cells
+from house_store import DesignStore
+from house_history import GridHistory
+from house_templates import compile_template, fitting_templates
+from house_generator import generate_layout, min_layout_size
+from house_rooms import RoomAnalyzer
+from house_scene import HouseScene
+from house_validation import LayoutValidator
+from house_shared import SharedDesign, get_shared_design
+from house_chunks import FLAT_GRID_LIMIT, MAX_GRID_SIZE, MIN_GRID_SIZE, new_grid
+from house_archive import DesignImporter, export_lines
+from starlette.responses import StreamingResponse
+from house_thumbnails import ThumbnailCache
 
-class FurnitureType(Enum):
-    SOFA = "sofa"
-    BED = "bed"
-    TABLE = "table"
-    CHAIR = "chair"
-    TV = "tv"
-    FRIDGE = "fridge"
-    TOILET = "toilet"
-    SINK = "sink"
+design_store = DesignStore(os.getenv('HOUSE_DESIGNS_DB', 'house_designs.sqlite3'))
+thumbnails = ThumbnailCache(os.getenv('HOUSE_THUMBNAILS_DIR', 'thumbnails'))
+app.add_static_files(thumbnails.url_path, thumbnails.directory)
+TEMPLATE_LABELS = {'small': 'Small House', 'mansion': 'Mansion', 'apartment': 'Apartment'}
 
-@dataclass
-class Tile:
-    type: TileType
-    room_type: Optional[RoomType] = None
-    furniture_type: Optional[FurnitureType] = None
-    color: str = "#E0E0E0"
-    rotation: int = 0
+@app.get('/designs/export')
+def export_designs(size: Optional[int] = None):
+    """Stream all saved designs (of one grid size) as a design archive."""
+    async def lines():
+        # row by row on the event loop thread, which owns the SQLite connection
+        for n, line in enumerate(export_lines(design_store.iterate(size))):
+            yield line
+            if n % 500 == 0:
+                await asyncio.sleep(0)
+    filename = f'house-designs{f"-{size}x{size}" if size else ""}.ndjson'
+    return StreamingResponse(lines(), media_type='application/x-ndjson',
+                             headers={'Content-Disposition': f'attachment; filename="{filename}"'})
 
 class HouseMakerGame:
-    def __init__(self):
-        self.grid_size = 20
-        self.tile_size = 30
-        self.grid: List[List[Tile]] = [[Tile(TileType.EMPTY) for _ in range(self.grid_size)] 
-                                       for _ in range(self.grid_size)]
+    def __init__(self, grid_size: int = 20, renderer: str = 'buttons', store: Optional[DesignStore] = None,
+                 history_bytes: int = 1 << 20, shared: Optional[SharedDesign] = None):
+        self.grid_size = grid_size
+        self.tile_size = 30 if grid_size <= 20 else max(4, 600 // grid_size)
+        # large plans are chunked and shown in a pan/zoom viewport; whole-grid features are left out for them
+        self.chunked = grid_size > FLAT_GRID_LIMIT
+        self.renderer_name = 'viewport' if self.chunked else renderer
+        self.shared = shared
+        self.grid = shared.grid if shared else new_grid(self.grid_size)
         self.selected_tool = TileType.WALL
         self.selected_room = RoomType.LIVING_ROOM
         self.selected_furniture = FurnitureType.SOFA
         self.selected_color = "#8B4513"
+        self.selected_shape = DrawTool.BRUSH
         self.is_placing = False
-        self.saved_designs = []
-        self.current_design_name = "My House"
+        self.is_applying = False  # an optimistic drag is open in the history
+        self.stroke_path: List[Cell] = []
+        self.shape_anchor: Optional[Cell] = None
+        self.store = store if store is not None else design_store
+        self.current_design_name = shared.name if shared else "My House"
+        self._batch_depth = 0
+        self._version = 0
+        self.history = GridHistory(history_bytes, shared=shared is not None)
+        if shared:
+            self.room_analyzer = shared.room_analyzer
+            self.validator = shared.validator
+        else:
+            self.room_analyzer = None if self.chunked else RoomAnalyzer(self.grid)
+            self.validator = LayoutValidator(self.room_analyzer) if self.room_analyzer else None
         
         self.color_options = {
             "Wood": "#8B4513",
@@ -67,15 +85,28 @@ class HouseMakerGame:
         self.setup_ui()
         
     def setup_ui(self):
+        with ui.dialog() as self.load_dialog, ui.card().classes('w-[40rem] max-w-full'):
+            ui.label('📁 Saved Designs').classes('text-xl font-bold mb-2 text-gray-700')
+            self.saved_designs_list = ui.grid(columns=3).classes('w-full gap-2 max-h-[32rem] overflow-y-auto')
+        
+        with ui.dialog() as self.import_dialog, ui.card():
+            ui.label('⬆️ Import Designs').classes('text-xl font-bold mb-2 text-gray-700')
+            self.import_area = ui.column()
+        
         with ui.column().classes('w-full h-screen bg-gradient-to-br from-blue-50 to-purple-50'):
             
             with ui.row().classes('w-full p-4 bg-white shadow-md justify-between items-center'):
                 ui.label('🏠 House Maker Game').classes('text-3xl font-bold text-purple-600')
                 with ui.row().classes('gap-2'):
+                    self.undo_button = ui.button('↩️ Undo', on_click=self.undo).classes('bg-gray-500 text-white px-4 py-2 rounded-lg hover:bg-gray-600')
+                    self.redo_button = ui.button('↪️ Redo', on_click=self.redo).classes('bg-gray-500 text-white px-4 py-2 rounded-lg hover:bg-gray-600')
                     ui.button('📁 Load', on_click=self.load_design).classes('bg-blue-500 text-white px-4 py-2 rounded-lg hover:bg-blue-600')
                     ui.button('💾 Save', on_click=self.save_design).classes('bg-green-500 text-white px-4 py-2 rounded-lg hover:bg-green-600')
+                    ui.button('⬇️ Export', on_click=lambda: ui.download(f'/designs/export?size={self.grid_size}')).classes('bg-teal-500 text-white px-4 py-2 rounded-lg hover:bg-teal-600')
+                    ui.button('⬆️ Import', on_click=self.open_import).classes('bg-teal-500 text-white px-4 py-2 rounded-lg hover:bg-teal-600')
                     ui.button('🗑️ Clear', on_click=self.clear_grid).classes('bg-red-500 text-white px-4 py-2 rounded-lg hover:bg-red-600')
-                    ui.button('🎲 Random', on_click=self.random_house).classes('bg-purple-500 text-white px-4 py-2 rounded-lg hover:bg-purple-600')
+                    if not self.chunked and self.grid_size >= min_layout_size():
+                        ui.button('🎲 Random', on_click=self.random_house).classes('bg-purple-500 text-white px-4 py-2 rounded-lg hover:bg-purple-600')
             
             with ui.row().classes('flex-1 gap-4 p-4'):
                 # Left Panel - Tools
@@ -91,6 +122,17 @@ class HouseMakerGame:
                                          on_click=lambda t=tile_type: self.select_tool(t),
                                          color='primary' if self.selected_tool == tile_type else 'secondary').classes('w-full justify-start')
                     
+                    # Draw Mode
+                    ui.label('Draw Mode:').classes('text-sm font-semibold text-gray-600 mb-2')
+                    with ui.column().classes('gap-2 mb-4'):
+                        self.shape_buttons = {}
+                        for shape in DrawTool:
+                            if self.chunked and shape == DrawTool.FILL:
+                                continue
+                            self.shape_buttons[shape] = ui.button(shape.value.title(),
+                                     on_click=lambda s=shape: self.select_shape(s),
+                                     color='primary' if self.selected_shape == shape else 'secondary').classes('w-full justify-start')
+                    
                     # Room Types
                     ui.label('Room Types:').classes('text-sm font-semibold text-gray-600 mb-2')
                     with ui.column().classes('gap-2 mb-4'):
@@ -117,22 +159,20 @@ class HouseMakerGame:
                 with ui.card().classes('flex-1 bg-white shadow-lg rounded-xl p-4 overflow-auto'):
                     with ui.column().classes('items-center'):
                         ui.label(f'🏡 {self.current_design_name}').classes('text-xl font-bold mb-4 text-gray-700')
-                        self.grid_container = ui.column().classes('inline-block border-2 border-gray-300')
-                        with self.grid_container:
-                            self.grid_elements = []
-                            for i in range(self.grid_size):
-                                with ui.row().classes('gap-0'):
-                                    row_elements = []
-                                    for j in range(self.grid_size):
-                                        tile_elem = ui.button('', on_click=lambda e, x=i, y=j: self.place_tile(x, y)).classes(
-                                            f'border border-gray-200 hover:border-blue-400 transition-colors'
-                                        ).style(f'width: {self.tile_size}px; height: {self.tile_size}px;')
-                                        tile_elem.on('contextmenu', lambda e, x=i, y=j: self.remove_tile(x, y))
-                                        row_elements.append(tile_elem)
-                                    self.grid_elements.append(row_elements)
+                        renderer_class = ChunkViewport if self.chunked else RENDERERS[self.renderer_name]
+                        self.renderer = renderer_class(
+                            self.grid_size, self.tile_size, describe_tile,
+                            GridInput(self.handle_stroke, self.begin_placing, self.continue_placing, self.stop_placing,
+                                      self.apply_operations))
                         
                         # Instructions
-                        ui.label('Left Click: Place | Right Click: Remove').classes('text-sm text-gray-500 mt-4')
+                        ui.label('Left Click/Drag: Draw | Right Click: Remove | Shapes: drag or click both corners').classes('text-sm text-gray-500 mt-4')
+                        if self.chunked:
+                            ui.label('Wheel: Zoom | Shift+Drag or Middle Drag: Pan').classes('text-sm text-gray-500')
+                            self.scene_view = None
+                        else:
+                            with ui.expansion('🧊 3D Preview', value=True).classes('w-full mt-2'):
+                                self.scene_view = HouseScene(self.grid_size)
                 
                 # Right Panel - Info & Stats
                 with ui.card().classes('w-64 h-full bg-white shadow-lg rounded-xl p-4 overflow-y-auto'):
@@ -145,6 +185,12 @@ class HouseMakerGame:
                         self.stats_labels['windows'] = ui.label('Windows: 0').classes('text-gray-600')
                         self.stats_labels['rooms'] = ui.label('Rooms: 0').classes('text-gray-600')
                         self.stats_labels['furniture'] = ui.label('Furniture: 0').classes('text-gray-600')
+                        self.rooms_label = ui.label('').classes('text-xs text-gray-500 whitespace-pre-line')
+                    
+                    if self.validator:
+                        ui.separator().classes('my-4')
+                        ui.label('🩺 Layout Check').classes('text-lg font-bold mb-2 text-gray-700')
+                        self.issues_label = ui.label('').classes('text-xs text-gray-600 whitespace-pre-line')
                     
                     ui.separator().classes('my-4')
                     
@@ -155,295 +201,342 @@ class HouseMakerGame:
                     ui.separator().classes('my-4')
                     
                     # Templates
-                    ui.label('📋 Quick Templates').classes('text-lg font-bold mb-2 text-gray-700')
-                    ui.button('Small House', on_click=lambda: self.load_template('small')).classes('w-full bg-indigo-500 text-white hover:bg-indigo-600')
-                    ui.button('Mansion', on_click=lambda: self.load_template('mansion')).classes('w-full bg-indigo-500 text-white hover:bg-indigo-600')
-                    ui.button('Apartment', on_click=lambda: self.load_template('apartment')).classes('w-full bg-indigo-500 text-white hover:bg-indigo-600')
+                    # only the templates that fit the grid
+                    templates = [] if self.chunked else fitting_templates(self.grid_size)
+                    if templates:
+                        ui.label('📋 Quick Templates').classes('text-lg font-bold mb-2 text-gray-700')
+                        for name in templates:
+                            ui.button(TEMPLATE_LABELS[name], on_click=lambda name=name: self.load_template(name)).classes('w-full bg-indigo-500 text-white hover:bg-indigo-600')
         
-        self.update_grid_display()
+        # the viewport fetches the chunks it shows by itself
+        cells = () if self.chunked else {(x, y) for x in range(self.grid_size) for y in range(self.grid_size)}
+        self.renderer.render(self.grid, cells)
+        if self.scene_view:
+            self.scene_view.render(self.grid, cells)
         self.update_stats()
+        self.update_history_buttons()
+        self.update_brush()
+        if self.shared:
+            self.shared.subscribe(self.show_remote_changes)
     
     def get_tile_emoji(self, tile_type: TileType) -> str:
-        emojis = {
-            TileType.WALL: "🧱",
-            TileType.DOOR: "🚪",
-            TileType.WINDOW: "🪟",
-            TileType.FLOOR: "🟫",
-            TileType.ROOF: "🔺",
-            TileType.FURNITURE: "🪑"
-        }
-        return emojis.get(tile_type, "⬜")
+        return TILE_EMOJIS.get(tile_type, "⬜")
     
     def get_room_emoji(self, room: RoomType) -> str:
-        emojis = {
-            RoomType.LIVING_ROOM: "🛋️",
-            RoomType.BEDROOM: "🛏️",
-            RoomType.KITCHEN: "🍳",
-            RoomType.BATHROOM: "🚿",
-            RoomType.GARAGE: "🚗"
-        }
-        return emojis.get(room, "🏠")
+        return ROOM_EMOJIS.get(room, "🏠")
     
     def get_furniture_emoji(self, furniture: FurnitureType) -> str:
-        emojis = {
-            FurnitureType.SOFA: "🛋️",
-            FurnitureType.BED: "🛏️",
-            FurnitureType.TABLE: "🪑",
-            FurnitureType.CHAIR: "💺",
-            FurnitureType.TV: "📺",
-            FurnitureType.FRIDGE: "🧊",
-            FurnitureType.TOILET: "🚽",
-            FurnitureType.SINK: "🚰"
-        }
-        return emojis.get(furniture, "📦")
+        return FURNITURE_EMOJIS.get(furniture, "📦")
     
     def select_tool(self, tool: TileType):
         self.selected_tool = tool
         self.selection_label.text = f"Tool: {tool.value.title()}"
-        self.update_grid_display()
+        self.update_brush()
+    
+    def select_shape(self, shape: DrawTool):
+        self.selected_shape = shape
+        self.shape_anchor = None
+        for other, button in self.shape_buttons.items():
+            button.props(f'color={"primary" if other == shape else "secondary"}')
+        self.update_brush()
     
     def select_room(self, room: RoomType):
         self.selected_room = room
         self.selection_label.text = f"Room: {room.value}"
+        self.update_brush()
     
     def select_furniture(self, furniture: FurnitureType):
         self.selected_furniture = furniture
         self.selected_tool = TileType.FURNITURE
         self.selection_label.text = f"Furniture: {furniture.value.title()}"
-        self.update_grid_display()
+        self.update_brush()
     
     def select_color(self, color: str):
         self.selected_color = color
         self.color_preview.style(f'background-color: {color}')
+        self.update_brush()
     
-    def place_tile(self, x: int, y: int):
+    def update_brush(self):
+        """Tell the renderer which tile the browser may paint without waiting for the server."""
+        self.renderer.set_brush(self.current_tile() if self.selected_shape == DrawTool.BRUSH else None)
+    
+    def current_tile(self) -> Tile:
         if self.selected_tool == TileType.FURNITURE:
-            self.grid[x][y] = Tile(TileType.FURNITURE, furniture_type=self.selected_furniture, color=self.selected_color)
-        elif self.selected_tool == TileType.FLOOR:
-            self.grid[x][y] = Tile(TileType.FLOOR, room_type=self.selected_room, color=self.selected_color)
-        else:
-            self.grid[x][y] = Tile(self.selected_tool, color=self.selected_color)
-        
-        self.update_grid_display()
-        self.update_stats()
+            return make_tile(TileType.FURNITURE, furniture_type=self.selected_furniture, color=self.selected_color)
+        if self.selected_tool == TileType.FLOOR:
+            return make_tile(TileType.FLOOR, room_type=self.selected_room, color=self.selected_color)
+        return make_tile(self.selected_tool, color=self.selected_color)
+    
+    def place_tile(self, x: int, y: int):
+        with self.batch_update():
+            self.grid.set(x, y, self.current_tile())
     
     def remove_tile(self, x: int, y: int):
-        self.grid[x][y] = Tile(TileType.EMPTY)
-        self.update_grid_display()
-        self.update_stats()
+        with self.batch_update():
+            self.grid.set(x, y, EMPTY_TILE)
+    
+    def paint_cells(self, cells: List[Cell], tile: Tile):
+        with self.batch_update():
+            for x, y in cells:
+                self.grid.set(x, y, tile)
+    
+    def handle_stroke(self, path: List[Cell], erase: bool = False):
+        """Apply one complete stroke of the selected draw mode as a single batched update.
+
+        Lines and rectangles need two points; a stroke without a drag sets the first corner and the
+        next one completes the shape.
+        """
+        if not path:
+            return
+        if self.selected_shape in (DrawTool.LINE, DrawTool.RECTANGLE, DrawTool.FILLED_RECTANGLE) and len(path) == 1:
+            if self.shape_anchor is None:
+                self.shape_anchor = path[0]
+                ui.notify('Click the end point', type='info')
+                return
+            path = [self.shape_anchor, path[0]]
+        self.shape_anchor = None
+        cells = tool_cells(self.selected_shape, self.grid, path)
+        self.paint_cells(cells, EMPTY_TILE if erase else self.current_tile())
+    
+    def apply_operations(self, operations: List[Tuple[Cell, Tile]], done: bool = True) -> int:
+        """Apply a batch of tile placements the browser has already shown; returns the design version.
+
+        The batches of one drag form a single undo step, closed by the batch marked ``done``.
+        """
+        if not self.is_applying:
+            self.is_applying = True
+            self.history.hold()
+        with self.batch_update():
+            for (x, y), tile in operations:
+                if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
+                    self.grid.set(x, y, tile)
+        if done:
+            self.stop_applying()
+        return self.version
+    
+    def stop_applying(self):
+        if not self.is_applying:
+            return
+        self.is_applying = False
+        self.history.release()
+        self.update_history_buttons()
+    
+    def begin_placing(self, x: int, y: int):
+        self.stop_placing()
+        self.is_placing = True
+        self.history.hold()  # the whole drag becomes one undo step
+        self.stroke_path = [(x, y)]
+        if self.selected_shape == DrawTool.BRUSH:
+            self.place_tile(x, y)
+    
+    def continue_placing(self, x: int, y: int):
+        if not self.is_placing or (x, y) == self.stroke_path[-1]:
+            return
+        if self.selected_shape == DrawTool.BRUSH:
+            self.paint_cells(line_cells(self.stroke_path[-1], (x, y))[1:], self.current_tile())
+        self.stroke_path.append((x, y))
+    
+    def stop_placing(self):
+        if not self.is_placing:
+            return
+        self.is_placing = False
+        if self.selected_shape != DrawTool.BRUSH:
+            self.handle_stroke(self.stroke_path)
+        self.stroke_path = []
+        self.history.release()
+        self.update_history_buttons()
+    
+    @contextmanager
+    def batch_update(self, record: bool = True):
+        """Defer rendering until the outermost batch exits, then push all changed tiles at once.
+
+        Changes made inside the batch form one undo step unless ``record`` is false.
+        """
+        self._batch_depth += 1
+        if record:
+            self.history.begin(self.grid)
+        try:
+            yield
+        finally:
+            if record:
+                self.history.end()
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.update_grid_display()
+                self.update_stats()
+                self.update_history_buttons()
+    
+    def undo(self):
+        self.stop_placing()
+        self.stop_applying()
+        with self.batch_update(record=False):
+            if not self.history.undo(self.grid):
+                ui.notify('Nothing to undo', type='info')
+        self.notify_conflicts()
+    
+    def redo(self):
+        self.stop_placing()
+        self.stop_applying()
+        with self.batch_update(record=False):
+            if not self.history.redo(self.grid):
+                ui.notify('Nothing to redo', type='info')
+        self.notify_conflicts()
+    
+    def notify_conflicts(self):
+        if self.history.conflicts:
+            ui.notify(f'Kept {self.history.conflicts} cells changed by others since', type='info')
+    
+    def update_history_buttons(self):
+        self.undo_button.set_enabled(self.history.can_undo)
+        self.redo_button.set_enabled(self.history.can_redo)
     
     def update_grid_display(self):
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                tile = self.grid[i][j]
-                elem = self.grid_elements[i][j]
-                
-                if tile.type == TileType.EMPTY:
-                    elem.text = ''
-                    elem.style(f'background-color: #F5F5F5; width: {self.tile_size}px; height: {self.tile_size}px;')
-                elif tile.type == TileType.FURNITURE:
-                    elem.text = self.get_furniture_emoji(tile.furniture_type)
-                    elem.style(f'background-color: {tile.color}; width: {self.tile_size}px; height: {self.tile_size}px;')
-                elif tile.type == TileType.FLOOR:
-                    elem.text = self.get_room_emoji(tile.room_type) if tile.room_type else ''
-                    elem.style(f'background-color: {tile.color}; width: {self.tile_size}px; height: {self.tile_size}px;')
-                else:
-                    elem.text = self.get_tile_emoji(tile.type)
-                    elem.style(f'background-color: {tile.color}; width: {self.tile_size}px; height: {self.tile_size}px;')
+        if self._batch_depth:
+            return
+        dirty = self.grid.take_dirty()
+        if self.shared:
+            self.shared.publish(dirty, source=self.show_remote_changes)
+        else:
+            if self.room_analyzer:
+                self.room_analyzer.update(dirty)
+                self.validator.update(dirty)
+            self._version += bool(dirty)
+        self.renderer.render(self.grid, dirty)
+        if self.scene_view:
+            self.scene_view.render(self.grid, dirty)
+    
+    @property
+    def version(self) -> int:
+        """Number of changes applied to the design so far; acknowledgements carry it to the browser."""
+        return self.shared.version if self.shared else self._version
+    
+    def show_remote_changes(self, cells: Set[Cell]):
+        """Render cells of the shared design that other clients changed."""
+        self.renderer.render(self.grid, cells)
+        if self.scene_view:
+            self.scene_view.render(self.grid, cells)
+        self.update_stats()
     
     def update_stats(self):
-        stats = {
-            'walls': 0,
-            'doors': 0,
-            'windows': 0,
-            'rooms': set(),
-            'furniture': 0
-        }
-        
-        for row in self.grid:
-            for tile in row:
-                if tile.type == TileType.WALL:
-                    stats['walls'] += 1
-                elif tile.type == TileType.DOOR:
-                    stats['doors'] += 1
-                elif tile.type == TileType.WINDOW:
-                    stats['windows'] += 1
-                elif tile.type == TileType.FURNITURE:
-                    stats['furniture'] += 1
-                elif tile.type == TileType.FLOOR and tile.room_type:
-                    stats['rooms'].add(tile.room_type.value)
-        
-        self.stats_labels['walls'].text = f"Walls: {stats['walls']}"
-        self.stats_labels['doors'].text = f"Doors: {stats['doors']}"
-        self.stats_labels['windows'].text = f"Windows: {stats['windows']}"
-        self.stats_labels['rooms'].text = f"Rooms: {len(stats['rooms'])}"
-        self.stats_labels['furniture'].text = f"Furniture: {stats['furniture']}"
+        if self._batch_depth:
+            return
+        stats = self.grid.stats
+        self.stats_labels['walls'].text = f"Walls: {stats.walls}"
+        self.stats_labels['doors'].text = f"Doors: {stats.doors}"
+        self.stats_labels['windows'].text = f"Windows: {stats.windows}"
+        self.stats_labels['furniture'].text = f"Furniture: {stats.furniture}"
+        if not self.room_analyzer:
+            self.stats_labels['rooms'].text = f"Room types: {stats.rooms}"
+            return
+        rooms = self.room_analyzer.rooms()
+        self.stats_labels['rooms'].text = f"Rooms: {len(rooms)}"
+        self.rooms_label.text = '\n'.join(
+            f"#{n}: {room.area} tiles, {room.doors} doors, {room.windows} windows, {room.furniture} furniture"
+            for n, room in enumerate(rooms[:8], start=1))
+        issues = self.validator.issues()
+        lines = [f"⚠️ {issue.message}" for issue in issues[:8]]
+        if len(issues) > 8:
+            lines.append(f"… and {len(issues) - 8} more")
+        self.issues_label.text = '\n'.join(lines) or '✅ No problems found'
     
     def clear_grid(self):
-        self.grid = [[Tile(TileType.EMPTY) for _ in range(self.grid_size)] 
-                    for _ in range(self.grid_size)]
-        self.update_grid_display()
-        self.update_stats()
+        with self.batch_update():
+            self.grid.clear()
         ui.notify('Grid cleared!', type='info')
     
     def random_house(self):
-        self.clear_grid()
-        
-        # Create random house structure
-        import random
-        
-        # Build outer walls
-        for i in range(5, 15):
-            self.grid[5][i] = Tile(TileType.WALL, color="#8B4513")
-            self.grid[14][i] = Tile(TileType.WALL, color="#8B4513")
-        for i in range(5, 15):
-            self.grid[i][5] = Tile(TileType.WALL, color="#8B4513")
-            self.grid[i][14] = Tile(TileType.WALL, color="#8B4513")
-        
-        # Add doors and windows
-        self.grid[5][10] = Tile(TileType.DOOR, color="#654321")
-        self.grid[10][5] = Tile(TileType.WINDOW, color="#87CEEB")
-        self.grid[10][14] = Tile(TileType.WINDOW, color="#87CEEB")
-        
-        # Add floors
-        for i in range(6, 14):
-            for j in range(6, 14):
-                if random.random() > 0.3:
-                    room_type = random.choice(list(RoomType))
-                    self.grid[i][j] = Tile(TileType.FLOOR, room_type=room_type, color="#DEB887")
-        
-        # Add random furniture
-        for _ in range(10):
-            x = random.randint(6, 13)
-            y = random.randint(6, 13)
-            furniture = random.choice(list(FurnitureType))
-            self.grid[x][y] = Tile(TileType.FURNITURE, furniture_type=furniture, color="#8B4513")
-        
-        self.update_grid_display()
-        self.update_stats()
+        with self.batch_update():
+            self.grid.assign(generate_layout(self.grid_size))
         ui.notify('Random house generated!', type='success')
     
     def load_template(self, template_type: str):
-        self.clear_grid()
-        
-        if template_type == 'small':
-            # Small house template
-            for i in range(7, 13):
-                self.grid[7][i] = Tile(TileType.WALL, color="#8B4513")
-                self.grid[12][i] = Tile(TileType.WALL, color="#8B4513")
-            for i in range(7, 13):
-                self.grid[i][7] = Tile(TileType.WALL, color="#8B4513")
-                self.grid[i][12] = Tile(TileType.WALL, color="#8B4513")
-            
-            self.grid[7][10] = Tile(TileType.DOOR, color="#654321")
-            self.grid[9][7] = Tile(TileType.WINDOW, color="#87CEEB")
-            
-            for i in range(8, 12):
-                for j in range(8, 12):
-                    self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.LIVING_ROOM, color="#DEB887")
-            
-            self.grid[9][9] = Tile(TileType.FURNITURE, furniture_type=FurnitureType.SOFA, color="#4682B4")
-            self.grid[10][10] = Tile(TileType.FURNITURE, furniture_type=FurnitureType.TV, color="#2F4F4F")
-            
-        elif template_type == 'mansion':
-           
-            for i in range(3, 17):
-                self.grid[3][i] = Tile(TileType.WALL, color="#8B4513")
-                self.grid[16][i] = Tile(TileType.WALL, color="#8B4513")
-            for i in range(3, 17):
-                self.grid[i][3] = Tile(TileType.WALL, color="#8B4513")
-                self.grid[i][16] = Tile(TileType.WALL, color="#8B4513")
-            
-            self.grid[3][10] = Tile(TileType.DOOR, color="#654321")
-            self.grid[8][3] = Tile(TileType.WINDOW, color="#87CEEB")
-            self.grid[8][16] = Tile(TileType.WINDOW, color="#87CEEB")
-            self.grid[12][3] = Tile(TileType.WINDOW, color="#87CEEB")
-            self.grid[12][16] = Tile(TileType.WINDOW, color="#87CEEB")
-            
-            
-            for i in range(4, 10):
-                for j in range(4, 10):
-                    self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.LIVING_ROOM, color="#DEB887")
-            
-            for i in range(4, 10):
-                for j in range(10, 16):
-                    self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.KITCHEN, color="#F0E68C")
-            
-            for i in range(10, 16):
-                for j in range(4, 10):
-                    self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.BEDROOM, color="#E6E6FA")
-            
-            for i in range(10, 16):
-                for j in range(10, 16):
-                    self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.BATHROOM, color="#B0E0E6")
-            
-        elif template_type == 'apartment':
-            
-            for i in range(5, 15):
-                self.grid[5][i] = Tile(TileType.WALL, color="#696969")
-                self.grid[14][i] = Tile(TileType.WALL, color="#696969")
-            for i in range(5, 15):
-                self.grid[i][5] = Tile(TileType.WALL, color="#696969")
-                self.grid[i][14] = Tile(TileType.WALL, color="#696969")
-            
-            self.grid[5][10] = Tile(TileType.DOOR, color="#4A4A4A")
-            self.grid[9][5] = Tile(TileType.WINDOW, color="#87CEEB")
-            self.grid[10][14] = Tile(TileType.WINDOW, color="#87CEEB")
-            
-            for i in range(6, 14):
-                for j in range(6, 14):
-                    if i < 10:
-                        self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.LIVING_ROOM, color="#D3D3D3")
-                    else:
-                        self.grid[i][j] = Tile(TileType.FLOOR, room_type=RoomType.BEDROOM, color="#DDA0DD")
-            
-            self.grid[7][8] = Tile(TileType.FURNITURE, furniture_type=FurnitureType.SOFA, color="#708090")
-            self.grid[11][11] = Tile(TileType.FURNITURE, furniture_type=FurnitureType.BED, color="#8B7355")
-        
-        self.update_grid_display()
-        self.update_stats()
+        with self.batch_update():
+            self.grid.assign(compile_template(template_type, self.grid_size))
         ui.notify(f'{template_type.title()} template loaded!', type='success')
     
     def save_design(self):
-        design_data = {
-            'name': self.current_design_name,
-            'grid': [[{
-                'type': tile.type.value,
-                'room_type': tile.room_type.value if tile.room_type else None,
-                'furniture_type': tile.furniture_type.value if tile.furniture_type else None,
-                'color': tile.color
-            } for tile in row] for row in self.grid]
-        }
-        
-        self.saved_designs.append(design_data)
+        self.store.save(self.current_design_name, self.grid)
         ui.notify(f'Design "{self.current_design_name}" saved!', type='success')
     
-    def load_design(self):
-        if not self.saved_designs:
+    async def load_design(self):
+        designs = self.store.list(self.grid_size, limit=300)
+        if not designs:
             ui.notify('No saved designs available!', type='warning')
             return
         
-        design = self.saved_designs[-1] 
-        self.current_design_name = design['name']
+        self.saved_designs_list.clear()
+        images = []
+        with self.saved_designs_list:
+            for info in designs:
+                with ui.column().classes('items-center gap-1 p-2 border rounded-lg') as card:
+                    images.append(ui.image().classes('w-32 h-32 bg-gray-100').props('no-spinner'))
+                    ui.label(info.name).classes('text-sm text-gray-700')
+                    ui.label(f'{datetime.fromtimestamp(info.created):%Y-%m-%d %H:%M}').classes('text-xs text-gray-500')
+                    with ui.row().classes('gap-1'):
+                        ui.button('Load', on_click=lambda i=info.id: self.open_design(i)).props('flat dense')
+                        ui.button('Delete', on_click=lambda i=info.id, c=card: self.delete_design(i, c)).props('flat dense color=red')
+        self.load_dialog.open()
         
-        for i, row in enumerate(design['grid']):
-            for j, tile_data in enumerate(row):
-                self.grid[i][j] = Tile(
-                    TileType(tile_data['type']),
-                    RoomType(tile_data['room_type']) if tile_data['room_type'] else None,
-                    FurnitureType(tile_data['furniture_type']) if tile_data['furniture_type'] else None,
-                    tile_data['color']
-                )
+        # thumbnails come from the stored blobs; no grid is built for them
+        grids = self.store.grids([info.id for info in designs])
+        urls = await thumbnails.urls([grids[info.id] for info in designs if info.id in grids])
+        for image, url in zip((image for image, info in zip(images, designs) if info.id in grids), urls):
+            image.set_source(url)
+    
+    def open_design(self, design_id: int):
+        self.load_dialog.close()
+        loaded = self.store.load(design_id)
+        if loaded is None:
+            ui.notify('Design no longer exists!', type='warning')
+            return
         
-        self.update_grid_display()
-        self.update_stats()
+        info, snapshot = loaded
+        self.current_design_name = info.name
+        with self.batch_update():
+            self.grid.assign(snapshot)
         ui.notify(f'Design "{self.current_design_name}" loaded!', type='success')
+    
+    def open_import(self):
+        # the upload is only built on demand: its route stays cached by FastAPI after the page is gone
+        self.import_area.clear()
+        with self.import_area:
+            ui.upload(label='Design archive (.ndjson)', auto_upload=True, on_upload=self.import_designs).props('accept=.ndjson,.json')
+        self.import_dialog.open()
+    
+    async def import_designs(self, e: events.UploadEventArguments):
+        importer = DesignImporter(self.store)
+        try:
+            async for chunk in e.file.iterate():
+                importer.write(chunk)
+                await asyncio.sleep(0)
+            report = importer.close()
+        except ValueError as error:
+            ui.notify(f'Import failed: {error}', type='negative')
+            return
+        self.import_dialog.close()
+        if report.skipped:
+            ui.notify(f'Imported {report.imported} designs, skipped {report.skipped} '
+                      f'({"; ".join(report.errors[:3])})', type='warning', multi_line=True)
+        else:
+            ui.notify(f'Imported {report.imported} designs!', type='success')
+    
+    def delete_design(self, design_id: int, card: ui.element):
+        if self.store.delete(design_id):
+            card.delete()
+            ui.notify('Design deleted!', type='info')
 
 
 @ui.page('/')
-def main():
-    game = HouseMakerGame()
-import os
+def main(renderer: str = 'buttons', size: int = 20, design: Optional[str] = None):
+    size = min(max(size, MIN_GRID_SIZE), MAX_GRID_SIZE)
+    try:
+        shared = get_shared_design(design, size) if design else None
+    except ValueError as e:
+        ui.notify(str(e), type='negative')
+        shared = None
+    game = HouseMakerGame(grid_size=size, renderer=renderer if renderer in RENDERERS else 'buttons', shared=shared)
+    if shared:
+        ui.context.client.on_delete(lambda: shared.unsubscribe(game.show_remote_changes))
 port = int(os.getenv('PORT', 8080))
 host = '0.0.0.0'
 if __name__ in {'__main__', '__mp_main__'}:
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# the app is a set of flat scripts, not a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# the apps open their stores and caches on import; keep tests away from the real ones
+_scratch = tempfile.mkdtemp(prefix='house-tests-')
+os.environ.setdefault('HOUSE_DESIGNS_DB', ':memory:')
+os.environ.setdefault('HOUSE_THUMBNAILS_DIR', os.path.join(_scratch, 'thumbnails'))
+os.environ.setdefault('CAR_GALLERY_DB', ':memory:')
+os.environ.setdefault('CAR_RENDERS_DIR', os.path.join(_scratch, 'car_renders'))
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from bench_renders import random_designs
+from car_archive import ARCHIVE_FORMAT, DesignImporter, design_hash, export_lines, gzip_chunks
+from car_catalog import DEFAULT_PATH, load_catalog
+
+CATALOG = load_catalog(DEFAULT_PATH)
+
+def saved(n: int, design: dict) -> dict:
+    return {'id': f'design-{n}', 'name': design['name'], 'date': '2024-01-01 12:00', 'price': 0, 'design': design}
+
+def archive(count: int = 20) -> bytes:
+    return b''.join(export_lines(saved(n, design) for n, design in enumerate(random_designs(count))))
+
+def run_import(chunks, **kwargs):
+    imported = []
+    importer = DesignImporter(CATALOG, imported.extend, **kwargs)
+    for chunk in chunks:
+        importer.write(chunk)
+    return importer.close(), imported
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+@pytest.mark.parametrize('compressed', [False, True])
+def test_archive_round_trip_in_any_chunking(chunk_size, compressed):
+    data = archive()
+    if compressed:
+        data = b''.join(gzip_chunks([data]))
+    report, imported = run_import(data[n:n + chunk_size] for n in range(0, len(data), chunk_size))
+    assert (report.imported, report.skipped, report.duplicates) == (20, 0, 0)
+    assert [design_hash(design['design']) for design in imported] == [design_hash(design) for design in random_designs(20)]
+
+def test_duplicates_and_taken_ids():
+    designs = random_designs(3)
+    data = archive(3)
+    again = data[data.index(b'\n') + 1:]  # the same designs a second time, without the header
+    report, imported = run_import([data, again], known={design_hash(designs[0])},
+                                  taken_ids=['design-1', 'design-1-2'])
+    assert (report.imported, report.duplicates) == (2, 4)
+    assert [design['id'] for design in imported] == ['design-1-3', 'design-2']
+
+def test_bad_designs_are_skipped_and_reported():
+    design = random_designs(1)[0]
+    lines = [json.dumps({'format': ARCHIVE_FORMAT, 'version': 1}),
+             '{"id": ',
+             json.dumps(saved(1, {**design, 'body_style': 'hovercraft'})),
+             json.dumps(saved(2, {**design, 'body_color': 'red'})),
+             json.dumps({'id': 'x'}),
+             json.dumps(saved(3, design))]
+    report, imported = run_import(['\n'.join(lines).encode()])
+    assert (report.imported, report.skipped) == (1, 4)
+    assert [error.split(':')[0] for error in report.errors] == [f'line {n}' for n in range(2, 6)]
+
+def test_overlong_lines_are_skipped(monkeypatch):
+    monkeypatch.setattr('car_archive.MAX_LINE', 500)
+    data = archive(2).split(b'\n')
+    data.insert(2, b'{"id": "' + b'x' * 1000 + b'"}')
+    data = b'\n'.join(data)
+    report, imported = run_import(data[n:n + 64] for n in range(0, len(data), 64))
+    assert (report.imported, report.skipped) == (2, 1)
+    assert report.errors == ['line 3: line too long']
+
+@pytest.mark.parametrize('data, error', [
+    (b'', 'empty file'),
+    (b'hello', 'Not a car design archive'),
+    (json.dumps({'format': 'house-designs', 'version': 1}).encode(), 'missing header'),
+    (json.dumps({'format': ARCHIVE_FORMAT, 'version': 2}).encode(), 'Unsupported'),
+    (b''.join(gzip_chunks([archive(5)]))[:-10], 'truncated'),
+    (b'\x1f\x8bnot gzip', 'Corrupt archive'),
+])
+def test_broken_archives_fail_the_import(data, error):
+    with pytest.raises(ValueError, match=error):
+        run_import([data])
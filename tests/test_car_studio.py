@@ -0,0 +1,67 @@
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+from car_catalog import STATS
+from car_gallery import RANKINGS, CarGallery
+
+# the studio is a script with a dot in its name
+spec = importlib.util.spec_from_file_location('car_studio', Path(__file__).resolve().parent.parent / '1nicegui.project.py')
+studio = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(studio)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_saved_order_matches_a_list(seed):
+    rng = random.Random(seed)
+    order, expected = studio.SavedOrder(), []
+    for n in range(3000):
+        if expected and rng.random() < (0.3 if n < 1500 else 0.7):  # grow, then mostly shrink
+            design_id = rng.choice(expected)
+            expected.remove(design_id)
+            order.remove(design_id)
+        else:
+            expected.append(f'design-{n}')
+            order.append(f'design-{n}')
+        if n % 50 == 0:
+            assert len(order) == len(expected)
+            assert [order[i] for i in range(len(order))] == expected
+            first = rng.randrange(len(expected) + 1)
+            last = first + rng.randrange(40)
+            assert order.slice(first, last) == expected[first:last]
+    order.remove('unknown')
+    with pytest.raises(IndexError):
+        order[len(expected)]
+
+@pytest.fixture
+def gallery(monkeypatch):
+    monkeypatch.setattr('car_gallery.BUCKET_SIZE', 8)  # many buckets and splits from few designs
+    gallery = CarGallery(':memory:')
+    yield gallery
+    gallery.close()
+
+def brute_top(gallery: CarGallery, ranking: str, limit: int, max_price=None):
+    entries = [entry for entry in gallery.entries.values() if max_price is None or entry.price <= max_price]
+    key = {**{stat: (lambda entry, n=n: (entry.stats[n], entry.id)) for n, stat in enumerate(STATS)},
+           'overall': lambda entry: (entry.overall, entry.id), 'newest': lambda entry: (entry.id,)}[ranking]
+    return sorted(entries, key=key, reverse=True)[:limit]
+
+def test_gallery_top_matches_a_full_sort(gallery):
+    rng = random.Random(1)
+
+    def random_design():
+        # few distinct prices and scores, so that ties and equal-price buckets occur
+        return ('car', {'name': 'car'}, rng.randrange(10) * 1000, tuple(rng.randrange(5) / 4 for _ in STATS))
+
+    gallery.publish_many(random_design() for _ in range(150))
+    for step in range(300):
+        if rng.random() < 0.3:
+            gallery.remove(rng.choice(list(gallery.entries)))
+        else:
+            gallery.publish(*random_design())
+        if step % 10 == 0:
+            for ranking in RANKINGS:
+                for limit in (1, 5, 50):
+                    for max_price in (None, 0, 3500, 9000, 20000):
+                        assert gallery.top(ranking, limit, max_price) == brute_top(gallery, ranking, limit, max_price)
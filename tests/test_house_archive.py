@@ -0,0 +1,94 @@
+import base64
+import json
+
+import pytest
+
+from house_archive import ARCHIVE_FORMAT, DesignImporter, export_lines
+from house_chunks import FLAT_GRID_LIMIT, ChunkedGrid, new_grid
+from house_model import HouseGrid, TileType, make_tile
+from house_store import DesignStore, encode_chunked, encode_snapshot
+
+HEADER = json.dumps({'format': ARCHIVE_FORMAT, 'version': 2}).encode() + b'\n'
+
+@pytest.fixture
+def store():
+    store = DesignStore(':memory:')
+    yield store
+    store.close()
+
+def v2_line(size: int, data: bytes) -> bytes:
+    return json.dumps({'name': 'x', 'created': 0.0, 'size': size, 'grid': base64.b64encode(data).decode()}).encode()
+
+def run_import(store, *lines: bytes):
+    importer = DesignImporter(store)
+    importer.write(b'\n'.join(lines) + b'\n')
+    return importer.close()
+
+@pytest.mark.parametrize('size, data', [
+    (FLAT_GRID_LIMIT + 1, encode_snapshot(FLAT_GRID_LIMIT + 1, HouseGrid(FLAT_GRID_LIMIT + 1))),
+    (FLAT_GRID_LIMIT, encode_chunked(ChunkedGrid(FLAT_GRID_LIMIT))),
+    (4, encode_snapshot(4, HouseGrid(4))),
+])
+def test_grid_in_the_wrong_format_is_rejected(store, size, data):
+    report = run_import(store, HEADER.rstrip(), v2_line(size, data))
+    assert (report.imported, report.skipped) == (0, 1)
+
+def test_large_v1_design_is_imported_chunked(store):
+    size = FLAT_GRID_LIMIT + 1
+    rows = [[{'type': 'empty'}] * size for _ in range(size)]
+    rows[size - 1][size - 1] = {'type': 'wall', 'color': '#123456'}
+    report = run_import(store, json.dumps({'name': 'big', 'grid': rows}).encode())
+    assert (report.imported, report.skipped) == (1, 0)
+    info, grid = store.load(store.list(size)[0].id)
+    assert isinstance(grid, type(new_grid(size)))
+    assert grid.get(size - 1, size - 1) == make_tile(TileType.WALL, color='#123456')
+
+def test_overlong_line_fails_the_import(store, monkeypatch):
+    monkeypatch.setattr('house_archive.MAX_LINE', 100)
+    importer = DesignImporter(store)
+    importer.write(HEADER)
+    importer.write(b'[' * 60)
+    with pytest.raises(ValueError, match='Line 2'):
+        importer.write(b'[' * 60)
+
+def test_export_and_import_round_trip(store):
+    grids = [new_grid(size) for size in (5, 20, 300)]
+    for grid in grids:
+        grid.set(0, 0, make_tile(TileType.WALL, color='#123456'))
+        store.save(f'{grid.size}', grid)
+    lines = list(export_lines(store.iterate()))
+    copy = DesignStore(':memory:')
+    report = run_import(copy, *(line.rstrip(b'\n') for line in lines))
+    assert (report.imported, report.skipped) == (3, 0)
+    assert [row[1] for row in copy.iterate()] == [row[1] for row in store.iterate()]
+    copy.close()
+
+@pytest.mark.parametrize('first_line, error', [
+    (b'not json', 'Not a design archive'),
+    (b'[1, 2]', 'missing header'),
+    (json.dumps({'format': ARCHIVE_FORMAT, 'version': 99}).encode(), 'Unsupported design archive version'),
+])
+def test_bad_header_fails_the_import(store, first_line, error):
+    with pytest.raises(ValueError, match=error):
+        run_import(store, first_line)
+
+def test_bad_design_lines_are_skipped_and_reported(store):
+    good = encode_snapshot(10, HouseGrid(10))
+    report = run_import(store, HEADER.rstrip(),
+                        b'{"name": ',
+                        json.dumps({'name': 'no grid', 'created': 0.0, 'size': 10}).encode(),
+                        json.dumps({'name': 'x', 'created': 0.0, 'size': 10, 'grid': '!!'}).encode(),
+                        v2_line(12, good),
+                        v2_line(10, good[:-8]),
+                        v2_line(10, good))
+    assert (report.imported, report.skipped) == (1, 5)
+    assert [error.split(':')[0] for error in report.errors] == [f'line {n}' for n in range(2, 7)]
+
+def test_bad_v1_cells_are_skipped(store):
+    report = run_import(store,
+                        json.dumps({'name': 'ok', 'grid': [[{'type': 'wall'}] * 5] * 5}).encode(),
+                        json.dumps({'name': 'ragged', 'grid': [[{'type': 'wall'}] * 5] * 4 + [[]]}).encode(),
+                        json.dumps({'name': 'tiny', 'grid': [[{'type': 'wall'}]]}).encode(),
+                        json.dumps({'name': 'odd', 'grid': [[{'type': 'lava'}] * 5] * 5}).encode(),
+                        json.dumps({'name': 'paint', 'grid': [[{'type': 'wall', 'color': 'red'}] * 5] * 5}).encode())
+    assert (report.imported, report.skipped) == (1, 4)
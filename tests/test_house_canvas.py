@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from nicegui import Client
+from nicegui.page import page
+
+import main
+from house_model import TileType
+
+def fire(client: Client, element, event_type: str, args: dict):
+    listener_id = next(listener_id for listener_id, listener in element._event_listeners.items()
+                       if listener.type.split('.')[0] == event_type)
+    client.handle_event({'id': element.id, 'listener_id': listener_id, 'args': [json.dumps(args)]})
+
+@pytest.fixture
+def client():
+    with Client(page('/'), request=None) as client:
+        yield client
+    client.delete()
+
+def row(game, length: int):
+    return [game.grid.get(0, y).type for y in range(length)]
+
+def test_optimistic_drag_is_one_undo_step(client):
+    game = main.HouseMakerGame(renderer='optimistic')
+    game.update_brush()
+    brush = game.renderer._props['brush'][0]
+    fire(client, game.renderer, 'ops', {'seq': 1, 'ops': [0, brush, 1, brush], 'done': False})
+    fire(client, game.renderer, 'ops', {'seq': 2, 'ops': [2, brush], 'done': False})
+    assert not game.history.can_undo
+    fire(client, game.renderer, 'ops', {'seq': 3, 'ops': [], 'done': True})
+    fire(client, game.renderer, 'ops', {'seq': 4, 'ops': [3, brush]})  # a click: one batch, no flag
+    assert len(game.history.undo_stack) == 2
+
+    game.undo()
+    assert row(game, 4) == [TileType.WALL] * 3 + [TileType.EMPTY]
+    game.undo()
+    assert row(game, 4) == [TileType.EMPTY] * 4
+
+def test_undo_closes_an_unfinished_drag(client):
+    game = main.HouseMakerGame(renderer='optimistic')
+    game.update_brush()
+    brush = game.renderer._props['brush'][0]
+    fire(client, game.renderer, 'ops', {'seq': 1, 'ops': [0, brush], 'done': False})
+    game.undo()  # e.g. the last batch never arrived
+    assert row(game, 1) == [TileType.EMPTY]
+    assert not game.is_applying
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from house_chunks import ChunkedGrid, new_grid
+from house_history import Checkpoint, Delta, GridHistory
+from house_model import EMPTY_TILE, HouseGrid, TileType, make_tile
+from house_store import encode_grid
+
+from tiles import TILES, random_edits
+
+WALL = make_tile(TileType.WALL)
+
+def state(grid) -> bytes:
+    return encode_grid(grid)
+
+@pytest.mark.parametrize('size', [12, 210])
+def test_undo_and_redo_restore_every_state(size):
+    rng = random.Random(size)
+    grid = new_grid(size)
+    history = GridHistory(max_bytes=1 << 30)
+    states = [state(grid)]
+    for step in range(25):
+        with history.record(grid):
+            if step % 6 == 5:  # most of the grid at once
+                tile = rng.choice(TILES)
+                for x in range(min(size, 40)):
+                    for y in range(min(size, 40)):
+                        grid.set(x, y, tile)
+            else:
+                for (x, y), tile in random_edits(rng, size, rng.randrange(1, 20)):
+                    grid.set(x, y, tile)
+        if state(grid) != states[-1]:
+            states.append(state(grid))
+    assert len(history.undo_stack) == len(states) - 1
+    kinds = {type(entry) for entry in history.undo_stack}
+    assert kinds == ({Delta} if isinstance(grid, ChunkedGrid) else {Delta, Checkpoint})
+
+    for expected in reversed(states[:-1]):
+        assert history.undo(grid)
+        assert state(grid) == expected
+    assert not history.undo(grid)
+    for expected in states[1:]:
+        assert history.redo(grid)
+        assert state(grid) == expected
+    assert not history.redo(grid)
+
+def test_new_operation_drops_the_redo_steps():
+    grid, history = HouseGrid(8), GridHistory()
+    with history.record(grid):
+        grid.set(0, 0, WALL)
+    history.undo(grid)
+    with history.record(grid):
+        grid.set(1, 1, WALL)
+    assert not history.can_redo
+    assert history.nbytes == sum(entry.nbytes for entry in history.undo_stack)
+
+def test_oldest_steps_are_forgotten_beyond_max_bytes():
+    grid, history = HouseGrid(8), GridHistory(max_bytes=50)
+    for y in range(8):
+        with history.record(grid):
+            grid.set(0, y, WALL)
+    assert history.nbytes <= 50
+    assert 0 < len(history.undo_stack) < 8
+    while history.undo(grid):
+        pass
+    assert grid.get(0, 0) == WALL and grid.get(0, 7) == EMPTY_TILE
+
+def test_held_batches_form_one_step():
+    grid, history = HouseGrid(8), GridHistory()
+    history.hold()
+    for y in range(3):
+        with history.record(grid):
+            grid.set(0, y, WALL)
+    assert not history.can_undo
+    history.release()
+    assert len(history.undo_stack) == 1
+    history.undo(grid)
+    assert state(grid) == state(HouseGrid(8))
+
+def test_shared_undo_keeps_cells_changed_by_others():
+    grid = HouseGrid(8)
+    mine, theirs = GridHistory(shared=True), GridHistory(shared=True)
+    with mine.record(grid):
+        grid.set(0, 0, WALL)
+        grid.set(0, 1, WALL)
+    with theirs.record(grid):
+        grid.set(0, 1, EMPTY_TILE)
+    assert mine.undo(grid)
+    assert mine.conflicts == 1
+    assert grid.get(0, 0) == EMPTY_TILE
+    assert theirs.undo(grid)
+    assert grid.get(0, 1) == WALL  # the other client's own change is undone as usual
+    assert mine.redo(grid)
+    assert mine.conflicts == 1 and grid.get(0, 0) == WALL
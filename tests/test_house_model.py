@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from house_chunks import CHUNK, ChunkedGrid, new_grid
+from house_model import EMPTY_TILE, HouseGrid, HouseStats, TileType, make_tile
+from house_store import decode_chunked, encode_grid
+
+from tiles import TILES, random_edits
+
+def counted(grid) -> dict:
+    """Stats counted from scratch, cell by cell."""
+    stats = HouseStats()
+    for x in range(grid.size):
+        for y in range(grid.size):
+            stats.add(grid.get(x, y), 1)
+    return vars(stats)
+
+@pytest.mark.parametrize('size', [7, 40])
+def test_incremental_stats_and_dirty_cells_match_a_rescan(size):
+    rng = random.Random(size)
+    grid = new_grid(size)
+    for _ in range(30):
+        before = [[grid.get(x, y) for y in range(size)] for x in range(size)]
+        edits = random_edits(rng, size, rng.randrange(1, 3 * size))
+        for (x, y), tile in edits:
+            grid.set(x, y, tile)
+        changed = {(x, y) for x in range(size) for y in range(size) if grid.get(x, y) != before[x][y]}
+        # a cell set and set back within one batch may stay marked
+        assert changed <= grid.take_dirty() <= {cell for cell, _ in edits}
+        assert vars(grid.stats) == counted(grid)
+    rebuilt = HouseStats()
+    rebuilt.rebuild(grid)
+    assert vars(rebuilt) == vars(grid.stats)
+
+def test_assign_marks_and_counts_only_the_differences():
+    rng = random.Random(1)
+    grid, other = HouseGrid(20), HouseGrid(20)
+    for (x, y), tile in random_edits(rng, 20, 300):
+        grid.set(x, y, tile)
+    for (x, y), tile in random_edits(rng, 20, 30):  # few differences: counted per cell
+        other.set(x, y, tile)
+    for target in (other.snapshot(), HouseGrid(20).snapshot()):  # then most of the grid: rebuilt
+        old = [[grid.get(x, y) for y in range(20)] for x in range(20)]
+        grid.take_dirty()
+        grid.assign(target)
+        assert grid.take_dirty() == {(x, y) for x in range(20) for y in range(20) if grid.get(x, y) != old[x][y]}
+        assert grid.snapshot() == target
+        assert vars(grid.stats) == counted(grid)
+
+def test_clear_resets_stats_and_marks_the_used_cells():
+    grid = HouseGrid(10)
+    grid.set(2, 3, make_tile(TileType.WALL))
+    grid.set(4, 5, make_tile(TileType.FLOOR, color='#101010'))
+    grid.take_dirty()
+    grid.clear()
+    assert grid.take_dirty() == {(2, 3), (4, 5)}
+    assert vars(grid.stats) == vars(HouseStats())
+
+def test_chunks_are_freed_with_their_last_cell():
+    grid = ChunkedGrid(300)
+    wall = make_tile(TileType.WALL)
+    grid.set(0, 0, wall)
+    grid.set(CHUNK + 1, 299, wall)
+    assert set(grid.chunks) == {(0, 0), (1, 299 // CHUNK)}
+    grid.set(0, 0, EMPTY_TILE)
+    assert set(grid.chunks) == {(1, 299 // CHUNK)}
+    assert grid.filled == {(1, 299 // CHUNK): 1}
+    assert grid.nbytes == 4 * CHUNK * CHUNK
+
+def test_chunked_snapshot_and_assign_agree_with_a_rescan():
+    rng = random.Random(2)
+    grid = ChunkedGrid(250)
+    for (x, y), tile in random_edits(rng, 250, 2000):
+        grid.set(x, y, tile)
+    copy = grid.snapshot()
+    assert vars(copy.stats) == vars(grid.stats) == counted(grid)
+    target = decode_chunked(encode_grid(grid))
+    for (x, y), tile in random_edits(rng, 250, 500):
+        grid.set(x, y, tile)
+    grid.take_dirty()
+    old = {key: block[:] for key, block in grid.chunks.items()}
+    grid.assign(target)
+    assert grid.chunks == target.chunks
+    assert vars(grid.stats) == counted(grid)
+    empty = [0] * CHUNK * CHUNK
+    assert all(grid.code(x, y) != old.get((x // CHUNK, y // CHUNK), empty)[x % CHUNK * CHUNK + y % CHUNK]
+               for x, y in grid.take_dirty())
+
+def test_tiles_are_interned():
+    assert make_tile(TileType.WALL, color='#333333') is make_tile(TileType.WALL, color='#333333')
+    assert make_tile(TileType.WALL, color='#333333') is TILES[2]
+    with pytest.raises(ValueError):
+        make_tile(TileType.WALL, color='red')
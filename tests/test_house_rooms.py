@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from house_model import HouseGrid, TileType, make_tile
+from house_rooms import RoomAnalyzer
+from house_validation import BLOCKED_DOOR, NO_WINDOW, UNREACHABLE, LayoutValidator
+
+from tiles import random_edits
+
+def region_cells(analyzer: RoomAnalyzer, i: int) -> frozenset:
+    label = analyzer.labels[i]
+    return frozenset(j for j, other in enumerate(analyzer.labels) if other == label)
+
+def rooms(analyzer: RoomAnalyzer) -> set:
+    """Rooms by their cells, which unlike region ids and representative cells do not depend on history."""
+    size = analyzer.size
+    return {(region_cells(analyzer, room.cell[0] * size + room.cell[1]), room.area, room.doors, room.windows,
+             room.furniture, room.floor) for room in analyzer.rooms()}
+
+def issues(validator: LayoutValidator) -> set:
+    size = validator.size
+    return {(issue.kind, issue.cell if issue.kind == BLOCKED_DOOR
+             else region_cells(validator.analyzer, issue.cell[0] * size + issue.cell[1]))
+            for issue in validator.issues()}
+
+def walled_house(size: int) -> HouseGrid:
+    """Two rooms side by side behind an outer wall, with a front door and a door between them."""
+    grid = HouseGrid(size)
+    wall, floor = make_tile(TileType.WALL), make_tile(TileType.FLOOR)
+    for i in range(1, size - 1):
+        for cell in ((1, i), (size - 2, i), (i, 1), (i, size - 2), (i, size // 2)):
+            grid.set(*cell, wall)
+    for x in range(2, size - 2):
+        for y in range(2, size - 2):
+            if y != size // 2:
+                grid.set(x, y, floor)
+    grid.set(1, 3, make_tile(TileType.DOOR))
+    grid.set(3, size // 2, make_tile(TileType.DOOR))
+    grid.set(size - 2, 3, make_tile(TileType.WINDOW))
+    return grid
+
+@pytest.mark.parametrize('seed', range(4))
+def test_incremental_rooms_and_issues_match_a_full_analysis(seed):
+    rng = random.Random(seed)
+    grid = walled_house(16) if seed % 2 else HouseGrid(16)
+    analyzer = RoomAnalyzer(grid)
+    validator = LayoutValidator(analyzer)
+    for _ in range(60):
+        # mostly single cells, sometimes a batch large enough for a rebuild
+        for (x, y), tile in random_edits(rng, 16, 1 if rng.random() < 0.7 else rng.randrange(2, 60)):
+            grid.set(x, y, tile)
+        dirty = grid.take_dirty()
+        analyzer.update(dirty)
+        validator.update(dirty)
+        fresh = RoomAnalyzer(grid)
+        assert rooms(analyzer) == rooms(fresh)
+        assert issues(validator) == issues(LayoutValidator(fresh))
+
+def test_house_issues():
+    grid = walled_house(12)
+    analyzer = RoomAnalyzer(grid)
+    validator = LayoutValidator(analyzer)
+    assert len(analyzer.rooms()) == 2
+    assert {issue.kind for issue in validator.issues()} == {NO_WINDOW}  # the window is in one room only
+
+    grid.set(3, 6, make_tile(TileType.WALL))  # wall up the door between the rooms
+    dirty = grid.take_dirty()
+    analyzer.update(dirty)
+    validator.update(dirty)
+    assert {issue.kind for issue in validator.issues()} == {NO_WINDOW, UNREACHABLE}
+
+    grid.set(2, 3, make_tile(TileType.FURNITURE))  # in front of the front door
+    dirty = grid.take_dirty()
+    analyzer.update(dirty)
+    validator.update(dirty)
+    assert (BLOCKED_DOOR, (1, 3)) in {(issue.kind, issue.cell) for issue in validator.issues()}
@@ -0,0 +1,21 @@
+import pytest
+
+from house_shared import get_shared_design, shared_designs
+
+def test_design_is_dropped_with_its_last_subscriber():
+    design = get_shared_design('lobby', 20)
+    first, second = (lambda cells: None), (lambda cells: None)
+    design.subscribe(first)
+    design.subscribe(second)
+    assert get_shared_design('lobby', 20) is design
+    design.unsubscribe(first)
+    assert ('lobby', 20) in shared_designs
+    design.unsubscribe(second)
+    assert ('lobby', 20) not in shared_designs
+    assert get_shared_design('lobby', 20) is not design
+
+@pytest.mark.parametrize('name', ['', 'x' * 65, '../lobby', 'lobby\n'])
+def test_invalid_names_are_rejected(name):
+    with pytest.raises(ValueError):
+        get_shared_design(name, 20)
+    assert (name, 20) not in shared_designs
@@ -0,0 +1,96 @@
+import random
+import struct
+
+import pytest
+
+from house_chunks import ChunkedGrid, new_grid
+from house_model import HouseGrid, TileType, make_tile
+from house_store import DesignStore, decode_chunked, decode_grid, encode_grid, grid_size
+
+from tiles import TILES, random_edits
+
+@pytest.fixture
+def store():
+    store = DesignStore(':memory:')
+    yield store
+    store.close()
+
+@pytest.mark.parametrize('size', [5, 200, 201, 256])
+def test_empty_grid_round_trip(store, size):
+    grid = new_grid(size)
+    data = encode_grid(grid)
+    assert grid_size(data) == size
+    if isinstance(grid, ChunkedGrid):
+        assert not decode_chunked(data).chunks
+    else:
+        assert decode_grid(data) == (size, grid.snapshot())
+    _, loaded = store.load(store.save('empty', grid))
+    assert isinstance(loaded, ChunkedGrid) == isinstance(grid, ChunkedGrid)
+    new_grid(size).assign(loaded)
+
+@pytest.mark.parametrize('size', [5, 33, 200, 201, 1000])
+def test_round_trip_keeps_every_cell(store, size):
+    rng = random.Random(size)
+    grid = new_grid(size)
+    edits = random_edits(rng, size, 3 * size) + [((0, 0), TILES[1]), ((size - 1, size - 1), TILES[-1])]
+    for (x, y), tile in edits:
+        grid.set(x, y, tile)
+    data = encode_grid(grid)
+    assert grid_size(data) == size
+    _, loaded = store.load(store.save('random', grid))
+    copy = new_grid(size)
+    copy.assign(loaded)
+    assert encode_grid(copy) == data
+    assert vars(copy.stats) == vars(grid.stats)
+    assert all(copy.get(x, y) == grid.get(x, y) for (x, y), _ in edits)
+
+def test_many_colours_survive_a_round_trip():
+    grid = HouseGrid(20)
+    for n in range(400):
+        grid.set(*divmod(n, 20), make_tile(TileType.WALL, color=f'#{n:06X}'))
+    size, snapshot = decode_grid(encode_grid(grid))
+    assert snapshot == grid.snapshot()
+
+def corrupt(data: bytes, offset: int, value: bytes) -> bytes:
+    offset %= len(data)
+    return data[:offset] + value + data[offset + len(value):]
+
+def runs_offset(data: bytes) -> int:
+    """Where the runs (or the first chunk) start, after the header and the colour table."""
+    return 7 + struct.unpack_from('<BHI', data)[2]
+
+def flat_blob() -> bytes:
+    grid = HouseGrid(10)
+    grid.set(1, 1, make_tile(TileType.WALL, color='#123456'))
+    return encode_grid(grid)
+
+def chunked_blob() -> bytes:
+    grid = ChunkedGrid(300)
+    grid.set(1, 1, make_tile(TileType.WALL, color='#123456'))
+    return encode_grid(grid)
+
+@pytest.mark.parametrize('data', [
+    pytest.param(b'', id='empty'),
+    pytest.param(corrupt(flat_blob(), 0, b'\x07'), id='unknown version'),
+    pytest.param(flat_blob()[:-8], id='truncated runs'),
+    pytest.param(flat_blob() + b'\x01\x00\x00\x00\x00\x00\x00\x00', id='too many cells'),
+    pytest.param(corrupt(flat_blob(), 7, b'#XYZXYZ'), id='bad colour'),
+    pytest.param(corrupt(flat_blob(), -4, b'\x07\x00\x00\x00'), id='bad tile type'),
+    pytest.param(corrupt(flat_blob(), -4, b'\x00\x00\x05\x00'), id='unknown colour index'),
+    pytest.param(chunked_blob()[:-8], id='short chunk'),
+    pytest.param(corrupt(chunked_blob(), runs_offset(chunked_blob()), b'\x0a\x00'), id='chunk outside the grid'),
+    pytest.param(corrupt(flat_blob(), 1, b'\x04\x00'), id='too small'),
+    pytest.param(corrupt(flat_blob(), 1, b'\xc9\x00'), id='large grid stored flat'),
+    pytest.param(corrupt(chunked_blob(), 1, b'\xc8\x00'), id='small grid stored chunked'),
+])
+def test_invalid_blobs_are_rejected(data):
+    with pytest.raises((ValueError, struct.error)):
+        grid_size(data)
+
+def test_decoding_checks_the_cell_count():
+    with pytest.raises(ValueError, match='Corrupt grid data'):
+        decode_grid(flat_blob()[:-8])
+    with pytest.raises(ValueError, match='Corrupt grid data'):
+        decode_chunked(chunked_blob()[:-8])
+    with pytest.raises(ValueError, match='format version'):
+        decode_grid(chunked_blob())
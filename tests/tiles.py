@@ -0,0 +1,22 @@
+"""Random tiles and edits shared by the grid tests."""
+import random
+from typing import List
+
+from house_model import EMPTY_TILE, FurnitureType, RoomType, Tile, TileType, make_tile
+
+TILES: List[Tile] = [
+    EMPTY_TILE,
+    make_tile(TileType.WALL),
+    make_tile(TileType.WALL, color='#333333'),
+    make_tile(TileType.DOOR),
+    make_tile(TileType.WINDOW),
+    make_tile(TileType.FLOOR, RoomType.BEDROOM),
+    make_tile(TileType.FLOOR, RoomType.KITCHEN, color='#ffeedd'),
+    make_tile(TileType.FURNITURE, furniture_type=FurnitureType.SOFA, rotation=90),
+    make_tile(TileType.ROOF),
+]
+
+def random_edits(rng: random.Random, size: int, count: int, tiles: List[Tile] = TILES):
+    """``((x, y), tile)`` pairs, biased towards walls so that rooms actually form."""
+    weights = [3, 6, 1, 1, 1, 2, 2, 1, 1][:len(tiles)]
+    return [((rng.randrange(size), rng.randrange(size)), rng.choices(tiles, weights)[0]) for _ in range(count)]